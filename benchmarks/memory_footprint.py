@@ -0,0 +1,202 @@
+#!python
+# coding: utf-8
+
+"""
+Memory footprint regression suite.
+
+Measures, with tracemalloc, the peak and steady-state (retained) memory of the main FastaParser operations
+and reports them per record and per base:
+    reader_quick:   Reader(parse_method='quick') over a whole file, keeping every record.
+    reader_rich:    Reader(parse_method='rich') over a whole file, keeping every record.
+    construction:   FastaSequence construction from strings.
+    slicing:        Slicing half of every FastaSequence.
+    complement:     Complement of every FastaSequence.
+
+Each scenario has a budget (in bytes per base, for the peak memory). Exits with status 1 if any budget is exceeded.
+
+ex:
+    $ python benchmarks/memory_footprint.py
+    $ python benchmarks/memory_footprint.py --records 50 --length 20000 --budget reader_rich=250
+    $ python benchmarks/memory_footprint.py --budget-file budgets.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fastaparser  # noqa: E402  pylint: disable=wrong-import-position
+
+
+# peak bytes per base allowed for each scenario
+DEFAULT_BUDGETS = {
+    'reader_quick': 2,
+    'reader_rich': 220,
+    'construction': 220,
+    'slicing': 120,
+    'complement': 220,
+}
+
+
+def generate_fasta_file(path, records, length, seed=0):
+    """
+    Writes a random nucleotide FASTA file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the FASTA file to create.
+    records : int
+        Number of FASTA sequences.
+    length : int
+        Length of each sequence.
+    seed : int, optional
+        Random seed.
+
+    Returns
+    -------
+    list of str
+        Generated sequences.
+    """
+    rng = random.Random(seed)
+    sequences = [''.join(rng.choice('ACGT') for _ in range(length)) for _ in range(records)]
+    with open(path, 'w') as fasta_file:
+        for i, sequence in enumerate(sequences):
+            fasta_file.write('>seq%d benchmark sequence %d\n' % (i, i))
+            for start in range(0, len(sequence), 70):
+                fasta_file.write(sequence[start:start + 70] + '\n')
+    return sequences
+
+
+def measure(function):
+    """
+    Runs function while tracing memory allocations.
+
+    Parameters
+    ----------
+    function : callable
+        Function with no arguments. Its return value is kept alive until the steady-state is measured.
+
+    Returns
+    -------
+    (int, int)
+        Peak and steady-state (retained after the function returns) memory, in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    gc.collect()
+    steady, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, steady
+
+
+def run_scenarios(path, sequences):
+    """
+    Runs all scenarios.
+
+    Parameters
+    ----------
+    path : str
+        Path of the FASTA file.
+    sequences : list of str
+        Sequences contained in the FASTA file.
+
+    Returns
+    -------
+    dict
+        {scenario: (peak, steady)}
+    """
+    def read(parse_method):
+        with open(path) as fasta_file:
+            return list(fastaparser.Reader(fasta_file, sequences_type='nucleotide', parse_method=parse_method))
+
+    def construct():
+        return [fastaparser.FastaSequence(sequence, sequence_type='nucleotide') for sequence in sequences]
+
+    fasta_sequences = construct()
+
+    def slice_half():
+        return [fasta_sequence[:len(fasta_sequence) // 2] for fasta_sequence in fasta_sequences]
+
+    def complement():
+        return [fasta_sequence.complement() for fasta_sequence in fasta_sequences]
+
+    return {
+        'reader_quick': measure(lambda: read('quick')),
+        'reader_rich': measure(lambda: read('rich')),
+        'construction': measure(construct),
+        'slicing': measure(slice_half),
+        'complement': measure(complement),
+    }
+
+
+def parse_budgets(args):
+    """
+    Builds the budgets dictionary from the defaults, the budget file and the command line.
+
+    Returns
+    -------
+    dict
+        {scenario: peak bytes per base}
+    """
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budget_file:
+        with open(args.budget_file) as budget_file:
+            budgets.update(json.load(budget_file))
+    for budget in args.budget:
+        name, _, value = budget.partition('=')
+        if name not in DEFAULT_BUDGETS or not value:
+            raise SystemExit('--budget must be one of %s followed by =BYTES_PER_BASE' % ', '.join(DEFAULT_BUDGETS))
+        budgets[name] = float(value)
+    return budgets
+
+
+def main(argv=None):
+    """
+    Runs the memory footprint suite and reports the results.
+
+    Returns
+    -------
+    int
+        0 if every scenario is within budget, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='FastaParser memory footprint regression suite.')
+    parser.add_argument('--records', type=int, default=20, help='number of FASTA sequences (default: 20)')
+    parser.add_argument('--length', type=int, default=10000, help='length of each sequence (default: 10000)')
+    parser.add_argument('--budget', action='append', default=[], metavar='SCENARIO=BYTES_PER_BASE',
+                        help='peak memory budget for a scenario (can be repeated)')
+    parser.add_argument('--budget-file', help='JSON file of {scenario: bytes_per_base} budgets')
+    args = parser.parse_args(argv)
+
+    budgets = parse_budgets(args)
+    total_bases = args.records * args.length
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        path = os.path.join(temporary_directory, 'memory_footprint.fasta')
+        sequences = generate_fasta_file(path, args.records, args.length)
+        results = run_scenarios(path, sequences)
+
+    print('%d records x %d bases' % (args.records, args.length))
+    print('%-14s %14s %14s %14s %14s %10s  %s' % ('scenario', 'peak/record', 'peak/base', 'steady/record',
+                                                  'steady/base', 'budget', 'status'))
+    failed = False
+    for scenario, (peak, steady) in results.items():
+        peak_per_base = peak / total_bases
+        within_budget = peak_per_base <= budgets[scenario]
+        failed = failed or not within_budget
+        print('%-14s %14.1f %14.2f %14.1f %14.2f %10.2f  %s' % (scenario, peak / args.records, peak_per_base,
+                                                                steady / args.records, steady / total_bases,
+                                                                budgets[scenario], 'ok' if within_budget else 'FAIL'))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
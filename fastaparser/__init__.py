@@ -37,8 +37,19 @@ __license__ = 'GPLv3'
 
 
 from .constants import *
+from .dataset import FastaDataset
+from .extract import extract_fastas
 from .fastasequence import FastaSequence
+from .hashindex import HashIndex, build_hash_index
+from .headers import HeaderFields, HeaderSchema, parse_header, parse_headers, DEFAULT_HEADER_SCHEMAS, \
+    ENSEMBL_SCHEMA, NCBI_SCHEMA, UNIPROT_SCHEMA
 from .lettercode import LetterCode
+from .parallel import parallel_map
 from .parsedefinitionline import ParseDefinitionLine
+from .pipeline import Pipeline
 from .reader import Reader
+from .serialization import serialize_fastas, deserialize_fastas
+from .shardedwriter import ShardedWriter
+from .sharedmemory import SharedFastas
+from .sqlitestore import SQLiteStore
 from .writer import Writer
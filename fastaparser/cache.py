@@ -0,0 +1,113 @@
+#!python
+# coding: utf-8
+
+"""
+Bounded LRU cache of FASTA sequences, with size accounting and hit/miss statistics (used by Reader lookups by ID).
+"""
+
+import collections
+import sys
+import threading
+from collections import namedtuple
+from .fastasequence import FastaSequence
+
+
+# statistics of a cache (same fields as functools.lru_cache's cache_info(), plus evictions and entries)
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize', 'entries'])
+
+
+def _memory_size(fasta_sequence):
+    """
+    Estimates the memory used by a FASTA sequence generated by Reader, in O(1).
+    'rich' FastaSequence objects use over a hundred bytes per letter code (one LetterCode object each), 'quick'
+    objects about one byte per letter code.
+
+    Parameters
+    ----------
+    fasta_sequence : FastaSequence or namedtuple('Fasta', ['header', 'sequence'])
+        FASTA sequence.
+
+    Returns
+    -------
+    int
+        Estimated size, in bytes.
+    """
+    if isinstance(fasta_sequence, FastaSequence):
+        # every LetterCode object (and its attribute dict) has the same size as the first one, plus its list slot
+        # (read from the private list: the sequence property would hand it out, which changes fasta_sequence)
+        letter_code = fasta_sequence._sequence[0]  # pylint: disable=protected-access
+        letter_code_size = sys.getsizeof(letter_code) + sys.getsizeof(vars(letter_code)) + \
+            sys.getsizeof([None]) - sys.getsizeof([])
+        return (sys.getsizeof(fasta_sequence) + sys.getsizeof(vars(fasta_sequence)) + sys.getsizeof([]) +
+                len(fasta_sequence) * letter_code_size + sys.getsizeof(fasta_sequence.sequence_as_string()))
+    return sys.getsizeof(fasta_sequence) + sys.getsizeof(fasta_sequence.header) + sys.getsizeof(fasta_sequence.sequence)
+
+
+class _LRUCache:
+    """
+    Thread-safe least recently used cache, bounded by the total size of its values (as given by the caller),
+    instead of by their number.
+    """
+
+    def __init__(self, max_size):
+        """
+        Parameters
+        ----------
+        max_size : int
+            Maximum total size of the cached values. Values larger than max_size are never cached.
+        """
+        self._max_size = max_size
+        self._entries = collections.OrderedDict()  # {key: (value, size)}, from least to most recently used
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value of key (marking it as the most recently used), or default if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Caches value, evicting the least recently used values until the total size is at most max_size.
+        """
+        if size > self._max_size:
+            return
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self._size -= previous_entry[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self._max_size:
+                self._size -= self._entries.popitem(last=False)[1][1]
+                self._evictions += 1
+
+    def info(self):
+        """
+        Returns the statistics of the cache.
+
+        Returns
+        -------
+        CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._max_size, self._size, len(self._entries))
+
+    def clear(self):
+        """
+        Removes every value and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = self._hits = self._misses = self._evictions = 0
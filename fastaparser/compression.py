@@ -0,0 +1,186 @@
+#!python
+# coding: utf-8
+
+"""
+Multithreaded block compression (gzip and BGZF) of the output of Writer.
+
+Output is split into independent blocks, compressed by a pool of threads (zlib releases the GIL while compressing)
+and written in order. Each block is a complete gzip member, so the output is a valid (multi-member) gzip file that
+any gzip reader can decompress.
+BGZF (blocked gzip, as used by samtools/bgzip) limits blocks to 65280 bytes of uncompressed data and stores the size
+of each compressed block in a gzip extra field, which allows random access (see .gzi indexes).
+"""
+
+import collections
+import concurrent.futures
+import gzip
+import os
+import struct
+import zlib
+
+
+_COMPRESSIONS = ('gzip', 'bgzf')
+
+_GZIP_BLOCK_SIZE = 1048576  # uncompressed bytes per gzip member
+_BGZF_BLOCK_SIZE = 65280  # uncompressed bytes per BGZF block (same as bgzip)
+# gzip header with the BGZF extra field (ID1, ID2, CM, FLG, MTIME, XFL, OS, XLEN, SI1, SI2, SLEN, BSIZE)
+_BGZF_HEADER = struct.Struct('<BBBBIBBHBBHH')
+_BGZF_FOOTER = struct.Struct('<II')  # CRC32, ISIZE
+# empty BGZF block that marks the end of a BGZF file
+_BGZF_EOF = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+
+def _compress_gzip_block(data, compression_level):
+    """
+    Compresses data into a single gzip member.
+
+    Parameters
+    ----------
+    data : bytes
+        Uncompressed data.
+    compression_level : int
+        zlib compression level (0-9).
+
+    Returns
+    -------
+    bytes
+        gzip member.
+    """
+    return gzip.compress(data, compression_level)
+
+
+def _compress_bgzf_block(data, compression_level):
+    """
+    Compresses data (at most 65280 bytes) into a single BGZF block.
+
+    Parameters
+    ----------
+    data : bytes
+        Uncompressed data.
+    compression_level : int
+        zlib compression level (0-9).
+
+    Returns
+    -------
+    bytes
+        BGZF block.
+    """
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)  # raw deflate, no zlib header
+    compressed_data = compressor.compress(data) + compressor.flush()
+    block_size = _BGZF_HEADER.size + len(compressed_data) + _BGZF_FOOTER.size
+    return b''.join((_BGZF_HEADER.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, block_size - 1),
+                     compressed_data,
+                     _BGZF_FOOTER.pack(zlib.crc32(data) & 0xffffffff, len(data))))
+
+
+class _CompressedOutput:
+    """
+    Text output stream that compresses blocks of its (utf-8 encoded) data in a pool of threads and writes them,
+    in order, to a binary file.
+
+    Attributes
+    ----------
+    blocks : list of (int, int)
+        (compressed offset, uncompressed offset) of the start of every block written so far, after the first one
+        (the same entries as in a .gzi index).
+    """
+
+    def __init__(self, binary_file, compression, threads=None, compression_level=6):
+        """
+        Parameters
+        ----------
+        binary_file : file object
+            File opened for writing in binary mode.
+        compression : 'gzip' or 'bgzf'
+            Compression format.
+        threads : int or None, optional
+            Number of compression threads. None uses the number of processors of the machine.
+        compression_level : int, optional
+            zlib compression level (0-9).
+        """
+        self._binary_file = binary_file
+        self._compression = compression
+        self._compression_level = compression_level
+        if compression == 'bgzf':
+            self._compress_block = _compress_bgzf_block
+            self._block_size = _BGZF_BLOCK_SIZE
+        else:
+            self._compress_block = _compress_gzip_block
+            self._block_size = _GZIP_BLOCK_SIZE
+        threads = threads or os.cpu_count() or 1
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+        self._max_in_flight = 2 * threads
+        self._in_flight = collections.deque()
+        self._pending = []  # encoded data not yet submitted for compression
+        self._pending_size = 0
+        self._compressed_offset = 0
+        self._uncompressed_offset = 0
+        self.blocks = []
+        self.closed = False
+
+    def write(self, text):
+        """
+        Encodes and buffers text, compressing every complete block.
+        """
+        if self.closed:
+            raise ValueError('I/O operation on closed compressed output')
+        data = text.encode('utf-8')
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self._block_size:
+            data = b''.join(self._pending)
+            full_blocks_end = len(data) - len(data) % self._block_size
+            for start in range(0, full_blocks_end, self._block_size):
+                self._submit(data[start:start + self._block_size])
+            self._pending = [data[full_blocks_end:]]
+            self._pending_size = len(data) - full_blocks_end
+
+    def writelines(self, lines):
+        """
+        Writes each str in lines.
+        """
+        for line in lines:
+            self.write(line)
+
+    def close(self):
+        """
+        Compresses and writes the remaining data (and the BGZF end of file marker) and stops the compression threads.
+        Does not close the binary file.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            data = b''.join(self._pending)
+            self._pending = []
+            if data:
+                self._submit(data)
+            while self._in_flight:
+                self._write_next_block()
+            if self._compression == 'bgzf':
+                self._binary_file.write(_BGZF_EOF)
+            self._binary_file.flush()
+        finally:
+            self._executor.shutdown()
+
+    def _submit(self, data):
+        """
+        Submits a block of data for compression, writing the oldest compressed blocks to keep
+        (at most) max_in_flight blocks in memory.
+        """
+        self._in_flight.append((self._executor.submit(self._compress_block, data, self._compression_level),
+                                len(data)))
+        while self._in_flight and (len(self._in_flight) > self._max_in_flight or self._in_flight[0][0].done()):
+            self._write_next_block()
+
+    def _write_next_block(self):
+        """
+        Waits for the oldest block to be compressed and writes it.
+        """
+        future, uncompressed_size = self._in_flight.popleft()
+        compressed_block = future.result()
+        if self._compressed_offset:
+            self.blocks.append((self._compressed_offset, self._uncompressed_offset))
+        self._binary_file.write(compressed_block)
+        self._compressed_offset += len(compressed_block)
+        self._uncompressed_offset += uncompressed_size
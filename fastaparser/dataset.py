@@ -0,0 +1,314 @@
+#!python
+# coding: utf-8
+
+"""
+FastaDataset - Lazy, partitioned FASTA files with map/filter/reduce executed on a thread or process pool.
+"""
+
+import concurrent.futures
+import functools
+import io
+import os
+from .parallel import _bounded_map, _iter_record_ranges, _read_range
+from .reader import Reader
+
+
+_EXECUTORS = {
+    'process': concurrent.futures.ProcessPoolExecutor,
+    'thread': concurrent.futures.ThreadPoolExecutor,
+}
+
+
+def _copy_with(obj, **attributes):
+    """
+    Returns a shallow copy of obj (without calling __init__) with some attributes replaced.
+
+    Parameters
+    ----------
+    obj : object
+        Object to copy.
+    **attributes
+        Attributes of the copy to replace (name=value).
+
+    Returns
+    -------
+    object
+        Copy of obj, of the same type.
+    """
+    copy = type(obj).__new__(type(obj))
+    copy.__dict__.update(obj.__dict__)
+    copy.__dict__.update(attributes)
+    return copy
+
+
+def _run_partition(fasta_path, start, end, encoding, reader_options, operations):
+    """
+    Parses a partition (byte range of a FASTA file) and applies the operations to its FASTA sequences
+    (runs in the workers).
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the FASTA file.
+    start : int
+        Start byte offset (inclusive).
+    end : int
+        End byte offset (exclusive).
+    encoding : str
+        Encoding of the FASTA file.
+    reader_options : dict
+        Keyword arguments passed to Reader.
+    operations : tuple of ('map' or 'filter', callable)
+        Operations applied to each FASTA sequence, in order.
+
+    Returns
+    -------
+    list
+        FASTA sequences (or results of the map operations) that passed every filter, in order.
+    """
+    results = []
+    for item in _read_range(fasta_path, start, end, encoding, reader_options):
+        for operation, function in operations:
+            if operation == 'map':
+                item = function(item)
+            elif not function(item):  # 'filter'
+                break
+        else:
+            results.append(item)
+    return results
+
+
+class FastaDataset:
+    """
+    One or many FASTA files, partitioned into byte ranges of (at most) partition_records FASTA sequences each,
+    with lazily chained map and filter operations.
+    Nothing is read until the dataset is iterated, executed or reduced. Each partition is then parsed with Reader
+    and goes through every operation in a single worker, so only byte ranges and results are transferred between
+    the main process and the workers.
+
+    ex:
+        > import fastaparser
+        > def gc_content(fasta_sequence):
+        >     return fasta_sequence.id, fasta_sequence.gc_content()
+        > def is_long(fasta_sequence):
+        >     return len(fasta_sequence) > 1000
+        > dataset = fastaparser.FastaDataset(['file_1.fasta', 'file_2.fasta'], sequences_type='nucleotide')
+        > for id_, gc in dataset.filter(is_long).map(gc_content).execute(workers=4):
+        >     ...
+
+    Attributes
+    ----------
+    fasta_paths : tuple of str
+        Paths of the FASTA files.
+
+    Methods
+    -------
+    map(function)
+        Returns a new FastaDataset that applies function to each item.
+    filter(predicate)
+        Returns a new FastaDataset that keeps only the items for which predicate is true.
+    partitions()
+        Returns the partitions of the FASTA files.
+    execute(workers=None, executor='process', ordered=True)
+        Runs the operations on a pool of workers and returns the results.
+    reduce(function, initial, workers=None, executor='process')
+        Runs the operations on a pool of workers and reduces their results.
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if fasta_paths is not a path (or list of paths) to files
+        or partition_records or reader_options are of the wrong type.
+        When calling map() or filter(), if function or predicate are not callable.
+        When calling execute() or reduce(), if workers, executor or function are of the wrong type.
+    """
+
+    def __init__(self, fasta_paths, partition_records=1000, encoding='utf-8', **reader_options):
+        """
+        Initializes FastaDataset with no operations.
+
+        Parameters
+        ----------
+        fasta_paths : str or list of str
+            Path (or paths) of the FASTA files.
+        partition_records : int, optional
+            Number of FASTA sequences per partition.
+        encoding : str, optional
+            Encoding of the FASTA files.
+        reader_options
+            Keyword arguments passed to Reader (ex: sequences_type, parse_method).
+
+        Raises
+        ------
+        TypeError
+            If fasta_paths is not a path (or list of paths) to files
+            or partition_records or reader_options are of the wrong type.
+        """
+        if isinstance(fasta_paths, str):
+            fasta_paths = (fasta_paths,)
+        if (not isinstance(fasta_paths, (list, tuple))
+                or not all(isinstance(fasta_path, str) and os.path.isfile(fasta_path) for fasta_path in fasta_paths)):
+            raise TypeError('fasta_paths must be the path (or a list of paths) of FASTA files')
+        if not isinstance(partition_records, int) or isinstance(partition_records, bool) or partition_records <= 0:
+            raise TypeError('partition_records must be a positive int')
+        Reader(io.StringIO(), **reader_options)  # checks reader_options before reading anything
+
+        self._fasta_paths = tuple(fasta_paths)
+        self._partition_records = partition_records
+        self._encoding = encoding
+        self._reader_options = reader_options
+        self._operations = ()
+
+    @property
+    def fasta_paths(self):
+        """return fasta_paths."""
+        return self._fasta_paths
+
+    def map(self, function):
+        """
+        Returns a new FastaDataset that applies function to each item
+        (FASTA sequence, as generated by Reader, or result of a previous map).
+
+        Parameters
+        ----------
+        function : callable
+            Function applied to each item. Must be picklable to run on a process pool
+            (ex: a function defined at the top level of a module), as must its results.
+
+        Returns
+        -------
+        FastaDataset
+
+        Raises
+        ------
+        TypeError
+            If function is not callable.
+        """
+        if not callable(function):
+            raise TypeError('function must be callable')
+        return self._with_operation('map', function)
+
+    def filter(self, predicate):
+        """
+        Returns a new FastaDataset that keeps only the items for which predicate is true.
+
+        Parameters
+        ----------
+        predicate : callable
+            Function applied to each item. Must be picklable to run on a process pool.
+
+        Returns
+        -------
+        FastaDataset
+
+        Raises
+        ------
+        TypeError
+            If predicate is not callable.
+        """
+        if not callable(predicate):
+            raise TypeError('predicate must be callable')
+        return self._with_operation('filter', predicate)
+
+    def partitions(self):
+        """
+        Finds the partitions of the FASTA files (without parsing them).
+
+        Yields
+        ------
+        (str, int, int)
+            Path of the FASTA file, start (inclusive) and end (exclusive) byte offsets of each partition.
+        """
+        for fasta_path in self._fasta_paths:
+            for start, end in _iter_record_ranges(fasta_path, self._partition_records):
+                yield fasta_path, start, end
+
+    def execute(self, workers=None, executor='process', ordered=True):
+        """
+        Runs the operations on a pool of workers, one partition per task.
+        At most 2 * workers partitions are in flight at a time, which bounds memory usage.
+
+        Parameters
+        ----------
+        workers : int or None, optional
+            Number of workers. None uses the number of processors of the machine.
+        executor : 'process' or 'thread', optional
+            Run the workers in processes or in threads (in the current process,
+            no pickling required, but bound by the GIL for python code).
+        ordered : bool, optional
+            If results are returned in the same order as the FASTA sequences (True)
+            or as soon as each partition is ready (False).
+
+        Returns
+        -------
+        iterator
+            Items (FASTA sequences or results of the map operations) that passed every filter.
+
+        Raises
+        ------
+        TypeError
+            If workers or executor are of the wrong type.
+        """
+        if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers <= 0):
+            raise TypeError('workers must be a positive int or None')
+        if executor not in _EXECUTORS:
+            raise TypeError('executor must be one of: ' + ', '.join(_EXECUTORS))
+
+        def iter_results():
+            with _EXECUTORS[executor](max_workers=workers) as pool:
+                max_in_flight = 2 * (workers or os.cpu_count() or 1)
+                arguments = ((fasta_path, start, end, self._encoding, self._reader_options, self._operations)
+                             for fasta_path, start, end in self.partitions())
+                for results in _bounded_map(pool, _run_partition, arguments, max_in_flight, ordered):
+                    for result in results:
+                        yield result
+
+        return iter_results()
+
+    def reduce(self, function, initial, workers=None, executor='process'):
+        """
+        Runs the operations on a pool of workers and reduces their results in the current process,
+        as they are streamed (in order).
+
+        Parameters
+        ----------
+        function : callable
+            Function of two arguments, the accumulated value and the next item.
+        initial : object
+            Initial accumulated value.
+        workers : int or None, optional
+            Number of workers. None uses the number of processors of the machine.
+        executor : 'process' or 'thread', optional
+            Run the workers in processes or in threads.
+
+        Returns
+        -------
+        object
+            Accumulated value.
+
+        Raises
+        ------
+        TypeError
+            If function is not callable or workers or executor are of the wrong type.
+        """
+        if not callable(function):
+            raise TypeError('function must be callable')
+        return functools.reduce(function, self.execute(workers, executor), initial)
+
+    def _with_operation(self, operation, function):
+        """
+        Returns a copy of this FastaDataset with an extra operation.
+        """
+        return _copy_with(self, _operations=self._operations + ((operation, function),))
+
+    def __iter__(self):
+        """
+        Runs the operations in the current process (no workers), partition by partition.
+        """
+        for fasta_path, start, end in self.partitions():
+            for result in _run_partition(fasta_path, start, end, self._encoding, self._reader_options,
+                                         self._operations):
+                yield result
+
+    def __repr__(self):
+        return 'fastaparser.FastaDataset(%s)' % ', '.join(self._fasta_paths)
@@ -0,0 +1,271 @@
+#!python
+# coding: utf-8
+
+"""
+extract_fastas - Copies FASTA sequences, selected by ID, from a FASTA file to another, verbatim.
+"""
+
+import errno
+import io
+import os
+from .index import _read_fai
+
+
+_COPY_BLOCK_SIZE = 1048576
+# errors of os.copy_file_range and os.sendfile that mean the copy has to be done in another way
+_UNSUPPORTED_COPY_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, errno.ENOTSUP,
+                            getattr(errno, 'EOPNOTSUPP', errno.ENOTSUP)}
+
+
+def _sequence_bytes(fai_entry):
+    """
+    Number of bytes of a sequence (letter codes and line endings), as described by its .fai entry.
+
+    Parameters
+    ----------
+    fai_entry : FaiEntry
+        .fai entry of the sequence.
+
+    Returns
+    -------
+    int
+    """
+    if fai_entry.line_bases <= 0:
+        return 0
+    full_lines, last_line_bases = divmod(fai_entry.length, fai_entry.line_bases)
+    line_ending = fai_entry.line_width - fai_entry.line_bases
+    return full_lines * fai_entry.line_width + (last_line_bases + line_ending if last_line_bases else 0)
+
+
+def _iter_fai_record_ranges(fasta_file, fai_entries):
+    """
+    Iterates over the byte ranges of the FASTA sequences of a FASTA file, using its .fai index.
+    Only the definition line of each FASTA sequence is read (the .fai index only has the offset of the sequence).
+
+    Parameters
+    ----------
+    fasta_file : file object
+        FASTA file, opened in binary mode.
+    fai_entries : list of FaiEntry
+        .fai index of the FASTA file.
+
+    Yields
+    ------
+    (str, int, int)
+        ID, start (inclusive) and end (exclusive) byte offsets of each FASTA sequence, from its definition line to the
+        end of its last sequence line.
+    """
+    file_size = os.fstat(fasta_file.fileno()).st_size
+    previous_end = 0
+    for fai_entry in sorted(fai_entries, key=lambda fai_entry: fai_entry.offset):
+        # the definition line is the last line between the end of the previous FASTA sequence and the sequence
+        fasta_file.seek(previous_end)
+        gap = fasta_file.read(fai_entry.offset - previous_end)
+        start = previous_end + gap.rfind(b'\n', 0, len(gap) - 1) + 1
+        end = min(fai_entry.offset + _sequence_bytes(fai_entry), file_size)
+        yield fai_entry.name, start, end
+        previous_end = end
+
+
+def _iter_scanned_record_ranges(fasta_file):
+    """
+    Iterates over the byte ranges of the FASTA sequences of a FASTA file, scanning its lines (without parsing them).
+
+    Parameters
+    ----------
+    fasta_file : file object
+        FASTA file, opened in binary mode.
+
+    Yields
+    ------
+    (str, int, int)
+        ID, start (inclusive) and end (exclusive) byte offsets of each FASTA sequence, from its definition line to the
+        end of its last non empty line.
+    """
+    id_ = None
+    start = end = offset = 0
+    for line in fasta_file:
+        if line.startswith(b'>'):
+            if id_ is not None:
+                yield id_, start, end
+            id_and_description = line[1:].split(None, 1)
+            id_ = str(id_and_description[0], 'utf-8') if id_and_description else ''
+            start = offset
+        offset += len(line)
+        if line.strip():
+            end = offset
+    if id_ is not None:
+        yield id_, start, end
+
+
+def _iter_record_ranges(fasta_file, fai_path=None):
+    """
+    Iterates over the byte ranges of the FASTA sequences of a FASTA file, using its .fai index if fai_path is given,
+    or scanning its lines otherwise.
+
+    Parameters
+    ----------
+    fasta_file : file object
+        FASTA file, opened in binary mode.
+    fai_path : str or None, optional
+        Path of the .fai index of the FASTA file.
+
+    Returns
+    -------
+    iterator of (str, int, int)
+        ID, start (inclusive) and end (exclusive) byte offsets of each FASTA sequence.
+    """
+    if fai_path is not None:
+        return _iter_fai_record_ranges(fasta_file, _read_fai(fai_path))
+    return _iter_scanned_record_ranges(fasta_file)
+
+
+def _copy_range(source_file, destination_file, start, length):
+    """
+    Copies a byte range of source_file to the current position of destination_file.
+    Uses os.copy_file_range (copy inside the kernel, or even without copying, on file systems that support it),
+    os.sendfile, or reads and writes of large blocks, in this order, depending on what is available.
+
+    Parameters
+    ----------
+    source_file : file object
+        File opened for reading in binary mode.
+    destination_file : file object
+        File opened for writing in binary mode.
+    start : int
+        Start byte offset in source_file.
+    length : int
+        Number of bytes.
+    """
+    source_fd = source_file.fileno()
+    destination_fd = destination_file.fileno()
+    for name in ('copy_file_range', 'sendfile'):
+        copy = getattr(os, name, None)
+        if copy is None:
+            continue
+        try:
+            while length > 0:
+                if name == 'sendfile':
+                    copied = copy(destination_fd, source_fd, start, min(length, 1073741824))
+                else:
+                    copied = copy(source_fd, destination_fd, min(length, 1073741824), start)
+                if copied == 0:  # end of source_file
+                    return
+                start += copied
+                length -= copied
+            return
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED_COPY_ERRNOS:
+                raise
+    source_file.seek(start)
+    while length > 0:
+        block = source_file.read(min(length, _COPY_BLOCK_SIZE))
+        if not block:
+            return
+        _write_fd(destination_fd, block)
+        length -= len(block)
+
+
+def _write_fd(fd, data):
+    """
+    Writes all of data to a file descriptor.
+    """
+    data = memoryview(data)
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def extract_fastas(fasta_path, ids, output, fai_path=None, ignore_missing=False):
+    """
+    Copies the FASTA sequences with the given IDs from a FASTA file to output, verbatim
+    (FASTA sequences are not parsed nor re-formatted), in the order of ids.
+
+    The byte range of each FASTA sequence is located with the .fai index of the FASTA file, if it exists
+    (only the definition lines are read), or by scanning the lines of the FASTA file otherwise.
+    Byte ranges are then copied with os.copy_file_range, os.sendfile or large reads, so extraction is I/O bound.
+
+    ex:
+        > import fastaparser
+        > fastaparser.extract_fastas('uniprot.fasta', ['sp|P12345|AATM_RABIT', 'sp|P69905|HBA_HUMAN'], 'subset.fasta')
+        2
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the (uncompressed) FASTA file.
+    ids : iterable of str
+        IDs of the FASTA sequences to extract (first word of the definition line, without '>', as in .fai indexes).
+    output : str or file object
+        Path of the output FASTA file, or a file object opened for writing in binary mode (with a file descriptor).
+    fai_path : str or None, optional
+        Path of the .fai index of the FASTA file. None uses fasta_path + '.fai', if it exists.
+    ignore_missing : bool, optional
+        If IDs not found in the FASTA file are ignored (True) or raise KeyError (False).
+
+    Returns
+    -------
+    int
+        Number of FASTA sequences copied.
+
+    Raises
+    ------
+    TypeError
+        If fasta_path is not a path to a file, ids is not an iterable of str, output is not a path or a binary file
+        object or fai_path is not a path to a .fai index.
+    KeyError
+        If ignore_missing is False and any ID is not found in the FASTA file (nothing is copied).
+    """
+    if not isinstance(fasta_path, str) or not os.path.isfile(fasta_path):
+        raise TypeError('fasta_path must be the path of a FASTA file')
+    if isinstance(ids, str):
+        raise TypeError('ids must be an iterable of str')
+    try:
+        ids = list(ids)
+    except TypeError:
+        raise TypeError('ids must be an iterable of str')
+    if not all(isinstance(id_, str) for id_ in ids):
+        raise TypeError('ids must be an iterable of str')
+    if not isinstance(output, str):
+        try:
+            output.fileno()
+        except (AttributeError, OSError):
+            raise TypeError('output must be a path or a file object opened for writing in binary mode')
+        if isinstance(output, io.TextIOBase):
+            raise TypeError('output must be a path or a file object opened for writing in binary mode')
+    if fai_path is None and os.path.isfile(fasta_path + '.fai'):
+        fai_path = fasta_path + '.fai'
+    if fai_path is not None and (not isinstance(fai_path, str) or not os.path.isfile(fai_path)):
+        raise TypeError('fai_path must be the path of a .fai index')
+
+    with open(fasta_path, 'rb') as fasta_file:
+        wanted_ids = set(ids)
+        ranges = {}
+        for id_, start, end in _iter_record_ranges(fasta_file, fai_path):
+            if id_ in wanted_ids and id_ not in ranges:
+                ranges[id_] = (start, end)
+        missing_ids = wanted_ids.difference(ranges)
+        if missing_ids and not ignore_missing:
+            raise KeyError('%d IDs not found in %s, ex: %r' % (len(missing_ids), fasta_path, next(iter(missing_ids))))
+
+        # adjacent byte ranges are copied at once
+        merged_ranges = []
+        for id_ in ids:
+            if id_ in ranges:
+                start, end = ranges[id_]
+                if merged_ranges and merged_ranges[-1][1] == start:
+                    merged_ranges[-1][1] = end
+                else:
+                    merged_ranges.append([start, end])
+
+        output_file = open(output, 'wb') if isinstance(output, str) else output
+        try:
+            output_file.flush()  # copies are made directly to the file descriptor
+            for start, end in merged_ranges:
+                _copy_range(fasta_file, output_file, start, end - start)
+                fasta_file.seek(end - 1)
+                if fasta_file.read(1) != b'\n':  # last line of the FASTA file, without a newline
+                    _write_fd(output_file.fileno(), b'\n')
+        finally:
+            if isinstance(output, str):
+                output_file.close()
+    return sum(1 for id_ in ids if id_ in ranges)
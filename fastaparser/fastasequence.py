@@ -5,13 +5,119 @@
 FastaSequence - Represents a single DNA/RNA/aminoacid FASTA sequence.
 """
 
+import re
 import warnings
+from collections import namedtuple
 from .constants import LETTER_CODES, AMINOACIDS_NOT_IN_NUCLEOTIDES
+from .headers import _parse_header, _schemas_validator
 from .lettercode import LetterCode
+from .parsedefinitionline import ParseDefinitionLine
 
 
 warnings.simplefilter("always")  # show warnings everytime instead of only the first time they happen
 
+# aminoacid letter codes not in nucleotides, in both cases (FastaSequence upper cases every letter code),
+# as a single character class so that a sequence is scanned only once
+_AMINOACIDS_NOT_IN_NUCLEOTIDES_ANY_CASE = re.compile('[%s]' % re.escape(''.join(
+    sorted(AMINOACIDS_NOT_IN_NUCLEOTIDES) +
+    sorted(letter_code.lower() for letter_code in AMINOACIDS_NOT_IN_NUCLEOTIDES if letter_code.isalpha()))))
+
+# objects generated by Reader's 'quick' parse method and by Reader.stream
+# (defined at module level so that they can be pickled, ex: to be sent to other processes)
+Fasta = namedtuple('Fasta', ['header', 'sequence'])
+FastaChunks = namedtuple('FastaChunks', ['header', 'chunks'])
+
+
+def _is_aminoacid_sequence(string_sequence):
+    """
+    Checks for the presence of letter codes that can only represent aminoacids, in upper or lower case.
+    The whole string is scanned once, with a precompiled character class regex (C speed).
+
+    Parameters
+    ----------
+    string_sequence: str
+        String of characters representing a DNA, RNA or aminoacid sequence.
+
+    Returns
+    -------
+    bool
+        True if string_sequence contains aminoacid-only letter codes, False otherwise.
+    """
+    return _AMINOACIDS_NOT_IN_NUCLEOTIDES_ANY_CASE.search(string_sequence) is not None
+
+
+def _wrap_sequence(sequence, max_characters_per_line):
+    """
+    Splits a sequence into lines by slicing a single string (instead of joining slices of LetterCode objects).
+
+    Parameters
+    ----------
+    sequence : str
+        Sequence.
+    max_characters_per_line : int
+        Maximum number of characters per line (positive).
+
+    Returns
+    -------
+    str
+        Lines of the sequence, separated by '\n'.
+    """
+    return '\n'.join([sequence[start:start + max_characters_per_line]
+                      for start in range(0, len(sequence), max_characters_per_line)])
+
+
+def _restore_fasta_sequence(sequence, id_, description, sequence_type, inferred_type):
+    """
+    Rebuilds a FastaSequence from its pickled or serialized fields (see FastaSequence.__reduce__).
+
+    Parameters
+    ----------
+    sequence : str
+        Sequence as string.
+    id_ : str
+        ID portion of the definition line (header).
+    description : str
+        Description portion of the definition line (header).
+    sequence_type : 'nucleotide', 'aminoacid' or None
+        Type of sequence.
+    inferred_type : bool
+        If sequence_type was inferred.
+
+    Returns
+    -------
+    FastaSequence
+    """
+    fasta_sequence = FastaSequence(sequence, '', description, sequence_type)
+    # id_ is already normalized (normalizing it again would remove a leading '>', ex: from id '>>x')
+    fasta_sequence._id = id_  # pylint: disable=protected-access
+    fasta_sequence._inferred_type = inferred_type  # pylint: disable=protected-access
+    return fasta_sequence
+
+
+def _fasta_sequence_from_definition_line(sequence, definition_line, sequence_type=None, infer_type=False):
+    """
+    Builds a FastaSequence that keeps its raw definition line, which is only parsed and normalized into id and
+    description the first time either of them is needed (used by Reader's 'rich' parse method).
+
+    Parameters
+    ----------
+    sequence : str
+        Sequence as string.
+    definition_line : str
+        Definition line (id + description), with or without '>' at the beginning.
+    sequence_type : 'nucleotide', 'aminoacid' or None, optional
+        Type of sequence.
+    infer_type : bool, optional
+        If FastaSequence should try to infer aminoacid sequence type.
+
+    Returns
+    -------
+    FastaSequence
+    """
+    fasta_sequence = FastaSequence(sequence, sequence_type=sequence_type, infer_type=infer_type)
+    fasta_sequence._definition_line = definition_line  # pylint: disable=protected-access
+    return fasta_sequence
+
 
 class FastaSequence:
     """
@@ -51,6 +157,8 @@ class FastaSequence:
         Returns a formatted FASTA sequence (only the sequence, without the definition line).
     formatted_fasta()
         Returns a formatted FASTA (definition line and sequence).
+    header_fields(schemas=None)
+        Returns the structured fields of the definition line (accession, database, gene, organism, taxon, ...).
     sequence_as_string()
         Returns the sequence as string.
     reverse()
@@ -59,7 +167,8 @@ class FastaSequence:
     Raises
     ------
     TypeError
-        When calling __init__, if sequence, id_, description, sequence_type or infer_type are of the wrong type.
+        When calling __init__, if sequence, id_, description, sequence_type, infer_type or infer_sample_size are of
+        the wrong type.
         When calling from_fastasequence(), if fastasequence is of the wrong type.
         When setting id, if id_value is not str.
         When setting description, if description_value is not str.
@@ -70,10 +179,12 @@ class FastaSequence:
         When calling count_letter_codes(), if letter_codes is not an iterable or None.
         When calling count_letter_codes_degenerate(), if self._sequence_type is not explicitly defined.
         When calling formatted_sequence(), if max_characters_per_line is not an int.
+        When calling header_fields(), if schemas is of the wrong type.
         When calling __getitem__, if item is not an int/slice or the sliced sequence is empty.
     """
 
-    def __init__(self, sequence, id_='', description='', sequence_type=None, infer_type=False):
+    def __init__(self, sequence, id_='', description='', sequence_type=None, infer_type=False,
+                 infer_sample_size=None):
         """
         Initializes FASTA sequence.
 
@@ -95,34 +206,42 @@ class FastaSequence:
             Indicates if FastaSequence should try to infer aminoacid sequence type.
             If True, FastaSequence will analyse the whole sequence, in the worst case scenario,
             and can only identify aminoacid sequences.
+        infer_sample_size : int or None, optional
+            If infer_type is True, only the first infer_sample_size letter codes are analysed.
+            None analyses the whole sequence.
 
         Raises
         ------
         TypeError
-            If sequence, id_, description, sequence_type or infer_type are of the wrong type.
+            If sequence, id_, description, sequence_type, infer_type or infer_sample_size are of the wrong type.
         """
+        self._definition_line = None  # raw definition line not parsed yet (see _fasta_sequence_from_definition_line)
         self._update_id(id_)
         self._update_description(description)
         self._update_sequence_type(sequence_type, update_letter_code_objects=False)
+        inferred_type = False
+
+        if infer_sample_size is not None and (not isinstance(infer_sample_size, int)
+                                              or isinstance(infer_sample_size, bool) or infer_sample_size <= 0):
+            raise TypeError('infer_sample_size must be a positive int or None')
 
         if isinstance(sequence, str) and len(sequence) > 0:
             if isinstance(infer_type, bool):
                 if infer_type:
-                    self._sequence_type = self._infer_sequence_type(sequence)
+                    sample = sequence if infer_sample_size is None else sequence[:infer_sample_size]
+                    sequence_type = self._infer_sequence_type(sample)
+                    inferred_type = self._inferred_type
                     # if infer_type is False there is no need to set _inferred_type as False
                     # as it is already set as such in _update_sequence_type
             else:
                 raise TypeError('infer_type must be bool')
 
-            # _sequence = [LetterCode, ...]
-            # _counts = {letter: count, ...}
-            self._sequence, self._counts = self._build_letter_code_sequence_and_counts(sequence)
+            self._sequence_type = sequence_type
+            letter_codes, counts = self._build_letter_code_sequence_and_counts(sequence)
         else:
             raise TypeError('sequence must be a non empty str')
 
-        self._current_iterator = None
-        self._gc = None
-        self._at = None
+        self._init_fields(letter_codes, counts, sequence.upper(), id_, description, sequence_type, inferred_type)
 
     @classmethod
     def from_fastasequence(cls, fastasequence):
@@ -154,6 +273,8 @@ class FastaSequence:
     @property
     def id(self):
         """return id."""
+        if self._definition_line is not None:
+            self._parse_raw_definition_line()
         return self._id
 
     @id.setter
@@ -185,6 +306,8 @@ class FastaSequence:
     @property
     def description(self):
         """return description."""
+        if self._definition_line is not None:
+            self._parse_raw_definition_line()
         return self._description
 
     @description.setter
@@ -216,6 +339,8 @@ class FastaSequence:
     @property
     def sequence(self):
         """return sequence."""
+        # the list can be changed from outside from now on, so the string is no longer kept (see sequence_as_string)
+        self._sequence_string = None
         return self._sequence
 
     @property
@@ -292,9 +417,9 @@ class FastaSequence:
                 complement_sequence = ''.join([letter.complement().letter_code for letter in self._sequence])
                 reversed_text = ''
 
-            space = ' ' if len(self._description) > 0 else ''
+            space = ' ' if len(self.description) > 0 else ''
             complement_description = '%s[%sCOMPLEMENT]' % (space, reversed_text)
-            return FastaSequence(complement_sequence, self._id, self._description + complement_description,
+            return FastaSequence(complement_sequence, self.id, self.description + complement_description,
                                  self._sequence_type)
         raise TypeError('reverse must be a bool')
 
@@ -401,9 +526,10 @@ class FastaSequence:
         TypeError
             If letter_codes is not an iterable or None.
         """
+        counts = self._letter_code_counts()
         if letter_codes is None or not letter_codes:
-            return self._counts
-        return {letter: self._counts.get(letter, 0) for letter in iter(letter_codes)}
+            return counts
+        return {letter: counts.get(letter, 0) for letter in iter(letter_codes)}
 
     def count_letter_codes_degenerate(self):
         """
@@ -421,7 +547,7 @@ class FastaSequence:
             If self._sequence_type is not explicitly defined.
         """
         if self._sequence_type in LETTER_CODES:
-            return {letter: counts for letter, counts in self._counts.items()
+            return {letter: counts for letter, counts in self._letter_code_counts().items()
                     if letter in LETTER_CODES[self._sequence_type][1]}
         raise TypeError('To count degenerate letter codes the sequence_type must be '
                         'explicitly \'%s\'' % '\' or \''.join(LETTER_CODES))
@@ -435,7 +561,8 @@ class FastaSequence:
         str
             FASTA definition line properly formatted.
         """
-        return '>%s %s' % (self._id, self._description) if self._description else '>' + self._id
+        id_, description = self.id, self.description
+        return '>%s %s' % (id_, description) if description else '>' + id_
 
     def formatted_sequence(self, max_characters_per_line=70):
         """
@@ -462,14 +589,7 @@ class FastaSequence:
         if isinstance(max_characters_per_line, int):
             max_characters_per_line = 1 if max_characters_per_line <= 0 else max_characters_per_line
 
-            current_character_count = 0
-            final_sequence = ''
-            while current_character_count < len(self._sequence):
-                temp_sequence = self._sequence[current_character_count: current_character_count
-                                               + max_characters_per_line]
-                final_sequence += ''.join(map(str, temp_sequence)) + '\n'
-                current_character_count += max_characters_per_line
-            return final_sequence[:-1]  # remove last '\n'
+            return _wrap_sequence(self.sequence_as_string(), max_characters_per_line)
         raise TypeError('max_characters_per_line must be an int')
 
     def formatted_fasta(self):
@@ -483,17 +603,47 @@ class FastaSequence:
         """
         return self.formatted_definition_line() + '\n' + self.formatted_sequence()
 
+    def header_fields(self, schemas=None):
+        """
+        Returns the structured fields of the definition line (accession, database, gene, organism, taxon and any other
+        field, such as key=value pairs), extracted by the first header schema that matches it.
+        Fields are parsed on the first call and cached until id or description change.
+
+        Parameters
+        ----------
+        schemas : HeaderSchema, iterable of HeaderSchema or None, optional
+            Header schemas, tried in order. None uses DEFAULT_HEADER_SCHEMAS (UniProt, Ensembl and NCBI).
+
+        Returns
+        -------
+        HeaderFields or None
+            None if no schema matches the definition line.
+
+        Raises
+        ------
+        TypeError
+            If schemas is of the wrong type.
+        """
+        schemas = _schemas_validator(schemas)
+        if self._header_fields is None or self._header_fields[0] != schemas:
+            header = '%s %s' % (self.id, self.description) if self.description else self.id
+            self._header_fields = (schemas, _parse_header(header, schemas))
+        return self._header_fields[1]
+
     def sequence_as_string(self):
         """
         Returns the sequence as string.
-        Converts the list of LetterCode objects to a single string.
+        The string is kept since the FastaSequence was created, so it is not rebuilt from the LetterCode objects,
+        unless the list of LetterCode objects was handed out (sequence), as it can then be changed.
 
         Returns
         -------
         str
             Sequence as string.
         """
-        return ''.join(map(str, self._sequence))
+        if self._sequence_string is None:
+            return ''.join([letter_code.letter_code for letter_code in self._sequence])
+        return self._sequence_string
 
     def reverse(self):
         """
@@ -523,13 +673,10 @@ class FastaSequence:
         TypeError
             If id_ is not str.
         """
-        if isinstance(id_, str):
-            id_ = ''.join(id_.strip().replace(' ', '_').split())  # remove spaces and newlines
-            if id_.startswith('>'):  # remove '>' if any
-                id_ = id_[1:]
-            self._id = id_
-        else:
-            raise TypeError('id_ must be str')
+        if self._definition_line is not None:  # the description is parsed first, so it isn't lost
+            self._parse_raw_definition_line()
+        self._id = ParseDefinitionLine._normalize_id(id_)  # pylint: disable=protected-access
+        self._header_fields = None  # (schemas, HeaderFields) cached by header_fields()
 
     def _update_description(self, description):
         """
@@ -547,10 +694,22 @@ class FastaSequence:
         TypeError
             If description is not str.
         """
-        if isinstance(description, str):
-            self._description = ' '.join(description.strip().split())  # remove extra spaces and newlines
-        else:
-            raise TypeError('description must be str')
+        if self._definition_line is not None:  # the id is parsed first, so it isn't lost
+            self._parse_raw_definition_line()
+        self._description = ParseDefinitionLine._normalize_description(  # pylint: disable=protected-access
+            description)
+        self._header_fields = None
+
+    def _parse_raw_definition_line(self):
+        """
+        Parses the raw definition line (see _fasta_sequence_from_definition_line) into the normalized id and
+        description.
+        """
+        id_, description = ParseDefinitionLine._parse_definition_line(  # pylint: disable=protected-access
+            self._definition_line)
+        self._definition_line = None
+        self._update_id(id_)
+        self._update_description(description)
 
     def _update_sequence_type(self, sequence_type, update_letter_code_objects=True):
         """
@@ -580,6 +739,92 @@ class FastaSequence:
         else:
             raise TypeError('update_letter_code_objects must be a bool')
 
+    def _letter_code_counts(self):
+        """
+        Returns the counts of each letter code, counted (over the sequence as string) on the first call for slices.
+
+        Returns
+        -------
+        dict of letter code counts
+        """
+        if self._counts is None:
+            string_sequence = self.sequence_as_string()
+            self._counts = {letter_code: string_sequence.count(letter_code)
+                            for letter_code in dict.fromkeys(string_sequence)}  # in order of first occurrence
+        return self._counts
+
+    def _init_fields(self, letter_codes, counts, sequence_string, id_, description, sequence_type,
+                     inferred_type=False):
+        """
+        Sets every field of a new FastaSequence (used by __init__ and by _slice).
+
+        Parameters
+        ----------
+        letter_codes : list of LetterCode
+            Sequence of LetterCode objects.
+        counts : dict of letter code counts or None
+            Counts of each letter code. None counts them when needed.
+        sequence_string : str
+            Sequence as string (upper case).
+        id_ : str
+            ID portion of the definition line (header).
+        description : str
+            Description portion of the definition line (header).
+        sequence_type : 'nucleotide', 'aminoacid' or None
+            Type of sequence.
+        inferred_type : bool, optional
+            If sequence_type was inferred.
+
+        Raises
+        ------
+        TypeError
+            If id_, description or sequence_type are of the wrong type.
+        """
+        self._definition_line = None  # raw definition line not parsed yet (see _fasta_sequence_from_definition_line)
+        self._update_id(id_)
+        self._update_description(description)
+        self._update_sequence_type(sequence_type, update_letter_code_objects=False)
+        self._inferred_type = inferred_type
+        self._sequence = letter_codes  # [LetterCode, ...]
+        self._counts = counts  # {letter: count, ...} (None until needed, for slices)
+        self._current_iterator = None
+        self._gc = None
+        self._at = None
+        # the string is kept (much smaller than the LetterCode objects), which makes sequence_as_string(), __eq__ and
+        # __hash__ run at C speed, until the list of LetterCode objects is handed out (None, see sequence)
+        self._sequence_string = sequence_string
+
+    def _slice(self, item, description):
+        """
+        Builds the FastaSequence of a slice of the sequence in O(slice length): only the sliced LetterCode objects
+        are copied (so changes to them never reach the FastaSequence sliced, or vice versa) and the sequence as
+        string is sliced. Letter code counts are only counted when needed.
+
+        Parameters
+        ----------
+        item : slice
+            Slice of the sequence.
+        description : str
+            Description of the new FastaSequence.
+
+        Returns
+        -------
+        FastaSequence
+
+        Raises
+        ------
+        TypeError
+            If the sliced sequence is empty.
+        """
+        letter_codes = self._sequence[item]
+        if len(letter_codes) == 0:
+            raise TypeError('Slice resulted in an empty sequence. FastaSequence must have a non-empty sequence')
+        letter_codes = [LetterCode.from_lettercode(letter_code_object) for letter_code_object in letter_codes]
+        fasta_sequence = FastaSequence.__new__(FastaSequence)
+        fasta_sequence._init_fields(  # pylint: disable=protected-access
+            letter_codes, None, self.sequence_as_string()[item], self.id, description, self._sequence_type)
+        return fasta_sequence
+
     def _build_letter_code_sequence_and_counts(self, string_sequence):
         """
         Iterates over the sequence and builds a list of LetterCode objects while counting the number of letter codes.
@@ -606,7 +851,7 @@ class FastaSequence:
         """
         Tries to infer aminoacid sequence type.
         Tests for the presence of letter codes that can only represent aminoacids
-        (ie, aminoacids letter codes not in nucleotides letter codes).
+        (ie, aminoacids letter codes not in nucleotides letter codes), in upper or lower case.
         The reverse (testing for nucleotides) is not 100% accurate because there are no letter codes
         which belong solely to nucleotide type sequences.
         Assumes no unknown letter codes.
@@ -621,10 +866,9 @@ class FastaSequence:
         'aminoacid' or existing value (can be None)
             Inferred type 'aminoacid', existing value otherwise.
         """
-        for letter_code in string_sequence:
-            if letter_code in AMINOACIDS_NOT_IN_NUCLEOTIDES:
-                self._inferred_type = True
-                return 'aminoacid'
+        if _is_aminoacid_sequence(string_sequence):
+            self._inferred_type = True
+            return 'aminoacid'
         # self._inferred_type = False  # _inferred_type is already False when this function is called in __init__
         return self._sequence_type  # returns the already set value
 
@@ -632,22 +876,18 @@ class FastaSequence:
         """
         Iterates over the sequence.
         Returns a new iterator of the sequence (from the beginning) every time __iter__ is called.
+        Each iterator keeps its own position, so multiple iterators (ex: in different threads) don't interfere.
         """
-        def iter_sequence():
-            for letter_code in self._sequence:
-                yield letter_code
-        self._current_iterator = iter_sequence()
+        self._current_iterator = iter(self._sequence)
         return self._current_iterator
 
     def __reversed__(self):
         """
         Iterates over the sequence in reverse.
         Returns a new iterator of the reversed sequence (from the end) every time __reversed__ is called.
+        Each iterator keeps its own position, so multiple iterators (ex: in different threads) don't interfere.
         """
-        def iter_sequence_reversed():
-            for letter_code in reversed(self._sequence):
-                yield letter_code
-        self._current_iterator = iter_sequence_reversed()
+        self._current_iterator = reversed(self._sequence)
         return self._current_iterator
 
     def __next__(self):
@@ -662,7 +902,8 @@ class FastaSequence:
     def __getitem__(self, item):
         """
         Indexing returns the LetterCode object at the given index.
-        Slicing returns a new FastaSequence copy of self with the sliced sequence of LetterCode objects.
+        Slicing returns a new FastaSequence with the sliced sequence of LetterCode objects, in O(slice length)
+        (only the sliced LetterCode objects are copied).
         The description line is updated to reflect the slices made to the original sequence.
         Slices can't return an empty sequence.
 
@@ -678,14 +919,11 @@ class FastaSequence:
             FastaSequence with a sliced sequence of LetterCode objects.
         """
         if isinstance(item, int):
-            return self._sequence[item]
+                return self._sequence[item]
         if isinstance(item, slice):
-            new_sequence = self.sequence_as_string()[item]
-            if len(new_sequence) == 0:
-                raise TypeError('Slice resulted in an empty sequence. FastaSequence must have a non-empty sequence')
             slice_text = '[SLICE OF ORIGINAL: %s:%s:%s]' % (item.start, item.stop, item.step)
             new_description = '%s %s' % (self.description, slice_text) if self.description else slice_text
-            return FastaSequence(new_sequence, self.id, new_description, self.sequence_type)
+            return self._slice(item, new_description)
         raise TypeError('Indices must be integers or slices')
 
     def __eq__(self, other):
@@ -693,18 +931,35 @@ class FastaSequence:
         Two FastaSequence objects are equal if they represent the same sequence.
         A FastaSequence is equal to a string if it represents the same string sequence.
         A FastaSequence is equal to a list if it represents the same LetterCode sequence.
+        Sequences are compared as strings (C speed), after comparing their lengths.
         """
         if isinstance(other, FastaSequence):
-            return self._sequence == other.sequence
+            return len(self._sequence) == len(other) and self.sequence_as_string() == other.sequence_as_string()
         if isinstance(other, str):
             return self.sequence_as_string() == other
         if isinstance(other, list):
             return self._sequence == other
         return False
 
+    def __hash__(self):
+        """
+        Hash of the sequence as string (consistent with __eq__, so FastaSequence objects can be used in sets and as dict
+        keys, ex: to remove duplicated sequences). While the sequence as string is kept (see sequence_as_string), the
+        string caches its own hash, so the sequence is only hashed once.
+        """
+        return hash(self.sequence_as_string())
+
     def __len__(self):
         return len(self._sequence)
 
+    def __reduce__(self):
+        """
+        Pickles a FastaSequence as (sequence as string, id, description, sequence_type, inferred_type),
+        instead of a list of LetterCode objects.
+        """
+        return _restore_fasta_sequence, (self.sequence_as_string(), self.id, self.description,
+                                          self._sequence_type, self._inferred_type)
+
     def __repr__(self):
         return 'FastaSequence(%r)' % self.sequence_as_string()
 
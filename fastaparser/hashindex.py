@@ -0,0 +1,265 @@
+#!python
+# coding: utf-8
+
+"""
+HashIndex - Persistent, memory mapped hash index (.fhi) of the FASTA sequences of a FASTA file, by ID.
+
+.fhi (little-endian):
+    header: magic (b'FHI2'), number of slots (uint32, power of 2), number of FASTA sequences (uint64),
+        size of the FASTA file (uint64), modification time of the FASTA file (int64, nanoseconds)
+    slots (open addressing, linear probing on the crc32 of the ID), each:
+        offset of the ID in the ID area (uint64), byte offset of the FASTA sequence (uint64),
+        byte length of the FASTA sequence (uint64, 0 if the slot is empty), byte length of the ID (uint32),
+        crc32 of the ID (uint32)
+    ID area: utf-8 encoded IDs
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from .extract import _iter_record_ranges
+
+
+_MAGIC = b'FHI2'
+_HEADER = struct.Struct('<4sIQQq')
+_SLOT = struct.Struct('<QQQII')
+_MAX_LOAD_FACTOR = 0.5
+
+
+def build_hash_index(fasta_path, index_path=None, fai_path=None):
+    """
+    Builds the .fhi hash index of a FASTA file, mapping the ID of each FASTA sequence
+    (first word of its definition line, without '>') to its byte range (from its definition line to the end of its
+    last sequence line). If an ID is repeated, only its first FASTA sequence is indexed.
+
+    ex:
+        > import fastaparser
+        > fastaparser.build_hash_index('uniprot.fasta')
+        'uniprot.fasta.fhi'
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the (uncompressed) FASTA file.
+    index_path : str or None, optional
+        Path of the .fhi index. None uses fasta_path + '.fhi'.
+    fai_path : str or None, optional
+        Path of the .fai index of the FASTA file, used to find the FASTA sequences without scanning every line.
+        None uses fasta_path + '.fai', if it exists.
+
+    Returns
+    -------
+    str
+        Path of the .fhi index.
+
+    Raises
+    ------
+    TypeError
+        If fasta_path is not a path to a file, index_path is not a str or None
+        or fai_path is not a path to a .fai index.
+    """
+    if not isinstance(fasta_path, str) or not os.path.isfile(fasta_path):
+        raise TypeError('fasta_path must be the path of a FASTA file')
+    if index_path is None:
+        index_path = fasta_path + '.fhi'
+    elif not isinstance(index_path, str):
+        raise TypeError('index_path must be a str or None')
+    if fai_path is None and os.path.isfile(fasta_path + '.fai'):
+        fai_path = fasta_path + '.fai'
+    if fai_path is not None and (not isinstance(fai_path, str) or not os.path.isfile(fai_path)):
+        raise TypeError('fai_path must be the path of a .fai index')
+
+    with open(fasta_path, 'rb') as fasta_file:
+        stat = os.fstat(fasta_file.fileno())
+        records = [(id_.encode('utf-8'), start, end - start)
+                   for id_, start, end in _iter_record_ranges(fasta_file, fai_path)]
+
+    slot_count = 8
+    while slot_count * _MAX_LOAD_FACTOR < len(records):
+        slot_count *= 2
+    mask = slot_count - 1
+    slots = bytearray(slot_count * _SLOT.size)
+    ids = []
+    ids_size = 0
+    indexed_ids = set()
+    for id_, offset, length in records:
+        if id_ in indexed_ids:
+            continue
+        indexed_ids.add(id_)
+        id_crc32 = zlib.crc32(id_)
+        slot = id_crc32 & mask
+        while _SLOT.unpack_from(slots, slot * _SLOT.size)[2]:  # linear probing until an empty slot
+            slot = (slot + 1) & mask
+        _SLOT.pack_into(slots, slot * _SLOT.size, ids_size, offset, length, len(id_), id_crc32)
+        ids.append(id_)
+        ids_size += len(id_)
+
+    with open(index_path, 'wb') as index_file:
+        index_file.write(_HEADER.pack(_MAGIC, slot_count, len(indexed_ids), stat.st_size, stat.st_mtime_ns))
+        index_file.write(slots)
+        index_file.writelines(ids)
+    return index_path
+
+
+class HashIndex:
+    """
+    Persistent hash index (.fhi, see build_hash_index) of the FASTA sequences of a FASTA file, by ID.
+    The index is memory mapped, so opening it is instantaneous and takes no memory regardless of the number of
+    FASTA sequences, and each lookup only reads the few slots probed (the OS caches the pages used).
+    Used by Reader to get FASTA sequences by ID (reader[id]).
+
+    ex:
+        > import fastaparser
+        > with fastaparser.HashIndex('uniprot.fasta.fhi') as hash_index:
+        >     hash_index['sp|P69905|HBA_HUMAN']
+        (15637, 243)
+
+    Attributes
+    ----------
+    index_path : str
+        Path of the .fhi index.
+    fasta_size : int
+        Size, in bytes, of the FASTA file when the index was built.
+    fasta_mtime_ns : int
+        Modification time, in nanoseconds, of the FASTA file when the index was built.
+
+    Methods
+    -------
+    get(id, default=None)
+        Returns the byte range of the FASTA sequence with the given ID, or default if not indexed.
+    close()
+        Closes the index.
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if index_path is not a path to a .fhi index.
+        When calling __getitem__ or get(), if id is not a str.
+    KeyError
+        When calling __getitem__, if id is not indexed.
+    """
+
+    def __init__(self, index_path):
+        """
+        Opens and memory maps a .fhi index.
+
+        Parameters
+        ----------
+        index_path : str
+            Path of the .fhi index.
+
+        Raises
+        ------
+        TypeError
+            If index_path is not a path to a .fhi index.
+        """
+        if not isinstance(index_path, str) or not os.path.isfile(index_path):
+            raise TypeError('index_path must be the path of a .fhi index')
+        with open(index_path, 'rb') as index_file:
+            try:
+                self._mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise TypeError('%s is not a .fhi index' % index_path)
+        if len(self._mmap) < _HEADER.size:
+            self._mmap.close()
+            raise TypeError('%s is not a .fhi index' % index_path)
+        magic, self._slot_count, self._length, self._fasta_size, self._fasta_mtime_ns = _HEADER.unpack_from(
+            self._mmap)
+        if magic != _MAGIC or len(self._mmap) < _HEADER.size + self._slot_count * _SLOT.size:
+            self._mmap.close()
+            raise TypeError('%s is not a .fhi index' % index_path)
+        self._index_path = index_path
+        self._mask = self._slot_count - 1
+        self._ids_offset = _HEADER.size + self._slot_count * _SLOT.size
+
+    @property
+    def index_path(self):
+        """return index_path."""
+        return self._index_path
+
+    @property
+    def fasta_size(self):
+        """return fasta_size."""
+        return self._fasta_size
+
+    @property
+    def fasta_mtime_ns(self):
+        """return fasta_mtime_ns."""
+        return self._fasta_mtime_ns
+
+    def get(self, id_, default=None):
+        """
+        Returns the byte range of the FASTA sequence with the given ID, or default if it is not indexed.
+
+        Parameters
+        ----------
+        id_ : str
+            ID of the FASTA sequence.
+        default : object, optional
+            Returned if id_ is not indexed.
+
+        Returns
+        -------
+        (int, int) or default
+            Byte offset and byte length of the FASTA sequence, from its definition line to the end of its last
+            sequence line.
+
+        Raises
+        ------
+        TypeError
+            If id_ is not a str.
+        """
+        if not isinstance(id_, str):
+            raise TypeError('id must be a str')
+        id_ = id_.encode('utf-8')
+        id_crc32 = zlib.crc32(id_)
+        slot = id_crc32 & self._mask
+        while True:
+            id_offset, offset, length, id_length, slot_crc32 = _SLOT.unpack_from(
+                self._mmap, _HEADER.size + slot * _SLOT.size)
+            if not length:  # empty slot
+                return default
+            if slot_crc32 == id_crc32 and id_length == len(id_):
+                id_start = self._ids_offset + id_offset
+                if self._mmap[id_start:id_start + id_length] == id_:
+                    return offset, length
+            slot = (slot + 1) & self._mask
+
+    def close(self):
+        """
+        Closes the index.
+        HashIndex objects can also be used as context managers, which call close() on exit.
+        """
+        self._mmap.close()
+
+    def __getitem__(self, id_):
+        """
+        Returns the byte range (offset, length) of the FASTA sequence with the given ID.
+
+        Raises
+        ------
+        TypeError
+            If id_ is not a str.
+        KeyError
+            If id_ is not indexed.
+        """
+        byte_range = self.get(id_)
+        if byte_range is None:
+            raise KeyError(id_)
+        return byte_range
+
+    def __contains__(self, id_):
+        return isinstance(id_, str) and self.get(id_) is not None
+
+    def __len__(self):
+        return self._length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return 'fastaparser.HashIndex(%s)' % os.path.abspath(self._index_path)
@@ -0,0 +1,362 @@
+#!python
+# coding: utf-8
+
+"""
+Structured parsing of FASTA definition lines (headers) of well known databases (NCBI, UniProt, Ensembl),
+with pluggable, precompiled schemas.
+"""
+
+import io
+import mmap
+import os
+import re
+from collections import namedtuple
+
+
+# fields extracted from a definition line by a HeaderSchema
+# (schema is the name of the schema that matched, fields holds every other field found, ex: key=value pairs)
+HeaderFields = namedtuple('HeaderFields', ['schema', 'accession', 'database', 'gene', 'organism', 'taxon', 'fields'])
+_STANDARD_FIELDS = ('accession', 'database', 'gene', 'organism', 'taxon')
+
+
+class HeaderSchema:
+    """
+    Schema of the definition lines (headers) of a database: a regular expression matched at the start of the
+    definition line and, optionally, a regular expression of key/value pairs searched in the rest of the definition
+    line. Regular expressions are compiled once, when the schema is created.
+
+    Named groups of pattern called accession, database, gene, organism or taxon fill the fields of the same name of
+    HeaderFields. Every other named group and key/value pair goes to HeaderFields.fields.
+
+    ex:
+        > import fastaparser
+        > schema = fastaparser.HeaderSchema('flybase', r'(?P<accession>FBgn\\d+)', r'(\\w+)=([^;]*);',
+        ...                                 field_keys={'organism': 'species'}, defaults={'database': 'FlyBase'})
+        > schema.parse('FBgn0000008 type=gene; species=Dmel;')
+        HeaderFields(schema='flybase', accession='FBgn0000008', database='FlyBase', gene=None, organism='Dmel',
+                     taxon=None, fields={'type': 'gene', 'species': 'Dmel'})
+
+    Attributes
+    ----------
+    name : str
+        Name of the schema.
+
+    Methods
+    -------
+    parse(header)
+        Returns the fields of a definition line, or None if it doesn't match the schema.
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if any parameter is of the wrong type.
+        When calling parse(), if header is not a str.
+    """
+
+    def __init__(self, name, pattern, key_value_pattern=None, field_keys=None, defaults=None):
+        """
+        Compiles a header schema.
+
+        Parameters
+        ----------
+        name : str
+            Name of the schema.
+        pattern : str or compiled regular expression
+            Matched at the start of the definition line (without '>'). Definition lines that don't match it don't
+            follow the schema.
+        key_value_pattern : str, compiled regular expression or None, optional
+            Regular expression with two groups (key and value), searched in the definition line after the match of
+            pattern. The first occurrence of each key is kept.
+        field_keys : dict of {str: str} or None, optional
+            Keys (of named groups or key/value pairs) that fill accession, database, gene, organism or taxon,
+            ex: {'organism': 'OS'}.
+        defaults : dict of {str: str} or None, optional
+            Values of accession, database, gene, organism or taxon when they are not found.
+
+        Raises
+        ------
+        TypeError
+            If any parameter is of the wrong type.
+        """
+        if not isinstance(name, str):
+            raise TypeError('name must be a str')
+        try:
+            pattern = re.compile(pattern)
+        except (TypeError, re.error):
+            raise TypeError('pattern must be a regular expression')
+        if key_value_pattern is not None:
+            try:
+                key_value_pattern = re.compile(key_value_pattern)
+            except (TypeError, re.error):
+                raise TypeError('key_value_pattern must be a regular expression or None')
+            if key_value_pattern.groups != 2:
+                raise TypeError('key_value_pattern must have two groups (key and value)')
+        for parameter_name, parameter in (('field_keys', field_keys), ('defaults', defaults)):
+            if parameter is not None and (not isinstance(parameter, dict) or
+                                          not set(parameter).issubset(_STANDARD_FIELDS) or
+                                          not all(isinstance(value, str) for value in parameter.values())):
+                raise TypeError('%s must be a dict of {%s: str} or None'
+                                % (parameter_name, ', '.join(_STANDARD_FIELDS)))
+
+        self._name = name
+        self._pattern = pattern
+        self._key_value_pattern = key_value_pattern
+        self._field_keys = tuple((field_keys or {}).items())
+        self._defaults = defaults or {}
+        # named groups of pattern that are standard fields (filled directly) or other fields (go to fields)
+        self._standard_groups = tuple(group for group in pattern.groupindex if group in _STANDARD_FIELDS)
+        self._other_groups = tuple(group for group in pattern.groupindex if group not in _STANDARD_FIELDS)
+
+    @property
+    def name(self):
+        """return name."""
+        return self._name
+
+    def parse(self, header):
+        """
+        Returns the fields of a definition line, or None if it doesn't match the schema.
+
+        Parameters
+        ----------
+        header : str
+            Definition line. May contain or not the '>' symbol at the start.
+
+        Returns
+        -------
+        HeaderFields or None
+
+        Raises
+        ------
+        TypeError
+            If header is not a str.
+        """
+        if not isinstance(header, str):
+            raise TypeError('header must be a str')
+        header = header[1:].strip() if header.startswith('>') else header.strip()
+        match = self._pattern.match(header)
+        if match is None:
+            return None
+
+        fields = {}
+        for group in self._other_groups:
+            value = match.group(group)
+            if value is not None:
+                fields[group] = value
+        if self._key_value_pattern is not None:
+            for key, value in self._key_value_pattern.findall(header, match.end()):
+                fields.setdefault(key, value.strip())
+
+        values = dict(self._defaults)
+        for field, key in self._field_keys:
+            if key in fields:
+                values[field] = fields[key]
+        for group in self._standard_groups:
+            value = match.group(group)
+            if value is not None:
+                values[group] = value
+        return HeaderFields(self._name, values.get('accession'), values.get('database'), values.get('gene'),
+                            values.get('organism'), values.get('taxon'), fields)
+
+    def __repr__(self):
+        return 'fastaparser.HeaderSchema(%s)' % self._name
+
+
+# >sp|P69905|HBA_HUMAN Hemoglobin subunit alpha OS=Homo sapiens OX=9606 GN=HBA1 PE=1 SV=2
+UNIPROT_SCHEMA = HeaderSchema(
+    'uniprot',
+    r'(?P<database>sp|tr)\|(?P<accession>[^|\s]+)\|(?P<entry_name>\S+)(?:\s+(?P<protein_name>.*?))?'
+    r'(?=\s+[A-Z]{2}=|\s*$)',
+    r'(?<!\S)([A-Z]{2})=(.*?)(?=\s+[A-Z]{2}=|\s*$)',
+    field_keys={'organism': 'OS', 'taxon': 'OX', 'gene': 'GN'})
+
+# >ENST00000380152.8 cdna chromosome:GRCh38:13:32315508:32400268:1 gene:ENSG00000139618.16 ... gene_symbol:BRCA2
+# description:BRCA2 DNA repair associated [Source:HGNC Symbol;Acc:HGNC:1101]
+# (description is always the last key and its value can have any character)
+ENSEMBL_SCHEMA = HeaderSchema(
+    'ensembl',
+    r'(?P<accession>\S+)\s+(?P<molecule>[a-z_]+(?::\w+)?)\s+'
+    r'(?P<location>(?:chromosome|scaffold|contig|supercontig|primary_assembly|plasmid):\S+)',
+    r'(?<!\S)(\w+):((?<=description:).*|.*?(?=\s+\w+:|\s*$))',
+    field_keys={'gene': 'gene_symbol'},
+    defaults={'database': 'ensembl'})
+
+# >NM_000518.5 Homo sapiens hemoglobin subunit beta (HBB), mRNA
+# >gi|4504349|ref|NP_000509.1| hemoglobin subunit beta [Homo sapiens]
+# >lcl|NC_000011.10_cds_NP_000509.1_1 [gene=HBB] [db_xref=GeneID:3043] [protein=hemoglobin subunit beta]
+# (unprefixed accessions must look like RefSeq or versioned GenBank/EMBL/DDBJ accessions)
+NCBI_SCHEMA = HeaderSchema(
+    'ncbi',
+    r'(?:gi\|(?P<gi>\d+)\|)?'
+    r'(?:(?P<database>ref|gb|emb|dbj|pir|prf|sp|tr|pdb|pat|bbs|bbm|gim|gnl|lcl|tpg|tpe|tpd)\|(?P<accession>[^|\s]+)'
+    r'(?:\|(?P<locus>[^|\s]*))?\|?'
+    r'|(?P<unprefixed_accession>[A-Z]{2}_\d+(?:\.\d+)?|(?!ENS)[A-Z]{1,6}\d{5,}\.\d+)(?=\s|$))'
+    r'(?:(?=.*\[(?P<organism>[^\[\]=]+)\]\s*$))?',
+    r'\[(\w+)=([^\]]*)\]',
+    field_keys={'accession': 'unprefixed_accession', 'gene': 'gene', 'organism': 'organism', 'taxon': 'taxon'},
+    defaults={'database': 'ncbi'})
+
+# schemas tried, in order, when no schemas are given
+DEFAULT_HEADER_SCHEMAS = (UNIPROT_SCHEMA, ENSEMBL_SCHEMA, NCBI_SCHEMA)
+
+
+def _schemas_validator(schemas):
+    """
+    Validates schemas.
+
+    Parameters
+    ----------
+    schemas : iterable of HeaderSchema or None
+        Header schemas. None means DEFAULT_HEADER_SCHEMAS.
+
+    Returns
+    -------
+    tuple of HeaderSchema
+
+    Raises
+    ------
+    TypeError
+        If schemas is not an iterable of HeaderSchema or None.
+    """
+    if schemas is None:
+        return DEFAULT_HEADER_SCHEMAS
+    if isinstance(schemas, HeaderSchema):
+        return (schemas,)
+    try:
+        schemas = tuple(schemas)
+    except TypeError:
+        raise TypeError('schemas must be a HeaderSchema, an iterable of HeaderSchema or None')
+    if not all(isinstance(schema, HeaderSchema) for schema in schemas):
+        raise TypeError('schemas must be a HeaderSchema, an iterable of HeaderSchema or None')
+    return schemas
+
+
+def parse_header(header, schemas=None):
+    """
+    Returns the fields of a definition line (header), extracted by the first schema that matches it.
+
+    ex:
+        > import fastaparser
+        > fields = fastaparser.parse_header('>sp|P69905|HBA_HUMAN Hemoglobin subunit alpha OS=Homo sapiens OX=9606')
+        > fields.accession, fields.organism, fields.taxon
+        ('P69905', 'Homo sapiens', '9606')
+
+    Parameters
+    ----------
+    header : str
+        Definition line. May contain or not the '>' symbol at the start.
+    schemas : HeaderSchema, iterable of HeaderSchema or None, optional
+        Header schemas, tried in order. None uses DEFAULT_HEADER_SCHEMAS (UniProt, Ensembl and NCBI).
+
+    Returns
+    -------
+    HeaderFields or None
+        None if no schema matches header.
+
+    Raises
+    ------
+    TypeError
+        If header is not a str or schemas is of the wrong type.
+    """
+    if not isinstance(header, str):
+        raise TypeError('header must be a str')
+    return _parse_header(header, _schemas_validator(schemas))
+
+
+def _parse_header(header, schemas):
+    """
+    Returns the fields of a definition line, extracted by the first schema that matches it (see parse_header).
+
+    Parameters
+    ----------
+    header : str
+        Definition line.
+    schemas : tuple of HeaderSchema
+        Validated header schemas.
+
+    Returns
+    -------
+    HeaderFields or None
+    """
+    for schema in schemas:
+        fields = schema.parse(header)
+        if fields is not None:
+            return fields
+    return None
+
+
+def _iter_definition_lines(fasta_file):
+    """
+    Iterates over the definition lines of a FASTA file, without reading sequence lines into python objects.
+    FASTA files given by path are memory mapped and searched for b'\\n>' (C speed).
+
+    Parameters
+    ----------
+    fasta_file : str or file object
+        Path of the (uncompressed) FASTA file or FASTA file object, opened in text or binary mode.
+
+    Yields
+    ------
+    str
+        Definition lines, without '>' and newlines.
+    """
+    if not isinstance(fasta_file, str):
+        for line in fasta_file:
+            if isinstance(line, bytes):
+                line = str(line, 'utf-8')
+            if line.startswith('>'):
+                yield line[1:].rstrip('\r\n')
+        return
+
+    with open(fasta_file, 'rb') as file_object:
+        try:
+            fasta_mmap = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with fasta_mmap:
+            # position of the '>' of the next definition line
+            start = 0 if fasta_mmap[:1] == b'>' else fasta_mmap.find(b'\n>') + 1
+            if not start and fasta_mmap[:1] != b'>':
+                return
+            while True:
+                end = fasta_mmap.find(b'\n', start)
+                if end == -1:
+                    end = len(fasta_mmap)
+                yield str(fasta_mmap[start + 1:end], 'utf-8').rstrip('\r')
+                start = fasta_mmap.find(b'\n>', end) + 1
+                if not start:
+                    return
+
+
+def parse_headers(fasta_file, schemas=None):
+    """
+    Iterates over the definition lines (headers) of a FASTA file and their fields, in batch:
+    only definition lines are read (sequence lines are skipped) and each one is parsed once.
+
+    ex:
+        > import fastaparser
+        > taxa = {fields.taxon for header, fields in fastaparser.parse_headers('uniprot.fasta') if fields}
+
+    Parameters
+    ----------
+    fasta_file : str or file object
+        Path of the (uncompressed) FASTA file or FASTA file object, opened in text or binary mode.
+    schemas : HeaderSchema, iterable of HeaderSchema or None, optional
+        Header schemas, tried in order. None uses DEFAULT_HEADER_SCHEMAS (UniProt, Ensembl and NCBI).
+
+    Returns
+    -------
+    iterator of (str, HeaderFields or None)
+        Each definition line (without '>') and its fields (None if no schema matches it).
+
+    Raises
+    ------
+    TypeError
+        If fasta_file is not a path to a file or a file object, or schemas is of the wrong type.
+    """
+    schemas = _schemas_validator(schemas)
+    if isinstance(fasta_file, str):
+        if not os.path.isfile(fasta_file):
+            raise TypeError('fasta_file must be the path of a FASTA file or a file object')
+    elif not isinstance(fasta_file, io.IOBase) and not hasattr(fasta_file, 'readline'):
+        raise TypeError('fasta_file must be the path of a FASTA file or a file object')
+    return ((header, _parse_header(header, schemas)) for header in _iter_definition_lines(fasta_file))
@@ -0,0 +1,111 @@
+#!python
+# coding: utf-8
+
+"""
+FASTA index files (.fai, as generated by samtools faidx) and BGZF index files (.gzi, as generated by bgzip -i).
+
+.fai: one line per FASTA sequence, with tab separated fields:
+    name, sequence length, byte offset of the first letter code, letter codes per line, bytes per line
+.gzi (little-endian): number of entries (uint64), followed by (compressed offset, uncompressed offset) (uint64, uint64)
+    of the start of every BGZF block, except the first one
+"""
+
+import struct
+from collections import namedtuple
+
+
+# entry of a .fai index
+FaiEntry = namedtuple('FaiEntry', ['name', 'length', 'offset', 'line_bases', 'line_width'])
+
+_GZI_COUNT = struct.Struct('<Q')
+_GZI_ENTRY = struct.Struct('<QQ')
+
+
+def _write_fai(fai_path, fai_entries):
+    """
+    Writes a .fai index.
+
+    Parameters
+    ----------
+    fai_path : str
+        Path of the .fai file.
+    fai_entries : iterable of FaiEntry
+        Entries, in the same order as the FASTA sequences.
+    """
+    with open(fai_path, 'w') as fai_file:
+        fai_file.writelines('%s\t%d\t%d\t%d\t%d\n' % tuple(fai_entry) for fai_entry in fai_entries)
+
+
+def _read_fai(fai_path):
+    """
+    Reads a .fai index.
+
+    Parameters
+    ----------
+    fai_path : str
+        Path of the .fai file.
+
+    Returns
+    -------
+    list of FaiEntry
+        Entries, in the same order as the FASTA sequences.
+
+    Raises
+    ------
+    TypeError
+        If the file is not a .fai index.
+    """
+    fai_entries = []
+    with open(fai_path) as fai_file:
+        for line in fai_file:
+            fields = line.rstrip('\n').split('\t')
+            try:
+                fai_entries.append(FaiEntry(fields[0], *map(int, fields[1:5])))
+            except (TypeError, ValueError):
+                raise TypeError('%s is not a .fai index' % fai_path)
+    return fai_entries
+
+
+def _write_gzi(gzi_path, blocks):
+    """
+    Writes a .gzi index.
+
+    Parameters
+    ----------
+    gzi_path : str
+        Path of the .gzi file.
+    blocks : list of (int, int)
+        (compressed offset, uncompressed offset) of the start of every BGZF block, except the first one.
+    """
+    with open(gzi_path, 'wb') as gzi_file:
+        gzi_file.write(_GZI_COUNT.pack(len(blocks)))
+        gzi_file.writelines(_GZI_ENTRY.pack(*block) for block in blocks)
+
+
+def _read_gzi(gzi_path):
+    """
+    Reads a .gzi index.
+
+    Parameters
+    ----------
+    gzi_path : str
+        Path of the .gzi file.
+
+    Returns
+    -------
+    list of (int, int)
+        (compressed offset, uncompressed offset) of the start of every BGZF block, except the first one.
+
+    Raises
+    ------
+    TypeError
+        If the file is not a .gzi index.
+    """
+    with open(gzi_path, 'rb') as gzi_file:
+        data = gzi_file.read()
+    if len(data) < _GZI_COUNT.size:
+        raise TypeError('%s is not a .gzi index' % gzi_path)
+    count = _GZI_COUNT.unpack_from(data)[0]
+    if len(data) != _GZI_COUNT.size + count * _GZI_ENTRY.size:
+        raise TypeError('%s is not a .gzi index' % gzi_path)
+    return [_GZI_ENTRY.unpack_from(data, _GZI_COUNT.size + i * _GZI_ENTRY.size) for i in range(count)]
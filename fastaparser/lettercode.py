@@ -230,6 +230,12 @@ class LetterCode:
             return self._letter_code == other.upper()
         return False
 
+    def __reduce__(self):
+        """
+        Pickles a LetterCode as (letter_code, letter_type), instead of its whole __dict__.
+        """
+        return LetterCode, (self._letter_code, self._letter_type)
+
     def __repr__(self):
         return 'LetterCode(%r)' % self._letter_code
 
@@ -0,0 +1,230 @@
+#!python
+# coding: utf-8
+
+"""
+parallel_map - Applies a function to every FASTA sequence of a FASTA file, in parallel worker processes.
+"""
+
+import collections
+import concurrent.futures
+import io
+import os
+from .reader import Reader
+
+
+def _iter_record_offsets(fasta_path, block_size=1048576):
+    """
+    Iterates over the byte offsets of every definition line ('>' at the start of a line) of a FASTA file.
+    The file is scanned in binary blocks with bytes.find, without parsing it.
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the FASTA file.
+    block_size : int, optional
+        Number of bytes read at a time.
+
+    Yields
+    ------
+    int
+        Byte offset of a definition line.
+    """
+    with open(fasta_path, 'rb') as fasta_file:
+        block_offset = 0
+        previous_byte = b'\n'  # the start of the file counts as the start of a line
+        while True:
+            block = fasta_file.read(block_size)
+            if not block:
+                return
+            if previous_byte == b'\n' and block[:1] == b'>':
+                yield block_offset
+            position = block.find(b'\n>')
+            while position != -1:
+                yield block_offset + position + 1
+                position = block.find(b'\n>', position + 1)
+            previous_byte = block[-1:]
+            block_offset += len(block)
+
+
+def _iter_record_ranges(fasta_path, chunk_records):
+    """
+    Splits a FASTA file into byte ranges of (at most) chunk_records FASTA sequences each.
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the FASTA file.
+    chunk_records : int
+        Number of FASTA sequences per range.
+
+    Yields
+    ------
+    (int, int)
+        Start (inclusive) and end (exclusive) byte offsets of each range.
+    """
+    start = None
+    records = 0
+    for offset in _iter_record_offsets(fasta_path):
+        if start is None:
+            start = offset
+        elif records == chunk_records:
+            yield start, offset
+            start = offset
+            records = 0
+        records += 1
+    if start is not None:
+        yield start, os.path.getsize(fasta_path)
+
+
+def _read_range(fasta_path, start, end, encoding, reader_options):
+    """
+    Parses the FASTA sequences contained in a byte range of a FASTA file.
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the FASTA file.
+    start : int
+        Start byte offset (inclusive).
+    end : int
+        End byte offset (exclusive).
+    encoding : str
+        Encoding of the FASTA file.
+    reader_options : dict
+        Keyword arguments passed to Reader.
+
+    Returns
+    -------
+    Reader
+        Reader over the FASTA sequences of the range.
+    """
+    with open(fasta_path, 'rb') as fasta_file:
+        fasta_file.seek(start)
+        text = fasta_file.read(end - start).decode(encoding)
+    return Reader(io.StringIO(text), **reader_options)
+
+
+def _map_range(function, fasta_path, start, end, encoding, reader_options):
+    """
+    Applies function to every FASTA sequence of a byte range of a FASTA file (runs in the worker processes).
+
+    Returns
+    -------
+    list
+        Results of function, in the same order as the FASTA sequences.
+    """
+    return [function(fasta_sequence) for fasta_sequence in _read_range(fasta_path, start, end, encoding,
+                                                                       reader_options)]
+
+
+def _bounded_map(executor, function, arguments, max_in_flight, ordered=True):
+    """
+    Submits function(*args) to executor, for each args in arguments, keeping at most max_in_flight tasks submitted
+    (and their results) at a time. arguments is consumed lazily.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        Executor that runs the tasks.
+    function : callable
+        Function to run.
+    arguments : iterable of tuple
+        Positional arguments of each task.
+    max_in_flight : int
+        Maximum number of tasks submitted at a time.
+    ordered : bool, optional
+        If results are yielded in the same order as arguments (True) or as soon as they are ready (False).
+
+    Yields
+    ------
+    object
+        Result of each task.
+    """
+    arguments = iter(arguments)
+    in_flight = collections.deque()
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < max_in_flight:
+            try:
+                in_flight.append(executor.submit(function, *next(arguments)))
+            except StopIteration:
+                exhausted = True
+        if not in_flight:
+            return
+        if ordered:
+            yield in_flight.popleft().result()
+        else:
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                in_flight.remove(future)
+                yield future.result()
+
+
+def parallel_map(function, fasta_path, workers=None, chunk_records=1000, ordered=True, encoding='utf-8',
+                 **reader_options):
+    """
+    Applies function to every FASTA sequence of a FASTA file, in parallel worker processes.
+
+    The main process only finds the byte ranges of each batch of chunk_records FASTA sequences (without parsing them).
+    Each worker process reads and parses a batch with Reader and applies function to its FASTA sequences,
+    so only the batch byte ranges and the results are transferred between processes.
+    At most 2 * workers batches are in flight at a time, which bounds memory usage.
+
+    ex:
+        > import fastaparser
+        > def gc_content(fasta_sequence):
+        >     return fasta_sequence.id, fasta_sequence.gc_content()
+        > for id_, gc in fastaparser.parallel_map(gc_content, 'fasta_file.fasta', workers=4,
+        >                                         sequences_type='nucleotide'):
+        >     ...
+
+    Parameters
+    ----------
+    function : callable
+        Function applied to each FASTA sequence (as generated by Reader).
+        Must be picklable (ex: a function defined at the top level of a module), as must its results.
+    fasta_path : str
+        Path of the FASTA file.
+    workers : int or None, optional
+        Number of worker processes. None uses the number of processors of the machine.
+    chunk_records : int, optional
+        Number of FASTA sequences per batch.
+    ordered : bool, optional
+        If results are returned in the same order as the FASTA sequences (True)
+        or as soon as each batch is ready (False).
+    encoding : str, optional
+        Encoding of the FASTA file.
+    reader_options
+        Keyword arguments passed to Reader (ex: sequences_type, parse_method).
+
+    Returns
+    -------
+    iterator
+        Results of function for each FASTA sequence.
+
+    Raises
+    ------
+    TypeError
+        If function is not callable, fasta_path is not a path to a file or workers, chunk_records or reader_options
+        are of the wrong type.
+    """
+    if not callable(function):
+        raise TypeError('function must be callable')
+    if not isinstance(fasta_path, str) or not os.path.isfile(fasta_path):
+        raise TypeError('fasta_path must be the path of a FASTA file')
+    if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers <= 0):
+        raise TypeError('workers must be a positive int or None')
+    if not isinstance(chunk_records, int) or isinstance(chunk_records, bool) or chunk_records <= 0:
+        raise TypeError('chunk_records must be a positive int')
+    Reader(io.StringIO(), **reader_options)  # checks reader_options before starting the worker processes
+
+    def iter_results():
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            max_in_flight = 2 * (workers or os.cpu_count() or 1)
+            arguments = ((function, fasta_path, start, end, encoding, reader_options)
+                         for start, end in _iter_record_ranges(fasta_path, chunk_records))
+            for results in _bounded_map(executor, _map_range, arguments, max_in_flight, ordered):
+                for result in results:
+                    yield result
+
+    return iter_results()
@@ -0,0 +1,311 @@
+#!python
+# coding: utf-8
+
+"""
+Persistent cache of the FASTA sequences parsed by Reader, keyed by the fingerprint of the FASTA file.
+
+Cache file (little-endian):
+    header: magic (b'FPPC'), version (uint8), size of the FASTA file (uint64), modification time of the FASTA file
+        (int64, nanoseconds), sha256 of the FASTA file (32 bytes, zeros if not computed), number of letter codes in the
+        composition counts (uint32)
+    composition counts: for each letter code, code point (uint32) and number of occurrences (uint64)
+    FASTA sequences: a batch in the binary format of serialize_fastas (for the 'quick' parse method, the id field holds
+        the whole definition line, marked by raw_header, so headers are restored verbatim)
+
+The cache file is written next to the data of a full iteration over the FASTA file and replaced atomically, so it is
+either complete or missing. It is read through mmap, so only the FASTA sequences iterated over are read.
+"""
+
+import collections
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from .serialization import _HEADER as _BATCH_HEADER, _MAGIC as _BATCH_MAGIC, _VERSION as _BATCH_VERSION, \
+    _TABLE_ENTRY, _SEQUENCE_TYPES
+
+
+_MAGIC = b'FPPC'
+_VERSION = 2
+_HEADER = struct.Struct('<4sBQq32sI')
+_COUNT_ENTRY = struct.Struct('<IQ')
+_NO_HASH = bytes(32)
+_BLOCK_SIZE = 1048576
+
+
+def _fingerprint(fasta_path, content_hash=False):
+    """
+    Fingerprint of a FASTA file.
+
+    Parameters
+    ----------
+    fasta_path : str
+        Path of the FASTA file.
+    content_hash : bool, optional
+        If the sha256 of the contents of the FASTA file is computed (reads the whole file).
+
+    Returns
+    -------
+    (int, int, bytes)
+        Size, modification time (nanoseconds) and sha256 (zeros if not computed) of the FASTA file.
+    """
+    stat = os.stat(fasta_path)
+    digest = _NO_HASH
+    if content_hash:
+        sha256 = hashlib.sha256()
+        with open(fasta_path, 'rb') as fasta_file:
+            for block in iter(lambda: fasta_file.read(_BLOCK_SIZE), b''):
+                sha256.update(block)
+        digest = sha256.digest()
+    return stat.st_size, stat.st_mtime_ns, digest
+
+
+def _cache_path(cache_directory, fasta_path, options):
+    """
+    Path of the cache file of a FASTA file, parsed with the given options.
+
+    Parameters
+    ----------
+    cache_directory : str
+        Directory of the cache files.
+    fasta_path : str
+        Path of the FASTA file.
+    options : tuple
+        Options of Reader that change the parsed FASTA sequences.
+
+    Returns
+    -------
+    str
+    """
+    key = repr((os.path.abspath(fasta_path), options)).encode('utf-8')
+    return os.path.join(cache_directory, hashlib.sha256(key).hexdigest()[:32] + '.fpc')
+
+
+def _is_valid(cache_path, fingerprint):
+    """
+    Checks if a cache file exists and was written for a FASTA file with the given fingerprint.
+    The sha256 is only compared if it is part of fingerprint.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path of the cache file.
+    fingerprint : (int, int, bytes)
+        Fingerprint of the FASTA file (see _fingerprint).
+
+    Returns
+    -------
+    bool
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            header = cache_file.read(_HEADER.size)
+    except OSError:
+        return False
+    if len(header) < _HEADER.size:
+        return False
+    magic, version, size, mtime_ns, digest, _ = _HEADER.unpack(header)
+    size_mtime_ns_and_digest = (size, mtime_ns, digest if fingerprint[2] != _NO_HASH else _NO_HASH)
+    return magic == _MAGIC and version == _VERSION and size_mtime_ns_and_digest == fingerprint
+
+
+def _read_composition(cache_path):
+    """
+    Reads the composition counts of a cache file.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path of the cache file.
+
+    Returns
+    -------
+    dict of {str: int}
+        Number of occurrences of each letter code, in every sequence.
+    """
+    with open(cache_path, 'rb') as cache_file:
+        count = _HEADER.unpack(cache_file.read(_HEADER.size))[5]
+        counts = cache_file.read(count * _COUNT_ENTRY.size)
+    return {chr(code_point): occurrences for code_point, occurrences in _COUNT_ENTRY.iter_unpack(counts)}
+
+
+def _iter_cached_fastas(cache_path):
+    """
+    Iterates over the FASTA sequences of a cache file, through mmap.
+
+    Parameters
+    ----------
+    cache_path : str
+        Path of the cache file.
+
+    Yields
+    ------
+    (str, str, str, 'nucleotide', 'aminoacid' or None, bool)
+        id (or definition line, for the 'quick' parse method), description, sequence, sequence_type and inferred_type.
+
+    Raises
+    ------
+    TypeError
+        If the cache file is truncated or corrupted.
+    """
+    with open(cache_path, 'rb') as cache_file:
+        with mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ) as cache_mmap:
+            batch_start = _HEADER.size + _HEADER.unpack_from(cache_mmap)[5] * _COUNT_ENTRY.size
+            table_start = batch_start + _BATCH_HEADER.size
+            magic, version, count = _BATCH_HEADER.unpack_from(cache_mmap, batch_start)
+            data_start = table_start + count * _TABLE_ENTRY.size
+            if magic != _BATCH_MAGIC or version != _BATCH_VERSION or data_start > len(cache_mmap):
+                raise TypeError('%s is not a cache file' % cache_path)
+            # the whole table is unpacked at once and each field is sliced (copied) directly out of the mmap
+            for offset, id_length, description_length, sequence_length, sequence_type, inferred_type, _ in \
+                    _TABLE_ENTRY.iter_unpack(cache_mmap[table_start:data_start]):
+                id_start = data_start + offset
+                description_start = id_start + id_length
+                sequence_start = description_start + description_length
+                sequence_end = sequence_start + sequence_length
+                if sequence_end > len(cache_mmap):
+                    raise TypeError('%s is not a cache file' % cache_path)
+                yield (str(cache_mmap[id_start:description_start], 'utf-8'),
+                       str(cache_mmap[description_start:sequence_start], 'utf-8'),
+                       str(cache_mmap[sequence_start:sequence_end], 'utf-8'),
+                       _SEQUENCE_TYPES[sequence_type], bool(inferred_type))
+
+
+class _CompositionCounter:
+    """
+    Counts the occurrences of each letter code in sequences.
+    Sequences are counted in large batches: they are joined and each letter code is counted with bytes.count
+    (C speed), which is much faster than counting each letter code in Python or with Counter.update.
+    Letter codes not found before are detected by deleting the known ones with bytes.translate.
+    """
+
+    def __init__(self):
+        self._composition = collections.Counter()
+        self._uncounted_sequences = []
+        self._uncounted_size = 0
+        self._counted_bytes = b''  # letter codes (ascii) found so far
+
+    def add(self, sequence):
+        """
+        Adds a sequence (utf-8 encoded) to the counts.
+        """
+        self._uncounted_sequences.append(sequence)
+        self._uncounted_size += len(sequence)
+        if self._uncounted_size >= _BLOCK_SIZE:
+            self._count()
+
+    def counts(self):
+        """
+        Returns the number of occurrences of each letter code.
+
+        Returns
+        -------
+        dict of {str: int}
+        """
+        self._count()
+        return dict(self._composition)
+
+    def _count(self):
+        """
+        Counts the batch of sequences added since the last count.
+        """
+        sequences = b''.join(self._uncounted_sequences)
+        self._uncounted_sequences = []
+        self._uncounted_size = 0
+        new_bytes = sequences.translate(None, self._counted_bytes)
+        if new_bytes and max(new_bytes) >= 128:  # non ascii characters (not letter codes, but still counted)
+            sequences = str(sequences, 'utf-8')
+            for letter_code in set(sequences):
+                self._composition[letter_code] += sequences.count(letter_code)
+        else:
+            if new_bytes:
+                self._counted_bytes = bytes(sorted(set(self._counted_bytes).union(new_bytes)))
+            for byte in self._counted_bytes:
+                self._composition[chr(byte)] += sequences.count(bytes((byte,)))
+
+
+class _ParseCacheWriter:
+    """
+    Writes a cache file while the FASTA file is iterated over.
+    The data of the FASTA sequences is written to a temporary file (only the table is kept in memory) and the
+    cache file is only created, atomically, by commit().
+    """
+
+    def __init__(self, cache_path, fingerprint):
+        """
+        Parameters
+        ----------
+        cache_path : str
+            Path of the cache file.
+        fingerprint : (int, int, bytes)
+            Fingerprint of the FASTA file (see _fingerprint).
+        """
+        self._cache_path = cache_path
+        self._fingerprint = fingerprint
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        self._data_file = tempfile.TemporaryFile(dir=os.path.dirname(cache_path) or None)
+        self._table = []
+        self._data_offset = 0
+        self._composition = _CompositionCounter()
+
+    def add(self, id_, description, sequence, sequence_type, inferred_type, raw_header):
+        """
+        Adds a FASTA sequence.
+
+        Parameters
+        ----------
+        id_ : str
+            ID (or definition line, for the 'quick' parse method).
+        description : str
+            Description.
+        sequence : str
+            Sequence.
+        sequence_type : 'nucleotide', 'aminoacid' or None
+            Type of sequence.
+        inferred_type : bool
+            If sequence_type was inferred.
+        raw_header : bool
+            If id_ is the definition line ('quick' parse method).
+        """
+        id_, description, sequence = id_.encode('utf-8'), description.encode('utf-8'), sequence.encode('utf-8')
+        self._composition.add(sequence)
+        self._table.append(_TABLE_ENTRY.pack(self._data_offset, len(id_), len(description), len(sequence),
+                                             _SEQUENCE_TYPES.index(sequence_type), inferred_type, raw_header))
+        self._data_file.write(id_ + description + sequence)
+        self._data_offset += len(id_) + len(description) + len(sequence)
+
+    def commit(self, fasta_path):
+        """
+        Writes the cache file, unless the FASTA file changed since its fingerprint was taken.
+
+        Parameters
+        ----------
+        fasta_path : str
+            Path of the FASTA file.
+        """
+        size, mtime_ns, digest = self._fingerprint
+        if _fingerprint(fasta_path)[:2] != (size, mtime_ns):
+            return
+        composition = self._composition.counts()
+        temporary_fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(self._cache_path) or None)
+        try:
+            with os.fdopen(temporary_fd, 'wb') as cache_file:
+                cache_file.write(_HEADER.pack(_MAGIC, _VERSION, size, mtime_ns, digest, len(composition)))
+                cache_file.writelines(_COUNT_ENTRY.pack(ord(letter_code), occurrences)
+                                      for letter_code, occurrences in sorted(composition.items()))
+                cache_file.write(_BATCH_HEADER.pack(_BATCH_MAGIC, _BATCH_VERSION, len(self._table)))
+                cache_file.writelines(self._table)
+                self._data_file.seek(0)
+                shutil.copyfileobj(self._data_file, cache_file, _BLOCK_SIZE)
+            os.replace(temporary_path, self._cache_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def close(self):
+        """
+        Removes the temporary data.
+        """
+        self._data_file.close()
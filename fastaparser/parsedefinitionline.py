@@ -14,11 +14,16 @@ class ParseDefinitionLine:
     -------
     _parse_definition_line(definition_line)
         Parses FASTA definition lines
+    _normalize_id(id_)
+        Normalizes the ID portion of FASTA definition lines
+    _normalize_description(description)
+        Normalizes the description portion of FASTA definition lines
 
     Raises
     ------
     TypeError
         When calling _parse_definition_line, if definition_line is of the wrong type.
+        When calling _normalize_id or _normalize_description, if id_ or description are of the wrong type.
     """
 
     @staticmethod
@@ -61,3 +66,56 @@ class ParseDefinitionLine:
             raise TypeError('definition_line must be str')
 
         return _id, _description
+
+    @staticmethod
+    def _normalize_id(id_):
+        """
+        Normalizes the ID portion of a FASTA definition line.
+        '>' and newlines are removed, if any. Spaces are converted to '_'.
+
+        Parameters
+        ----------
+        id_ : str
+            ID portion of the definition line (header). Can be an empty string.
+
+        Returns
+        -------
+        str
+            Normalized ID.
+
+        Raises
+        ------
+        TypeError
+            If id_ is not str.
+        """
+        if isinstance(id_, str):
+            id_ = ''.join(id_.strip().replace(' ', '_').split())  # remove spaces and newlines
+            if id_.startswith('>'):  # remove '>' if any
+                id_ = id_[1:]
+            return id_
+        raise TypeError('id_ must be str')
+
+    @staticmethod
+    def _normalize_description(description):
+        """
+        Normalizes the description portion of a FASTA definition line.
+        Newlines and extra spaces are removed, if any.
+
+        Parameters
+        ----------
+        description : str
+            Description portion of the definition line (header). Can be an empty string.
+
+        Returns
+        -------
+        str
+            Normalized description.
+
+        Raises
+        ------
+        TypeError
+            If description is not str.
+        """
+        if isinstance(description, str):
+            return ' '.join(description.strip().split())  # remove extra spaces and newlines
+        raise TypeError('description must be str')
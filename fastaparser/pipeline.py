@@ -0,0 +1,328 @@
+#!python
+# coding: utf-8
+
+"""
+Pipeline - Streaming source -> stages (map, filter) -> sink, connected by bounded queues.
+"""
+
+import itertools
+import queue
+import threading
+from .dataset import _EXECUTORS, _copy_with
+from .parallel import _bounded_map
+from .writer import Writer
+
+
+_END = object()  # marks the end of a queue
+
+
+class _StageError:
+    """
+    Wraps an exception raised in a stage, to be re-raised by the stages downstream (and finally by the consumer).
+    """
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class _Stopped(Exception):
+    """
+    Raised in a stage when the consumer stopped iterating over the pipeline.
+    """
+
+
+def _apply_stage(operation, function, batch):
+    """
+    Applies a stage to a batch of items (runs in the stage thread or in its workers).
+
+    Parameters
+    ----------
+    operation : 'map' or 'filter'
+        Stage operation.
+    function : callable
+        Stage function (map) or predicate (filter).
+    batch : list
+        Items.
+
+    Returns
+    -------
+    list
+        Results of function (map) or items for which predicate is true (filter), in order.
+    """
+    if operation == 'map':
+        return [function(item) for item in batch]
+    return [item for item in batch if function(item)]  # 'filter'
+
+
+def _iter_batches(items, batch_size):
+    """
+    Groups items into lists of (at most) batch_size items.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _put(stage_queue, item, stop):
+    """
+    Puts item in stage_queue, blocking while it is full (backpressure), until stop is set.
+
+    Raises
+    ------
+    _Stopped
+        If stop is set.
+    """
+    while True:
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            if stop.is_set():
+                raise _Stopped()
+
+
+def _iter_queue(stage_queue, stop):
+    """
+    Iterates over the batches put in stage_queue by the upstream stage, until its end (or until stop is set).
+    Re-raises the exceptions raised upstream.
+    """
+    while True:
+        try:
+            batch = stage_queue.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                raise _Stopped()
+            continue
+        if batch is _END:
+            return
+        if isinstance(batch, _StageError):
+            raise batch.exception
+        yield batch
+
+
+def _run_stage(batches, stage_queue, stage, stop):
+    """
+    Runs a stage over the upstream batches, putting its results in stage_queue (runs in the stage thread).
+
+    Parameters
+    ----------
+    batches : iterator of list
+        Upstream batches.
+    stage_queue : queue.Queue
+        Bounded queue read by the downstream stage.
+    stage : ('map' or 'filter', callable, int or None, 'process' or 'thread')
+        Operation, function, number of workers (None runs the stage in its own thread only) and executor.
+    stop : threading.Event
+        Set when the consumer stops iterating over the pipeline.
+    """
+    operation, function, workers, executor = stage
+    try:
+        try:
+            if workers is None:
+                for batch in batches:
+                    _put(stage_queue, _apply_stage(operation, function, batch), stop)
+            else:
+                with _EXECUTORS[executor](max_workers=workers) as pool:
+                    arguments = ((operation, function, batch) for batch in batches)
+                    for results in _bounded_map(pool, _apply_stage, arguments, 2 * workers):
+                        _put(stage_queue, results, stop)
+        except _Stopped:
+            return
+        except Exception as exception:  # pylint: disable=broad-except
+            _put(stage_queue, _StageError(exception), stop)
+            return
+        _put(stage_queue, _END, stop)
+    except _Stopped:
+        return
+
+
+class Pipeline:
+    """
+    Streaming pipeline of a source (ex: Reader), stages (map, filter) and, optionally, a sink (Writer).
+    Each stage runs in its own thread (and, optionally, on its own pool of worker threads or processes) and stages
+    are connected by bounded queues of batches, so a slow stage blocks the ones upstream (backpressure) and memory usage
+    stays constant. The order of the items is always preserved.
+
+    ex:
+        > import fastaparser
+        > def reverse_complement(fasta_sequence):
+        >     return fasta_sequence.complement(reverse=True)
+        > with open('fasta_file.fasta') as fasta_file, open('reverse_complement.fasta', 'w') as output_file:
+        >     reader = fastaparser.Reader(fasta_file, sequences_type='nucleotide')
+        >     fastaparser.Pipeline(reader).map(reverse_complement, workers=4).run(fastaparser.Writer(output_file))
+
+    Methods
+    -------
+    map(function, workers=None, executor='process')
+        Returns a new Pipeline with an extra stage that applies function to each item.
+    filter(predicate, workers=None, executor='process')
+        Returns a new Pipeline with an extra stage that keeps only the items for which predicate is true.
+    run(writer)
+        Runs the pipeline and writes every resulting FASTA sequence with writer.
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if source is not iterable or batch_size or queue_size are of the wrong type.
+        When calling map() or filter(), if function, predicate, workers or executor are of the wrong type.
+        When calling run(), if writer is not a Writer.
+    """
+
+    def __init__(self, source, batch_size=64, queue_size=8):
+        """
+        Initializes Pipeline with no stages.
+
+        Parameters
+        ----------
+        source : iterable
+            Source of items (ex: Reader, or any iterable of FastaSequence objects or tuples (header, sequence)).
+        batch_size : int, optional
+            Number of items passed between stages (and sent to the workers) at a time.
+        queue_size : int, optional
+            Maximum number of batches waiting between two stages.
+
+        Raises
+        ------
+        TypeError
+            If source is not iterable or batch_size or queue_size are of the wrong type.
+        """
+        try:
+            iter(source)
+        except TypeError:
+            raise TypeError('source must be iterable')
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise TypeError('batch_size must be a positive int')
+        if not isinstance(queue_size, int) or isinstance(queue_size, bool) or queue_size <= 0:
+            raise TypeError('queue_size must be a positive int')
+
+        self._source = source
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._stages = ()
+
+    def map(self, function, workers=None, executor='process'):
+        """
+        Returns a new Pipeline with an extra stage that applies function to each item.
+
+        Parameters
+        ----------
+        function : callable
+            Function applied to each item. Must be picklable to run on a process pool
+            (ex: a function defined at the top level of a module), as must its items and results.
+        workers : int or None, optional
+            Number of workers of the stage. None runs the stage only in its own thread.
+        executor : 'process' or 'thread', optional
+            Run the workers in processes or in threads.
+
+        Returns
+        -------
+        Pipeline
+
+        Raises
+        ------
+        TypeError
+            If function is not callable or workers or executor are of the wrong type.
+        """
+        if not callable(function):
+            raise TypeError('function must be callable')
+        return self._with_stage('map', function, workers, executor)
+
+    def filter(self, predicate, workers=None, executor='process'):
+        """
+        Returns a new Pipeline with an extra stage that keeps only the items for which predicate is true.
+
+        Parameters
+        ----------
+        predicate : callable
+            Function applied to each item. Must be picklable to run on a process pool.
+        workers : int or None, optional
+            Number of workers of the stage. None runs the stage only in its own thread.
+        executor : 'process' or 'thread', optional
+            Run the workers in processes or in threads.
+
+        Returns
+        -------
+        Pipeline
+
+        Raises
+        ------
+        TypeError
+            If predicate is not callable or workers or executor are of the wrong type.
+        """
+        if not callable(predicate):
+            raise TypeError('predicate must be callable')
+        return self._with_stage('filter', predicate, workers, executor)
+
+    def run(self, writer):
+        """
+        Runs the pipeline and writes every resulting FASTA sequence with writer (the sink).
+
+        Parameters
+        ----------
+        writer : Writer
+            Writer of the resulting FASTA sequences (FastaSequence objects or tuples (header, sequence)).
+
+        Returns
+        -------
+        int
+            Number of FASTA sequences written.
+
+        Raises
+        ------
+        TypeError
+            If writer is not a Writer.
+        """
+        if not isinstance(writer, Writer):
+            raise TypeError('writer must be a Writer')
+        counter = itertools.count()
+        # zip stops at the end of the pipeline without advancing counter, so next(counter) is the number written
+        writer.writefastas(fasta_sequence for fasta_sequence, _ in zip(self, counter))
+        return next(counter)
+
+    def _with_stage(self, operation, function, workers, executor):
+        """
+        Returns a copy of this Pipeline with an extra stage.
+
+        Raises
+        ------
+        TypeError
+            If workers or executor are of the wrong type.
+        """
+        if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers <= 0):
+            raise TypeError('workers must be a positive int or None')
+        if executor not in _EXECUTORS:
+            raise TypeError('executor must be one of: ' + ', '.join(_EXECUTORS))
+        return _copy_with(self, _stages=self._stages + ((operation, function, workers, executor),))
+
+    def __iter__(self):
+        """
+        Runs the pipeline and iterates over the resulting items.
+        Stopping the iteration early stops every stage.
+        """
+        stop = threading.Event()
+        threads = []
+        batches = _iter_batches(self._source, self._batch_size)
+        for stage in self._stages:
+            stage_queue = queue.Queue(self._queue_size)
+            thread = threading.Thread(target=_run_stage, args=(batches, stage_queue, stage, stop), daemon=True)
+            thread.start()
+            threads.append(thread)
+            batches = _iter_queue(stage_queue, stop)
+        try:
+            for batch in batches:
+                for item in batch:
+                    yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def __repr__(self):
+        return 'fastaparser.Pipeline(%s)' % ' -> '.join(
+            [repr(self._source)] + ['%s(%s)' % (stage[0], getattr(stage[1], '__name__', repr(stage[1])))
+                                    for stage in self._stages])
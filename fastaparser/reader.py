@@ -5,16 +5,66 @@
 Reader - FASTA parser/reader.
 """
 
+import contextlib
+import io
+import itertools
 import os
-from collections import namedtuple
-from .constants import LETTER_CODES
-from .fastasequence import FastaSequence
+import re
+import threading
+import warnings
+from .cache import _LRUCache, _memory_size
+from .constants import LETTER_CODES, LETTER_CODES_ALL, NUCLEOTIDE_LETTER_CODES_ALL, AMINOACID_LETTER_CODES_ALL
+from .fastasequence import Fasta, FastaChunks, _fasta_sequence_from_definition_line, _is_aminoacid_sequence, \
+    _restore_fasta_sequence
+from .hashindex import HashIndex
+from .parsecache import _CompositionCounter, _ParseCacheWriter, _cache_path, _fingerprint, _is_valid, \
+    _iter_cached_fastas, _read_composition
 from .parsedefinitionline import ParseDefinitionLine
 
 
+def _letter_codes_validator(letter_codes):
+    """
+    Builds the bytes of valid letter codes (upper and lower case) and a regex matching any other character.
+
+    Parameters
+    ----------
+    letter_codes : iterable of str
+        Valid letter codes.
+
+    Returns
+    -------
+    (bytes, re.Pattern)
+        Valid letter codes (to delete with bytes.translate) and regex matching invalid letter codes.
+    """
+    letter_codes = ''.join(sorted(letter_codes))
+    letter_codes += letter_codes.lower()
+    return letter_codes.encode('ascii'), re.compile('[^%s]' % re.escape(letter_codes))
+
+
+# {sequences_type: (valid letter codes as bytes, regex matching invalid letter codes)}
+_LETTER_CODES_VALIDATORS = {
+    'nucleotide': _letter_codes_validator(NUCLEOTIDE_LETTER_CODES_ALL),
+    'aminoacid': _letter_codes_validator(AMINOACID_LETTER_CODES_ALL),
+    None: _letter_codes_validator(LETTER_CODES_ALL)
+}
+
+_NOT_INFERRED = object()  # the sequence type of the whole file was not inferred yet (see Reader._file_sequences_type)
+
+
+def _iter_referencing(iterator, owner):  # pylint: disable=unused-argument
+    """
+    Iterates over iterator while keeping a reference to owner (ex: the iterator that owns the file handle iterator
+    reads from), so owner is not garbage collected (and its file handle closed) before iterator is consumed.
+    """
+    for item in iterator:
+        yield item
+
+
 class Reader(ParseDefinitionLine):
     """
     Parser/Reader for the given FASTA file.
+    Each iterator reads the FASTA file through its own file handle (when fasta_file is a file on disk), so multiple
+    iterators of the same Reader (ex: in different threads) don't interfere with each other's position.
     Iterates over the FASTA file using one of two parsing mechanisms:
         'rich':
             Returns FastaSequence objects (default).
@@ -32,19 +82,54 @@ class Reader(ParseDefinitionLine):
         Indicates the type of sequences to expect ('nucleotide' or 'aminoacid'). Can be None if not known.
     infer_type: bool
         True if Reader was set to infer the sequence type, False otherwise.
+    infer_sample_size: int or None
+        Number of letter codes, from the start of the file, used to infer the sequence type of the whole file.
+        None if the sequence type is inferred for each sequence.
     parse_method: 'rich' or 'quick'
         Parse method used ('rich' or 'quick').
+    validate: 'off', 'warn' or 'strict'
+        Validation of letter codes used ('off', 'warn' or 'strict').
+    index: HashIndex or None
+        Hash index of the FASTA file, used to get FASTA sequences by ID (reader[id]). None if not used.
+    cache_size: int or None
+        Maximum total memory, in bytes (estimated for each parse_method), of the FASTA sequences cached by reader[id].
+        None if lookups are not cached.
+    parse_cache: str or None
+        Directory of the cache files of parsed FASTA sequences. None if not used.
+
+    Methods
+    -------
+    stream(chunk_size=65536, overlap=0)
+        Iterates over the FASTA file, yielding each header immediately and its sequence as chunks of letter codes.
+    __getitem__(id)
+        Returns the FASTA sequence with the given ID, read directly from its byte range (requires index).
+    cache_info()
+        Returns the hit/miss statistics and size of the cache of reader[id].
+    cache_clear()
+        Empties the cache of reader[id] and resets its statistics.
+    composition()
+        Returns the number of occurrences of each letter code in every sequence of the FASTA file.
 
     Raises
     ------
     TypeError
-        When calling __init__, if fasta_file, sequences_type, infer_type or parse_method are of the wrong type.
+        When calling __init__, if fasta_file, sequences_type, infer_type, parse_method, validate or infer_sample_size
+        are of the wrong type.
         When calling __init__, if fasta_file is not a file object, is closed or is not readable.
-        When calling __iter__, if fasta_file is closed.
+        When calling __init__, if index, cache_size, parse_cache or parse_cache_hash are of the wrong type,
+        fasta_file is not a file on disk (with index or parse_cache) or index was not built for fasta_file.
+        When calling __iter__, stream(), composition() or __getitem__, if fasta_file is closed.
+        When calling __getitem__, if Reader has no index or id is not a str.
+        When calling stream(), if chunk_size or overlap are of the wrong type.
+        When iterating, if validate is 'strict' and a sequence contains letter codes not in the FASTA specification.
+    KeyError
+        When calling __getitem__, if id is not in the index.
     """
     _PARSE_METHODS = ('rich', 'quick')
+    _VALIDATE_MODES = ('off', 'warn', 'strict')
 
-    def __init__(self, fasta_file, sequences_type=None, infer_type=False, parse_method='rich'):
+    def __init__(self, fasta_file, sequences_type=None, infer_type=False, parse_method='rich', validate='off',
+                 infer_sample_size=None, index=None, cache_size=None, parse_cache=None, parse_cache_hash=False):
         """
         Initializes file object (checks if fasta_file is an opened file object).
 
@@ -63,15 +148,47 @@ class Reader(ParseDefinitionLine):
             so it's much faster and less memory intensive. If selected, sequences_type and
             infer_type parameters are ignored.
             'rich' implements more functionality (FastaSequence and LetterCode), but is slower.
+        validate: 'off', 'warn' or 'strict', optional
+            Checks if each sequence only contains letter codes of the FASTA specification for sequences_type
+            (nucleotide, aminoacid or both if sequences_type is None). Defaults to 'off'.
+            'warn' issues a warning and 'strict' raises TypeError, both reporting the sequence ID and the index of the
+            first invalid letter code.
+        infer_sample_size : int or None, optional
+            If infer_type is True, infers the sequence type once for the whole file, from its first infer_sample_size
+            letter codes (which can span multiple sequences), instead of analysing every sequence in full.
+            None (default) infers the sequence type for each sequence.
+        index : HashIndex, str or None, optional
+            Hash index of the FASTA file (HashIndex object or path of a .fhi index, see build_hash_index),
+            used to get FASTA sequences by ID (reader[id]). None (default) uses no index.
+        cache_size : int or None, optional
+            If given, the FASTA sequences returned by reader[id] are kept in a least recently used cache, bounded by the
+            total memory, in bytes, used by its FASTA sequences (estimated for each parse_method: 'rich' FastaSequence
+            objects use over a hundred bytes per letter code), so repeated lookups of the same IDs skip reading and
+            parsing. None (default) caches nothing.
+        parse_cache : str or None, optional
+            Directory (created when needed) of the cache files of parsed FASTA sequences. The first full iteration over
+            the FASTA file writes its FASTA sequences and composition counts to a cache file, and later iterations
+            (also by other Reader objects and processes) read them from the cache file, through mmap, instead of
+            parsing the FASTA file again. Cache files are keyed by the path of the FASTA file and the options of
+            Reader, and are ignored (and rewritten) if the size or modification time of the FASTA file change.
+            None (default) caches nothing.
+        parse_cache_hash : bool, optional
+            If the sha256 of the FASTA file is also checked (reads the whole FASTA file, but does not parse it),
+            to detect changes that keep the size and modification time.
 
         Raises
         ------
         TypeError
-            If fasta_file, sequences_type, infer_type or parse_method are of the wrong type.
+            If fasta_file, sequences_type, infer_type, parse_method, validate, infer_sample_size, index, cache_size,
+            parse_cache or parse_cache_hash are of the wrong type.
             If fasta_file is not a file object, is closed or is not readable.
+            If index is used and fasta_file is not a file on disk or index was not built for fasta_file.
+            If parse_cache is used and fasta_file is not a text file on disk.
         """
         # for 'quick' parse method
-        self._fasta_sequence = namedtuple('Fasta', ['header', 'sequence'])
+        self._fasta_sequence = Fasta
+        # for stream()
+        self._fasta_chunks = FastaChunks
 
         # assume it's a file object
         if hasattr(fasta_file, 'readline') and hasattr(fasta_file, 'closed') and hasattr(fasta_file, 'readable'):
@@ -97,7 +214,52 @@ class Reader(ParseDefinitionLine):
         else:
             raise TypeError('parse_method must be one of: %s' % ', '.join(self._PARSE_METHODS))
 
+        if isinstance(validate, str) and validate in self._VALIDATE_MODES:
+            self._validate = validate
+        else:
+            raise TypeError('validate must be one of: %s' % ', '.join(self._VALIDATE_MODES))
+
+        if infer_sample_size is None or (isinstance(infer_sample_size, int) and not isinstance(infer_sample_size, bool)
+                                         and infer_sample_size > 0):
+            self._infer_sample_size = infer_sample_size
+        else:
+            raise TypeError('infer_sample_size must be a positive int or None')
+
+        if index is None or isinstance(index, HashIndex):
+            self._index = index
+        elif isinstance(index, str):
+            self._index = HashIndex(index)
+        else:
+            raise TypeError('index must be a HashIndex, the path of a .fhi index or None')
+        if self._index is not None:
+            try:
+                fasta_file_stat = os.fstat(fasta_file.fileno())
+            except (AttributeError, OSError):
+                raise TypeError('fasta_file must be a file on disk to use an index')
+            if (fasta_file_stat.st_size, fasta_file_stat.st_mtime_ns) != (self._index.fasta_size,
+                                                                          self._index.fasta_mtime_ns):
+                raise TypeError('index was not built for fasta_file (or fasta_file changed since)')
+
+        if cache_size is None or (isinstance(cache_size, int) and not isinstance(cache_size, bool) and cache_size > 0):
+            self._cache_size = cache_size
+        else:
+            raise TypeError('cache_size must be a positive int or None')
+        self._cache = _LRUCache(cache_size) if cache_size is not None else None
+        self._inferred_file_sequences_type = _NOT_INFERRED
+
+        if parse_cache is not None and not isinstance(parse_cache, str):
+            raise TypeError('parse_cache must be a str or None')
+        if not isinstance(parse_cache_hash, bool):
+            raise TypeError('parse_cache_hash must be bool')
+        if parse_cache is not None:
+            name = getattr(fasta_file, 'name', None)
+            if not isinstance(fasta_file, io.TextIOBase) or not isinstance(name, str) or not os.path.isfile(name):
+                raise TypeError('fasta_file must be a text file on disk to use parse_cache')
+        self._parse_cache = parse_cache
+        self._parse_cache_hash = parse_cache_hash
+
         self._current_iterator = None
+        self._current_iterator_lock = threading.RLock()
 
     @property
     def fasta_file(self):
@@ -114,12 +276,173 @@ class Reader(ParseDefinitionLine):
         """return infer_type."""
         return self._infer_type
 
+    @property
+    def infer_sample_size(self):
+        """return infer_sample_size."""
+        return self._infer_sample_size
+
     @property
     def parse_method(self):
         """return parse_method."""
         return self._parse_method
 
-    def _generate_fasta_sequence_object(self, sequence, definition_line):
+    @property
+    def validate(self):
+        """return validate."""
+        return self._validate
+
+    @property
+    def index(self):
+        """return index."""
+        return self._index
+
+    @property
+    def cache_size(self):
+        """return cache_size."""
+        return self._cache_size
+
+    @property
+    def parse_cache(self):
+        """return parse_cache."""
+        return self._parse_cache
+
+    def cache_info(self):
+        """
+        Returns the statistics of the cache of reader[id] (see cache_size).
+
+        Returns
+        -------
+        namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize', 'entries']) or None
+            Number of lookups served from the cache (hits) and read from the FASTA file (misses), number of FASTA
+            sequences evicted, maximum and current size (estimated memory, in bytes) and number of cached FASTA
+            sequences.
+            None if lookups are not cached.
+        """
+        return self._cache.info() if self._cache is not None else None
+
+    def cache_clear(self):
+        """
+        Empties the cache of reader[id] and resets its statistics.
+        """
+        if self._cache is not None:
+            self._cache.clear()
+
+    def composition(self):
+        """
+        Returns the number of occurrences of each letter code in every sequence of the FASTA file.
+        With parse_cache, the counts are read from a valid cache file (instantaneous) or, otherwise, computed while
+        the FASTA file is parsed and written to a new cache file.
+
+        Returns
+        -------
+        dict of {str: int}
+            Number of occurrences of each letter code (as in the sequences generated by Reader).
+
+        Raises
+        ------
+        TypeError
+            If fasta_file is closed.
+        """
+        if self._fasta_file.closed or not self._fasta_file.readable():
+            raise TypeError('fasta_file must be opened for reading')
+        if self._parse_cache is not None:
+            cache_path, fingerprint = self._parse_cache_file()
+            if _is_valid(cache_path, fingerprint):
+                return _read_composition(cache_path)
+        composition = _CompositionCounter()
+        for fasta_sequence in self._iter_fasta_file():
+            composition.add(self._cache_fields(fasta_sequence)[2].encode('utf-8'))
+        return composition.counts()
+
+    def stream(self, chunk_size=65536, overlap=0):
+        """
+        Iterates over the FASTA file, yielding each header immediately and its sequence as an iterator of chunks.
+        Memory usage is bounded by chunk_size, no matter how long the sequences are.
+        Yields namedtuple('FastaChunks', ['header', 'chunks']) objects, where header is the definition line
+        (including '>') and chunks is an iterator of str chunks of chunk_size letter codes (the last one can be
+        shorter). The chunks of a sequence must be consumed before advancing to the next sequence, as unconsumed
+        chunks are skipped.
+        sequences_type, infer_type, parse_method and validate are ignored.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of letter codes per chunk.
+        overlap : int, optional
+            Number of letter codes shared by consecutive chunks (ex: k - 1 for k-mer analysis).
+            Must be smaller than chunk_size.
+
+        Returns
+        -------
+        iterator of namedtuple('FastaChunks', ['header', 'chunks'])
+
+        Raises
+        ------
+        TypeError
+            If chunk_size or overlap are of the wrong type.
+            If fasta_file is closed.
+        """
+        if not isinstance(chunk_size, int) or isinstance(chunk_size, bool) or chunk_size <= 0:
+            raise TypeError('chunk_size must be a positive int')
+        if not isinstance(overlap, int) or isinstance(overlap, bool) or not 0 <= overlap < chunk_size:
+            raise TypeError('overlap must be an int between 0 and chunk_size - 1')
+        if not self._fasta_file.closed and self._fasta_file.readable():  # check if file is closed
+            return self._iter_chunked_fasta_file(chunk_size, overlap)
+        raise TypeError('fasta_file must be opened for reading')
+
+    @contextlib.contextmanager
+    def _open_fasta_file(self):
+        """
+        Opens a new handle of the FASTA file, with its own file position, for a single iterator.
+        If fasta_file is not a text file on disk (ex: io.StringIO), fasta_file itself is used and, therefore,
+        its iterators share the same file position.
+
+        Yields
+        ------
+        file object
+            An opened file handle.
+        """
+        name = getattr(self._fasta_file, 'name', None)
+        if isinstance(self._fasta_file, io.TextIOBase) and isinstance(name, str) and os.path.isfile(name):
+            with open(name, encoding=self._fasta_file.encoding, errors=self._fasta_file.errors) as fasta_file:
+                yield fasta_file
+        else:
+            yield self._fasta_file
+
+    def _validate_sequence(self, sequence, definition_line):
+        """
+        Checks if sequence only contains letter codes of the FASTA specification for self._sequences_type.
+        The whole sequence is checked at once by deleting all valid letter codes with bytes.translate.
+        The (slower) regex search for the index of the first invalid letter code only runs if the check fails.
+
+        Parameters
+        ----------
+        sequence : str
+            Sequence as string.
+        definition_line : str
+            Definition line (id + description) including '>' at the beginning.
+
+        Raises
+        ------
+        TypeError
+            If self._validate is 'strict' and sequence contains an invalid letter code.
+        """
+        valid_letter_codes, invalid_letter_code_regex = _LETTER_CODES_VALIDATORS[self._sequences_type]
+        try:
+            valid = not sequence.encode('ascii').translate(None, valid_letter_codes)
+        except UnicodeEncodeError:  # non ascii characters are never valid
+            valid = False
+        if not valid:
+            invalid_letter_code = invalid_letter_code_regex.search(sequence)
+            message = 'Sequence %r contains letter code %r, not in the FASTA specification%s, at index %d' % (
+                self._parse_definition_line(definition_line)[0], invalid_letter_code.group(),
+                ' for %s sequences' % self._sequences_type if self._sequences_type else '',
+                invalid_letter_code.start())
+            if self._validate == 'strict':
+                raise TypeError(message)
+            warnings.warn(message)
+
+    def _generate_fasta_sequence_object(self, sequence, definition_line, sequences_type=None, inferred_type=False):
         """
         Generates either a FastaSequence or a namedtuple('Fasta', ['header', 'sequence']) object,
         based on the value of self._parse_method
@@ -130,26 +453,92 @@ class Reader(ParseDefinitionLine):
             Sequence as string.
         definition_line : str
             Definition line (id + description) including '>' at the beginning.
+        sequences_type : 'nucleotide', 'aminoacid' or None, optional
+            Sequence type inferred for the whole file. None if not inferred (self._sequences_type is used).
+        inferred_type : bool, optional
+            True if sequences_type was inferred for the whole file.
 
         Returns
         -------
         FastaSequence or namedtuple('Fasta', ['header', 'sequence'])
         """
+        if self._validate != 'off':
+            self._validate_sequence(sequence, definition_line)
         if self._parse_method == 'rich':
-            id_, description = self._parse_definition_line(definition_line)
-            fasta_sequence = FastaSequence(sequence, id_, description, self._sequences_type, self._infer_type)
+            # id and description are only parsed from the definition line when first accessed
+            if self._infer_sample_size is None:
+                fasta_sequence = _fasta_sequence_from_definition_line(sequence, definition_line, self._sequences_type,
+                                                                      self._infer_type)
+            else:
+                fasta_sequence = _fasta_sequence_from_definition_line(sequence, definition_line,
+                                                                      sequences_type or self._sequences_type)
+                fasta_sequence._inferred_type = inferred_type  # pylint: disable=protected-access
         else:  # 'quick'
             fasta_sequence = self._fasta_sequence(definition_line, sequence)
         return fasta_sequence
 
-    def _iter_fasta_file(self, fasta_file):
+    def _infer_file_sequences_type(self, raw_fastas):
         """
-        Iterator of FASTA files (called by __iter__).
+        Infers the sequence type of the whole file from its first self._infer_sample_size letter codes.
+        The sequences read to build the sample are buffered and yielded again by the returned iterator.
+
+        Parameters
+        ----------
+        raw_fastas : iterator of (str, str)
+            Iterator of (definition line, sequence), as returned by _iter_raw_fasta_file.
+
+        Returns
+        -------
+        (iterator of (str, str), 'aminoacid' or None)
+            Iterator of all (definition line, sequence) of raw_fastas and the inferred type
+            ('aminoacid' or None if no aminoacid letter codes were found in the sample).
+        """
+        buffered_fastas = []
+        sample_size = 0
+        for definition_line, sequence in raw_fastas:
+            buffered_fastas.append((definition_line, sequence))
+            if _is_aminoacid_sequence(sequence[:self._infer_sample_size - sample_size]):
+                return itertools.chain(buffered_fastas, raw_fastas), 'aminoacid'
+            sample_size += len(sequence)
+            if sample_size >= self._infer_sample_size:
+                break
+        return itertools.chain(buffered_fastas, raw_fastas), None
+
+    def _infers_file_sequences_type(self):
+        """
+        If the sequence type is inferred once for the whole file (infer_type with infer_sample_size, 'rich' only).
+        """
+        return self._infer_type and self._infer_sample_size is not None and self._parse_method == 'rich'
+
+    def _file_sequences_type(self):
+        """
+        Sequence type inferred for the whole file (see _infer_file_sequences_type), read from the beginning of the
+        file on the first call (used by __getitem__, so that lookups by ID agree with iteration).
+
+        Returns
+        -------
+        'aminoacid' or None
+        """
+        if self._inferred_file_sequences_type is _NOT_INFERRED:
+            with self._open_fasta_file() as fasta_file:
+                _, self._inferred_file_sequences_type = self._infer_file_sequences_type(
+                    self._iter_raw_fasta_file(fasta_file))
+        return self._inferred_file_sequences_type
+
+    @staticmethod
+    def _iter_raw_fasta_file(fasta_file):
+        """
+        Iterator of the definition lines and sequences of FASTA files.
 
         Parameters
         ----------
         fasta_file : file object
             An opened file handle.
+
+        Yields
+        ------
+        (str, str)
+            Definition line (including '>' at the beginning) and sequence.
         """
         fasta_file.seek(0)  # restart cursor position (just in case)
 
@@ -175,8 +564,7 @@ class Reader(ParseDefinitionLine):
                 if len(line) > 0 and line[0] != '>':
                     sequence += line
                 elif len(line) > 0 and line[0] == '>':
-                    fasta_sequence = self._generate_fasta_sequence_object(sequence, definition_line)
-                    yield fasta_sequence
+                    yield definition_line, sequence
 
                     # restart variables
                     definition_line = line
@@ -185,27 +573,267 @@ class Reader(ParseDefinitionLine):
 
         # end of file, therefore yield last FASTA sequence
         if len(sequence) > 0:  # a FASTA sequence was actually parsed and were not just blank lines
-            fasta_sequence = self._generate_fasta_sequence_object(sequence, definition_line)
-            yield fasta_sequence
+            yield definition_line, sequence
+
+    def _iter_chunked_fasta_file(self, chunk_size, overlap):
+        """
+        Iterator of FASTA files, with sequences as iterators of chunks (called by stream).
+        The file is read in pieces of at most max(chunk_size, 65536) characters, even if lines are longer.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of letter codes per chunk.
+        overlap : int
+            Number of letter codes shared by consecutive chunks.
+        """
+        fastas = self._iter_owned_chunked_fasta_file(chunk_size, overlap)
+        # the chunks of each FASTA sequence reference the iterator that owns the file handle, so the handle is not
+        # closed while they can still be read (ex: after the iterator returned by stream() is dropped)
+        return (self._fasta_chunks(fasta_chunks.header, _iter_referencing(fasta_chunks.chunks, fastas))
+                for fasta_chunks in fastas)
+
+    def _iter_owned_chunked_fasta_file(self, chunk_size, overlap):
+        """
+        Iterator of FASTA files, with sequences as iterators of chunks, that owns its file handle
+        (called by _iter_chunked_fasta_file).
+        """
+        with self._open_fasta_file() as fasta_file:
+            for fasta_chunks in self._iter_chunked_fasta_file_handle(fasta_file, chunk_size, overlap):
+                yield fasta_chunks
+
+    def _iter_chunked_fasta_file_handle(self, fasta_file, chunk_size, overlap):
+        """
+        Iterator of the given FASTA file handle, with sequences as iterators of chunks (called by
+        _iter_chunked_fasta_file).
+
+        Parameters
+        ----------
+        fasta_file : file object
+            An opened file handle.
+        chunk_size : int
+            Number of letter codes per chunk.
+        overlap : int
+            Number of letter codes shared by consecutive chunks.
+        """
+        read_size = max(chunk_size, 65536)
+        next_definition_line = [None]  # definition line found by iter_chunks (end of the current sequence)
+
+        def read_definition_line(piece):
+            while not piece.endswith('\n'):  # definition line longer than read_size
+                next_piece = fasta_file.readline(read_size)
+                if not next_piece:
+                    break
+                piece += next_piece
+            return piece.strip()
+
+        def iter_chunks():
+            next_definition_line[0] = None
+            chunk = ''
+            chunked = False  # if chunk starts with overlap letter codes that were already yielded
+            at_line_start = True
+            while True:
+                piece = fasta_file.readline(read_size)
+                if not piece:
+                    break
+                if at_line_start and piece.lstrip().startswith('>'):
+                    next_definition_line[0] = read_definition_line(piece)
+                    break
+                at_line_start = piece.endswith('\n')
+                chunk += piece.strip()
+                start = 0
+                while len(chunk) - start >= chunk_size:
+                    yield chunk[start:start + chunk_size]
+                    start += chunk_size - overlap
+                    chunked = True
+                chunk = chunk[start:]
+            if len(chunk) > (overlap if chunked else 0):  # letter codes that were not yet yielded
+                yield chunk
+
+        fasta_file.seek(0)  # restart cursor position (just in case)
+
+        # searching for the first '>' character at the start of a line
+        at_line_start = True
+        while True:
+            piece = fasta_file.readline(read_size)
+            if not piece:
+                return
+            if at_line_start and piece.lstrip().startswith('>'):
+                next_definition_line[0] = read_definition_line(piece)
+                break
+            at_line_start = piece.endswith('\n')
+
+        while next_definition_line[0] is not None:
+            chunks = iter_chunks()
+            yield self._fasta_chunks(next_definition_line[0], chunks)
+            for _ in chunks:  # skip chunks that were not consumed
+                pass
+
+    def _iter_fasta_file(self):
+        """
+        Iterator of FASTA files (called by __iter__).
+        With parse_cache, FASTA sequences are read from a valid cache file or, otherwise, parsed and written to a new
+        cache file (only if the iteration reaches the end of the FASTA file).
+        """
+        cache_writer = None
+        if self._parse_cache is not None:
+            cache_path, fingerprint = self._parse_cache_file()
+            if _is_valid(cache_path, fingerprint):
+                for cached_fasta in _iter_cached_fastas(cache_path):
+                    yield self._restore_cached_fasta(*cached_fasta)
+                return
+            cache_writer = _ParseCacheWriter(cache_path, fingerprint)
+        try:
+            with self._open_fasta_file() as fasta_file:
+                for fasta_sequence in self._iter_fasta_file_handle(fasta_file):
+                    if cache_writer is not None:
+                        cache_writer.add(*self._cache_fields(fasta_sequence))
+                    yield fasta_sequence
+            if cache_writer is not None:
+                cache_writer.commit(self._fasta_file.name)
+        finally:
+            if cache_writer is not None:
+                cache_writer.close()
+
+    def _parse_cache_file(self):
+        """
+        Path of the cache file of this Reader (see parse_cache) and current fingerprint of the FASTA file.
+
+        Returns
+        -------
+        (str, (int, int, bytes))
+        """
+        fasta_path = self._fasta_file.name
+        options = (self._sequences_type, self._infer_type, self._parse_method, self._validate,
+                   self._infer_sample_size, self._fasta_file.encoding, self._fasta_file.errors)
+        return (_cache_path(self._parse_cache, fasta_path, options),
+                _fingerprint(fasta_path, self._parse_cache_hash))
+
+    def _cache_fields(self, fasta_sequence):
+        """
+        Fields of a FASTA sequence stored in cache files (for 'quick', the definition line is stored as the id).
+
+        Returns
+        -------
+        (str, str, str, 'nucleotide', 'aminoacid' or None, bool, bool)
+            id, description, sequence, sequence_type, inferred_type and raw_header.
+        """
+        if self._parse_method == 'rich':
+            return (fasta_sequence.id, fasta_sequence.description, fasta_sequence.sequence_as_string(),
+                    fasta_sequence.sequence_type, fasta_sequence.inferred_type, False)
+        return fasta_sequence.header, '', fasta_sequence.sequence, None, False, True  # 'quick'
+
+    def _restore_cached_fasta(self, id_, description, sequence, sequence_type, inferred_type):
+        """
+        Rebuilds a FASTA sequence from the fields stored in a cache file (see _cache_fields).
+        Warnings are not stored in cache files, so the sequence is validated again (with validate).
+
+        Returns
+        -------
+        FastaSequence or namedtuple('Fasta', ['header', 'sequence'])
+        """
+        if self._validate != 'off':
+            self._validate_sequence(sequence, '>' + id_ if self._parse_method == 'rich' else id_)
+        if self._parse_method == 'rich':
+            return _restore_fasta_sequence(sequence, id_, description, sequence_type, inferred_type)
+        return self._fasta_sequence(id_, sequence)  # 'quick'
+
+    def _iter_fasta_file_handle(self, fasta_file):
+        """
+        Iterator of the given FASTA file handle (called by _iter_fasta_file).
+
+        Parameters
+        ----------
+        fasta_file : file object
+            An opened file handle.
+        """
+        raw_fastas = self._iter_raw_fasta_file(fasta_file)
+
+        sequences_type = None
+        if self._infers_file_sequences_type():
+            raw_fastas, sequences_type = self._infer_file_sequences_type(raw_fastas)
+
+        for definition_line, sequence in raw_fastas:
+            yield self._generate_fasta_sequence_object(sequence, definition_line, sequences_type,
+                                                       sequences_type is not None)
 
     def __iter__(self):
         """
         Iterates over the FASTA file.
         Returns a new iterator of the file (from the beginning) every time __iter__ is called.
+        Each iterator has its own file position (if fasta_file is a file on disk).
         """
         if not self._fasta_file.closed and self._fasta_file.readable():  # check if file is closed
-            self._current_iterator = self._iter_fasta_file(self._fasta_file)
-            return self._current_iterator
+            with self._current_iterator_lock:
+                self._current_iterator = self._iter_fasta_file()
+                return self._current_iterator
         raise TypeError('fasta_file must be opened for reading')
 
     def __next__(self):
         """
         Returns the next FASTA sequence from the current iterator (most recent iterator).
         If no iterator still exists, calls __iter__ to create it.
+        Thread-safe: concurrent calls get different FASTA sequences.
+        """
+        with self._current_iterator_lock:
+            if self._current_iterator is None:
+                self.__iter__()
+            return next(self._current_iterator)
+
+    def __getitem__(self, id_):
+        """
+        Returns the FASTA sequence with the given ID, as generated when iterating (FastaSequence or namedtuple('Fasta',
+        ['header', 'sequence']), depending on parse_method).
+        Only the byte range of the FASTA sequence (found in the hash index) is read, with a positional read
+        (os.pread), so lookups don't change the position of the file or of the iterators and are thread-safe.
+        If cache_size is set, FASTA sequences are cached and repeated lookups return the same object
+        (FastaSequence objects should be copied before being modified).
+
+        Parameters
+        ----------
+        id_ : str
+            ID of the FASTA sequence (first word of its definition line, without '>').
+
+        Returns
+        -------
+        FastaSequence or namedtuple('Fasta', ['header', 'sequence'])
+
+        Raises
+        ------
+        TypeError
+            If Reader has no index, id_ is not a str or fasta_file is closed.
+        KeyError
+            If id_ is not in the index.
+        """
+        if self._index is None:
+            raise TypeError('Reader must have an index to get FASTA sequences by ID')
+        if self._fasta_file.closed:
+            raise TypeError('fasta_file must be opened for reading')
+        if self._cache is not None:
+            fasta_sequence = self._cache.get(id_)
+            if fasta_sequence is not None:
+                return fasta_sequence
+        offset, length = self._index[id_]
+        raw_fasta = self._read_bytes(offset, length)
+        encoding = getattr(self._fasta_file, 'encoding', None) or 'utf-8'
+        errors = getattr(self._fasta_file, 'errors', None) or 'strict'
+        definition_line, sequence = next(self._iter_raw_fasta_file(io.StringIO(raw_fasta.decode(encoding, errors))))
+        sequences_type = self._file_sequences_type() if self._infers_file_sequences_type() else None
+        fasta_sequence = self._generate_fasta_sequence_object(sequence, definition_line, sequences_type,
+                                                              sequences_type is not None)
+        if self._cache is not None:
+            self._cache.put(id_, fasta_sequence, _memory_size(fasta_sequence))
+        return fasta_sequence
+
+    def _read_bytes(self, offset, length):
+        """
+        Reads length bytes of the FASTA file, from offset, without changing its file position.
         """
-        if self._current_iterator is None:
-            self.__iter__()
-        return next(self._current_iterator)
+        if hasattr(os, 'pread'):
+            return os.pread(self._fasta_file.fileno(), length, offset)
+        with open(self._fasta_file.name, 'rb') as fasta_file:  # no os.pread (Windows)
+            fasta_file.seek(offset)
+            return fasta_file.read(length)
 
     def __repr__(self):
         return 'fastaparser.Reader(%s)' % os.path.abspath(self._fasta_file.name)
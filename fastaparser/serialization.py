@@ -0,0 +1,274 @@
+#!python
+# coding: utf-8
+
+"""
+Compact binary serialization of batches of FASTA sequences.
+
+Binary format (little-endian):
+    header: magic (4 bytes, b'FPSB'), version (uint8), number of FASTA sequences (uint64)
+    table: for each FASTA sequence, data offset (uint64, from the start of the data), id length (uint32),
+           description length (uint32), sequence length (uint64), sequence_type (uint8), inferred_type (uint8) and
+           raw_header (uint8)
+    data: for each FASTA sequence, id, description and sequence (utf-8), one after the other
+
+(header, sequence) tuples (ex: generated by Reader's 'quick' parse method) store their whole definition line, starting
+with '>', in the id field (and an empty description), marked by raw_header, so headers are restored verbatim.
+
+Lengths are in bytes. The table allows reading any FASTA sequence without reading the ones before it.
+"""
+
+import struct
+from .fastasequence import Fasta, FastaSequence, _restore_fasta_sequence
+from .parsedefinitionline import ParseDefinitionLine
+
+
+_MAGIC = b'FPSB'
+_VERSION = 2
+_HEADER = struct.Struct('<4sBQ')
+_TABLE_ENTRY = struct.Struct('<QIIQBBB')
+_SEQUENCE_TYPES = (None, 'nucleotide', 'aminoacid')  # sequence_type code is the index
+
+
+def _encode_fasta(fasta_sequence):
+    """
+    Converts a FastaSequence or a (header, sequence) tuple into its serializable fields.
+    The definition line of a (header, sequence) tuple (with '>' added at the beginning, if missing) is stored as the id.
+
+    Parameters
+    ----------
+    fasta_sequence : FastaSequence or (header : str, sequence : str)
+        FASTA sequence.
+
+    Returns
+    -------
+    (bytes, bytes, bytes, int, bool, bool)
+        id, description and sequence (utf-8), sequence_type code, inferred_type and raw_header
+        (if the id is the definition line of a (header, sequence) tuple).
+
+    Raises
+    ------
+    TypeError
+        If fasta_sequence is of the wrong type.
+    """
+    if isinstance(fasta_sequence, FastaSequence):
+        return (fasta_sequence.id.encode('utf-8'), fasta_sequence.description.encode('utf-8'),
+                fasta_sequence.sequence_as_string().encode('utf-8'),
+                _SEQUENCE_TYPES.index(fasta_sequence.sequence_type), fasta_sequence.inferred_type, False)
+    if (isinstance(fasta_sequence, (tuple, list))
+            and len(fasta_sequence) == 2
+            and isinstance(fasta_sequence[0], str)
+            and isinstance(fasta_sequence[1], str)):
+        definition_line = fasta_sequence[0] if fasta_sequence[0].startswith('>') else '>' + fasta_sequence[0]
+        return definition_line.encode('utf-8'), b'', fasta_sequence[1].encode('utf-8'), 0, False, True
+    raise TypeError('fasta_sequences must be an iterable of FastaSequence '
+                    'objects or an iterable of tuples (header : str, sequence : str)')
+
+
+def _decode_id_and_description(id_, description, raw_header):
+    """
+    Decodes the id and description fields of a FASTA sequence (see _encode_fasta), parsing the definition line
+    stored in the id field by (header, sequence) tuples.
+
+    Parameters
+    ----------
+    id_ : bytes-like object
+        id field (utf-8).
+    description : bytes-like object
+        description field (utf-8).
+    raw_header : bool
+        If the id field is the definition line of a (header, sequence) tuple.
+
+    Returns
+    -------
+    (str, str)
+        ID and description.
+    """
+    if raw_header:
+        return ParseDefinitionLine._parse_definition_line(str(id_, 'utf-8'))  # pylint: disable=protected-access
+    return str(id_, 'utf-8'), str(description, 'utf-8')
+
+
+def _pack(encoded_fastas):
+    """
+    Packs encoded FASTA sequences (see _encode_fasta) into the binary format.
+
+    Parameters
+    ----------
+    encoded_fastas : list of (bytes, bytes, bytes, int, bool, bool)
+        Encoded FASTA sequences.
+
+    Returns
+    -------
+    bytes
+    """
+    table = []
+    data = []
+    data_offset = 0
+    for id_, description, sequence, sequence_type, inferred_type, raw_header in encoded_fastas:
+        table.append(_TABLE_ENTRY.pack(data_offset, len(id_), len(description), len(sequence), sequence_type,
+                                       inferred_type, raw_header))
+        data.extend((id_, description, sequence))
+        data_offset += len(id_) + len(description) + len(sequence)
+    return b''.join([_HEADER.pack(_MAGIC, _VERSION, len(encoded_fastas))] + table + data)
+
+
+def _iter_unpacked(buffer):
+    """
+    Iterates over the FASTA sequences of a buffer in the binary format, without copying their contents.
+
+    Parameters
+    ----------
+    buffer : bytes-like object
+        Data in the binary format.
+
+    Yields
+    ------
+    (memoryview, memoryview, memoryview, 'nucleotide', 'aminoacid' or None, bool, bool)
+        id, description and sequence (utf-8), sequence_type, inferred_type and raw_header.
+
+    Raises
+    ------
+    TypeError
+        If buffer is not in the binary format.
+    """
+    buffer = memoryview(buffer)
+    count = _unpack_header(buffer)
+    data_start = _HEADER.size + count * _TABLE_ENTRY.size
+    for index in range(count):
+        yield _unpack_entry(buffer, index, data_start)
+
+
+def _unpack_header(buffer):
+    """
+    Checks the header of a buffer in the binary format.
+
+    Parameters
+    ----------
+    buffer : memoryview
+        Data in the binary format.
+
+    Returns
+    -------
+    int
+        Number of FASTA sequences.
+
+    Raises
+    ------
+    TypeError
+        If buffer is not in the binary format.
+    """
+    if len(buffer) < _HEADER.size:
+        raise TypeError('data is not a batch of serialized FASTA sequences')
+    magic, version, count = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC or version != _VERSION or len(buffer) < _HEADER.size + count * _TABLE_ENTRY.size:
+        raise TypeError('data is not a batch of serialized FASTA sequences')
+    return count
+
+
+def _unpack_entry(buffer, index, data_start):
+    """
+    Reads a single FASTA sequence of a buffer in the binary format, without copying its contents.
+
+    Parameters
+    ----------
+    buffer : memoryview
+        Data in the binary format.
+    index : int
+        Index of the FASTA sequence.
+    data_start : int
+        Offset of the data section.
+
+    Returns
+    -------
+    (memoryview, memoryview, memoryview, 'nucleotide', 'aminoacid' or None, bool, bool)
+        id, description and sequence (utf-8), sequence_type, inferred_type and raw_header.
+
+    Raises
+    ------
+    TypeError
+        If the FASTA sequence is outside of buffer (ex: truncated data).
+    """
+    offset, id_length, description_length, sequence_length, sequence_type, inferred_type, raw_header = \
+        _TABLE_ENTRY.unpack_from(buffer, _HEADER.size + index * _TABLE_ENTRY.size)
+    id_start = data_start + offset
+    description_start = id_start + id_length
+    sequence_start = description_start + description_length
+    if sequence_start + sequence_length > len(buffer) or sequence_type >= len(_SEQUENCE_TYPES):
+        raise TypeError('data is not a batch of serialized FASTA sequences')
+    return (buffer[id_start:description_start], buffer[description_start:sequence_start],
+            buffer[sequence_start:sequence_start + sequence_length], _SEQUENCE_TYPES[sequence_type],
+            bool(inferred_type), bool(raw_header))
+
+
+def serialize_fastas(fasta_sequences):
+    """
+    Serializes FASTA sequences into a compact binary format
+    (id, description, sequence_type and sequence of each FASTA sequence, instead of LetterCode objects).
+
+    Parameters
+    ----------
+    fasta_sequences : iterable of FastaSequence or iterable of (header : str, sequence : str)
+        FASTA sequences (ex: generated by Reader with either parse method).
+
+    Returns
+    -------
+    bytes
+        Serialized FASTA sequences.
+
+    Raises
+    ------
+    TypeError
+        If fasta_sequences is of the wrong type.
+    """
+    try:
+        iter(fasta_sequences)
+    except TypeError:
+        raise TypeError('fasta_sequences must be an iterable of FastaSequence '
+                        'objects or an iterable of tuples (header : str, sequence : str)')
+    return _pack([_encode_fasta(fasta_sequence) for fasta_sequence in fasta_sequences])
+
+
+def deserialize_fastas(data, parse_method='rich'):
+    """
+    Deserializes FASTA sequences serialized with serialize_fastas.
+
+    Parameters
+    ----------
+    data : bytes-like object
+        Serialized FASTA sequences.
+    parse_method: 'rich' or 'quick', optional
+        'rich' returns FastaSequence objects.
+        'quick' returns namedtuple('Fasta', ['header', 'sequence']) objects, as generated by Reader.
+
+    Returns
+    -------
+    list of FastaSequence or list of namedtuple('Fasta', ['header', 'sequence'])
+        Deserialized FASTA sequences.
+
+    Raises
+    ------
+    TypeError
+        If data is not in the binary format or parse_method is of the wrong type.
+    """
+    if parse_method not in ('rich', 'quick'):
+        raise TypeError('parse_method must be one of: rich, quick')
+    try:
+        unpacked_fastas = list(_iter_unpacked(data))
+    except (TypeError, struct.error):
+        raise TypeError('data is not a batch of serialized FASTA sequences')
+
+    fasta_sequences = []
+    for id_, description, sequence, sequence_type, inferred_type, raw_header in unpacked_fastas:
+        sequence = str(sequence, 'utf-8')
+        if parse_method == 'rich':
+            fasta_sequences.append(_restore_fasta_sequence(
+                sequence, *_decode_id_and_description(id_, description, raw_header), sequence_type, inferred_type))
+        else:  # 'quick'
+            id_ = str(id_, 'utf-8')
+            if raw_header:  # definition line of a (header, sequence) tuple
+                header = id_
+            else:
+                description = str(description, 'utf-8')
+                header = '>%s %s' % (id_, description) if description else '>' + id_
+            fasta_sequences.append(Fasta(header, sequence))
+    return fasta_sequences
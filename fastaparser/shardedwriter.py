@@ -0,0 +1,239 @@
+#!python
+# coding: utf-8
+
+"""
+ShardedWriter - Writes FASTA sequences to many FASTA files (shards), chosen by a key function.
+"""
+
+import collections
+from .fastasequence import _wrap_sequence
+from .writer import _fasta_parts
+
+
+class ShardedWriter:
+    """
+    Writes FASTA sequences to many FASTA files (shards). The shard of each FASTA sequence is chosen by a key function
+    (ex: hash of the ID, length bucket, taxonomy token from the description), and its path is built from path_template.
+    Formatted FASTA sequences are buffered per shard and written in batches, and at most max_open_files files are open
+    at a time (the least recently used file is closed when another one has to be opened, and reopened in append mode
+    if needed again), so thousands of shards can be written in a single pass.
+
+    ex:
+        > import zlib
+        > import fastaparser
+        > def bucket(fasta):
+        >     return zlib.crc32(fasta.header.split()[0].encode()) % 1000
+        > with open('database.fasta') as fasta_file:
+        >     with fastaparser.ShardedWriter('shards/bucket_{key}.fasta', bucket) as sharded_writer:
+        >         sharded_writer.writefastas(fastaparser.Reader(fasta_file, parse_method='quick'))
+
+    Attributes
+    ----------
+    path_template : str
+        Template of the path of each shard.
+    paths : dict of {key : path}
+        Paths of the shards written so far, by key.
+
+    Methods
+    -------
+    writefasta(FastaSequence or (header, sequence))
+        Writes a single FASTA sequence to its shard (same as Writer.writefasta).
+    writefastas(list of: FastaSequence or (header, sequence))
+        Writes multiple FASTA sequences to their shards.
+    flush()
+        Writes every buffered FASTA sequence to its shard.
+    close()
+        Writes every buffered FASTA sequence and closes every shard.
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if any parameter is of the wrong type.
+        When calling writefasta() or writefastas(), if fasta_sequence or fasta_sequences are of the wrong type.
+    ValueError
+        When calling writefasta() or writefastas(), if the ShardedWriter is closed.
+    """
+
+    def __init__(self, path_template, key, max_open_files=64, buffer_size=65536, max_buffered_size=67108864,
+                 line_width=70, mode='w', encoding='utf-8'):
+        """
+        Initializes ShardedWriter. No file is opened until a FASTA sequence is written to it.
+
+        Parameters
+        ----------
+        path_template : str
+            Template of the path of each shard, formatted with the key of the shard (ex: 'shards/bucket_{key}.fasta').
+        key : callable
+            Function that receives each FASTA sequence (as passed to writefasta) and returns the key of its shard.
+        max_open_files : int, optional
+            Maximum number of shards open at a time.
+        buffer_size : int, optional
+            Number of characters buffered per shard before writing them to the shard.
+        max_buffered_size : int, optional
+            Maximum number of characters buffered for all shards. When reached, every buffer is written.
+        line_width : int, optional
+            Maximum number of sequence characters per line.
+        mode : 'w' or 'a', optional
+            'w' truncates existing shard files the first time they are written to. 'a' appends to them.
+        encoding : str, optional
+            Encoding of the shard files.
+
+        Raises
+        ------
+        TypeError
+            If any parameter is of the wrong type.
+        """
+        if not isinstance(path_template, str) or '{key' not in path_template:
+            raise TypeError('path_template must be a str containing \'{key}\'')
+        if not callable(key):
+            raise TypeError('key must be callable')
+        for name, value in (('max_open_files', max_open_files), ('buffer_size', buffer_size),
+                            ('max_buffered_size', max_buffered_size), ('line_width', line_width)):
+            if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+                raise TypeError('%s must be a positive int' % name)
+        if mode not in ('w', 'a'):
+            raise TypeError('mode must be one of: w, a')
+
+        self._path_template = path_template
+        self._key = key
+        self._max_open_files = max_open_files
+        self._buffer_size = buffer_size
+        self._max_buffered_size = max_buffered_size
+        self._line_width = line_width
+        self._mode = mode
+        self._encoding = encoding
+
+        self._paths = {}  # {key: path}
+        self._open_files = collections.OrderedDict()  # {path: file object}, from least to most recently used
+        self._opened_paths = set()
+        self._buffers = {}  # {path: [formatted FASTA sequences, number of characters]}
+        self._buffered_size = 0
+        self._closed = False
+
+    @property
+    def path_template(self):
+        """return path_template."""
+        return self._path_template
+
+    @property
+    def paths(self):
+        """return paths."""
+        return dict(self._paths)
+
+    def writefasta(self, fasta_sequence):
+        """
+        Writes a single FASTA sequence to its shard (buffered).
+
+        Parameters
+        ----------
+        fasta_sequence : FastaSequence or (header : str or bytes, sequence : str or bytes)
+            FASTA sequence, as in Writer.writefasta.
+
+        Raises
+        ------
+        TypeError
+            If fasta_sequence is of the wrong type.
+        ValueError
+            If the ShardedWriter is closed.
+        """
+        if self._closed:
+            raise ValueError('I/O operation on closed ShardedWriter')
+        _, definition_line, sequence = _fasta_parts(fasta_sequence)
+        formatted_fasta = definition_line + '\n' + _wrap_sequence(sequence, self._line_width) + '\n\n'
+
+        key = self._key(fasta_sequence)
+        path = self._paths.get(key)
+        if path is None:
+            path = self._paths[key] = self._path_template.format(key=key)
+        buffer = self._buffers.get(path)
+        if buffer is None:
+            buffer = self._buffers[path] = [[], 0]
+        buffer[0].append(formatted_fasta)
+        buffer[1] += len(formatted_fasta)
+        self._buffered_size += len(formatted_fasta)
+
+        if buffer[1] >= self._buffer_size:
+            self._write_buffer(path)
+        if self._buffered_size >= self._max_buffered_size:
+            self.flush()
+
+    def writefastas(self, fasta_sequences):
+        """
+        Writes multiple FASTA sequences to their shards (buffered).
+
+        Parameters
+        ----------
+        fasta_sequences : iterable of FastaSequence or iterable of (header : str or bytes, sequence : str or bytes)
+            FASTA sequences, as in Writer.writefastas.
+
+        Raises
+        ------
+        TypeError
+            If fasta_sequences is not iterable or any FASTA sequence is of the wrong type.
+        ValueError
+            If the ShardedWriter is closed.
+        """
+        try:
+            iter(fasta_sequences)
+        except TypeError:
+            raise TypeError('fasta_sequences must be an iterable of FastaSequence '
+                            'objects or an iterable of tuples (header : str, sequence : str)')
+        for fasta in fasta_sequences:
+            self.writefasta(fasta)
+
+    def flush(self):
+        """
+        Writes every buffered FASTA sequence to its shard
+        (shards that are already open are written first, to avoid closing them).
+        """
+        for path in sorted(self._buffers, key=lambda path: path not in self._open_files):
+            self._write_buffer(path)
+        for shard_file in self._open_files.values():
+            shard_file.flush()
+
+    def close(self):
+        """
+        Writes every buffered FASTA sequence and closes every shard.
+        ShardedWriter objects can also be used as context managers, which call close() on exit.
+        """
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            while self._open_files:
+                self._open_files.popitem(last=False)[1].close()
+
+    def _write_buffer(self, path):
+        """
+        Writes the buffered FASTA sequences of a shard.
+        """
+        formatted_fastas, buffered_size = self._buffers.pop(path)
+        self._buffered_size -= buffered_size
+        self._shard_file(path).writelines(formatted_fastas)
+
+    def _shard_file(self, path):
+        """
+        Returns the file object of a shard, opening it (and closing the least recently used shard) if needed.
+        """
+        shard_file = self._open_files.get(path)
+        if shard_file is not None:
+            self._open_files.move_to_end(path)
+            return shard_file
+        if len(self._open_files) >= self._max_open_files:
+            self._open_files.popitem(last=False)[1].close()
+        # shards are truncated ('w' mode) only the first time they are opened
+        mode = 'a' if self._mode == 'a' or path in self._opened_paths else 'w'
+        shard_file = self._open_files[path] = open(path, mode, encoding=self._encoding)
+        self._opened_paths.add(path)
+        return shard_file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return 'fastaparser.ShardedWriter(%s)' % self._path_template
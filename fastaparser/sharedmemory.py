@@ -0,0 +1,269 @@
+#!python
+# coding: utf-8
+
+"""
+SharedFastas - Batch of FASTA sequences published in shared memory, for zero-copy access from other processes.
+"""
+
+import weakref
+from collections import namedtuple
+from .serialization import _decode_id_and_description, _encode_fasta, _pack, _unpack_header, _unpack_entry, _HEADER, \
+    _TABLE_ENTRY
+from .fastasequence import _restore_fasta_sequence
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+
+# FASTA sequences accessed through SharedFastas (sequence is a read-only memoryview of the shared memory)
+SharedFasta = namedtuple('SharedFasta', ['id', 'description', 'sequence_type', 'sequence'])
+
+
+def _detach(buffer, block):
+    """
+    Releases the read-only view of a shared memory block and closes the block, when its SharedFastas object is
+    garbage collected without being closed (otherwise SharedMemory.__del__ fails, as the view is still exported).
+    If memoryviews obtained from the SharedFastas object are still alive, the block can't be closed yet and is
+    closed by SharedMemory.__del__ instead.
+
+    Parameters
+    ----------
+    buffer : memoryview
+        Read-only view of the shared memory block.
+    block : multiprocessing.shared_memory.SharedMemory
+        Shared memory block.
+    """
+    buffer.release()
+    try:
+        block.close()
+    except BufferError:
+        pass
+
+
+class SharedFastas:
+    """
+    Batch of FASTA sequences published in shared memory (multiprocessing.shared_memory, python 3.8+).
+    FASTA sequences are stored once, in the serialize_fastas binary format, and every process that attaches to the
+    shared memory (by name) gets read-only views of the same memory, without copying or pickling the sequences.
+    Pickling a SharedFastas object (ex: sending it to a worker process) only pickles its name, and unpickling it
+    attaches to the same shared memory.
+
+    ex:
+        > import fastaparser
+        > with open('fasta_file.fasta') as fasta_file:
+        >   shared_fastas = fastaparser.SharedFastas.publish(fastaparser.Reader(fasta_file, parse_method='quick'))
+        > # in the worker processes, attach by name (or receive shared_fastas itself as an argument)
+        > worker_shared_fastas = fastaparser.SharedFastas(shared_fastas.name)
+        > bytes(worker_shared_fastas[0].sequence[:10])
+        > # when all workers are done
+        > shared_fastas.close()
+        > shared_fastas.unlink()
+
+    Attributes
+    ----------
+    name : str
+        Name of the shared memory block.
+
+    Methods
+    -------
+    publish(fasta_sequences, name=None)
+        Alternate __init__ method. Copies FASTA sequences into a new shared memory block.
+    fastasequence(index)
+        Returns a (copied) FastaSequence of the FASTA sequence at index.
+    close()
+        Detaches from the shared memory.
+    unlink()
+        Destroys the shared memory (should be called once, by the process that published it).
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if name is not a str or the shared memory doesn't contain FASTA sequences.
+        When calling publish(), if fasta_sequences is of the wrong type.
+        When calling __getitem__, if index is not an int.
+    ImportError
+        When calling __init__ or publish(), if multiprocessing.shared_memory is not available (python < 3.8).
+    """
+
+    def __init__(self, name):
+        """
+        Attaches to the shared memory block with the given name.
+
+        Parameters
+        ----------
+        name : str
+            Name of a shared memory block created with SharedFastas.publish.
+
+        Raises
+        ------
+        TypeError
+            If name is not a str or the shared memory doesn't contain FASTA sequences.
+        ImportError
+            If multiprocessing.shared_memory is not available (python < 3.8).
+        """
+        if shared_memory is None:
+            raise ImportError('SharedFastas requires multiprocessing.shared_memory (python 3.8+)')
+        if not isinstance(name, str):
+            raise TypeError('name must be str')
+        self._attach(shared_memory.SharedMemory(name=name))
+
+    @classmethod
+    def publish(cls, fasta_sequences, name=None):
+        """
+        Copies FASTA sequences into a new shared memory block.
+
+        Parameters
+        ----------
+        fasta_sequences : iterable of FastaSequence or iterable of (header : str, sequence : str)
+            FASTA sequences (ex: generated by Reader with either parse method).
+        name : str or None, optional
+            Name of the shared memory block. None generates a unique name.
+
+        Returns
+        -------
+        SharedFastas
+            Attached to the new shared memory block.
+
+        Raises
+        ------
+        TypeError
+            If fasta_sequences is of the wrong type.
+        ImportError
+            If multiprocessing.shared_memory is not available (python < 3.8).
+        """
+        if shared_memory is None:
+            raise ImportError('SharedFastas requires multiprocessing.shared_memory (python 3.8+)')
+        try:
+            iter(fasta_sequences)
+        except TypeError:
+            raise TypeError('fasta_sequences must be an iterable of FastaSequence '
+                            'objects or an iterable of tuples (header : str, sequence : str)')
+        data = _pack([_encode_fasta(fasta_sequence) for fasta_sequence in fasta_sequences])
+        block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        block.buf[:len(data)] = data
+        shared_fastas = cls.__new__(cls)
+        shared_fastas._attach(block)  # pylint: disable=protected-access
+        return shared_fastas
+
+    @property
+    def name(self):
+        """return name."""
+        return self._shared_memory.name
+
+    def fastasequence(self, index):
+        """
+        Returns a FastaSequence of the FASTA sequence at index (copied out of the shared memory).
+
+        Parameters
+        ----------
+        index : int
+            Index of the FASTA sequence.
+
+        Returns
+        -------
+        FastaSequence
+        """
+        id_, description, sequence, sequence_type, inferred_type, raw_header = self._entry(index)
+        return _restore_fasta_sequence(str(sequence, 'utf-8'),
+                                       *_decode_id_and_description(id_, description, raw_header),
+                                       sequence_type, inferred_type)
+
+    def close(self):
+        """
+        Detaches from the shared memory.
+        Every memoryview obtained from this object must be released (or deleted) before calling close.
+        SharedFastas objects that are not closed (ex: unpickled in worker processes) detach when garbage collected.
+        """
+        self._buffer.release()
+        self._shared_memory.close()
+        self._finalizer.detach()
+
+    def unlink(self):
+        """
+        Destroys the shared memory. Should be called once, by the process that published it.
+        """
+        self._shared_memory.unlink()
+
+    def _attach(self, block):
+        """
+        Attaches to a shared memory block.
+
+        Parameters
+        ----------
+        block : multiprocessing.shared_memory.SharedMemory
+            Shared memory block containing FASTA sequences in the serialize_fastas binary format.
+
+        Raises
+        ------
+        TypeError
+            If the shared memory doesn't contain FASTA sequences.
+        """
+        self._shared_memory = block
+        self._buffer = block.buf.toreadonly()
+        self._finalizer = weakref.finalize(self, _detach, self._buffer, block)
+        try:
+            self._count = _unpack_header(self._buffer)
+        except TypeError:
+            self.close()
+            raise TypeError('shared memory %r does not contain FASTA sequences' % block.name)
+        self._data_start = _HEADER.size + self._count * _TABLE_ENTRY.size
+
+    def _entry(self, index):
+        """
+        Reads the FASTA sequence at index from the shared memory (without copying).
+
+        Parameters
+        ----------
+        index : int
+            Index of the FASTA sequence. Can be negative.
+
+        Returns
+        -------
+        (memoryview, memoryview, memoryview, 'nucleotide', 'aminoacid' or None, bool, bool)
+
+        Raises
+        ------
+        TypeError
+            If index is not an int.
+        IndexError
+            If index is out of range.
+        """
+        if not isinstance(index, int):
+            raise TypeError('Indices must be integers')
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('SharedFastas index out of range')
+        return _unpack_entry(self._buffer, index, self._data_start)
+
+    def __getitem__(self, index):
+        """
+        Returns SharedFasta(id, description, sequence_type, sequence) of the FASTA sequence at index.
+        sequence is a read-only memoryview (utf-8) of the shared memory.
+        """
+        id_, description, sequence, sequence_type, _, raw_header = self._entry(index)
+        return SharedFasta(*_decode_id_and_description(id_, description, raw_header), sequence_type, sequence)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def __len__(self):
+        return self._count
+
+    def __reduce__(self):
+        """
+        Pickles only the name of the shared memory. Unpickling attaches to the same shared memory.
+        """
+        return SharedFastas, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return 'fastaparser.SharedFastas(%s)' % self.name
@@ -0,0 +1,355 @@
+#!python
+# coding: utf-8
+
+"""
+SQLiteStore - FASTA sequences stored in an SQLite database, with bulk import and indexed queries.
+"""
+
+import json
+import os
+import sqlite3
+from .fastasequence import _restore_fasta_sequence
+from .serialization import _decode_id_and_description, _encode_fasta, _SEQUENCE_TYPES
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS fastas (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    description TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    sequence_type INTEGER NOT NULL,
+    inferred_type INTEGER NOT NULL,
+    composition TEXT NOT NULL,
+    sequence BLOB NOT NULL
+)
+'''
+# {index name: column}, created after the first bulk import
+# (building an index once is much faster than updating it on every insert)
+_INDEXES = {'fastas_id': 'id', 'fastas_length': 'length'}
+_INSERT = ('INSERT INTO fastas (id, description, length, sequence_type, inferred_type, composition, sequence) '
+           'VALUES (?, ?, ?, ?, ?, ?, ?)')
+_COLUMNS = 'id, description, sequence_type, inferred_type, sequence'
+
+
+def _composition(sequence):
+    """
+    Number of occurrences of each letter code of a sequence, as JSON.
+
+    Parameters
+    ----------
+    sequence : str
+        Sequence.
+
+    Returns
+    -------
+    str
+        JSON object {letter code: occurrences}.
+    """
+    return json.dumps({letter_code: sequence.count(letter_code) for letter_code in set(sequence)}, sort_keys=True)
+
+
+class SQLiteStore:
+    """
+    FASTA sequences stored in an SQLite database (one row per FASTA sequence, with its id, description, length,
+    composition and sequence), indexed by id and length, so FASTA sequences can be queried without scanning a
+    FASTA file. FASTA sequences are imported in bulk, in large transactions.
+
+    ex:
+        > import fastaparser
+        > with fastaparser.SQLiteStore('uniprot.sqlite') as store:
+        >     with open('uniprot.fasta') as fasta_file:
+        >         store.import_fastas(fastaparser.Reader(fasta_file, parse_method='quick'))
+        >     store['sp|P69905|HBA_HUMAN'].description
+        >     [fasta.id for fasta in store.query(min_length=30000, description='%Homo sapiens%')]
+
+    Attributes
+    ----------
+    database_path : str
+        Path of the SQLite database.
+
+    Methods
+    -------
+    import_fastas(fasta_sequences, batch_size=50000)
+        Imports FASTA sequences, in transactions of batch_size FASTA sequences.
+    get(id, default=None)
+        Returns the FASTA sequence with the given ID, or default if not stored.
+    query(ids=None, min_length=None, max_length=None, description=None, limit=None)
+        Iterates over the FASTA sequences that match every given condition.
+    composition(id)
+        Returns the number of occurrences of each letter code of the FASTA sequence with the given ID.
+    close()
+        Closes the database.
+
+    Raises
+    ------
+    TypeError
+        When calling __init__, if database_path is not a str.
+        When calling import_fastas(), if fasta_sequences or batch_size are of the wrong type.
+        When calling get(), query(), composition() or __getitem__, if any parameter is of the wrong type.
+    KeyError
+        When calling composition() or __getitem__, if id is not stored.
+    """
+
+    def __init__(self, database_path):
+        """
+        Opens (or creates) an SQLite database of FASTA sequences.
+
+        Parameters
+        ----------
+        database_path : str
+            Path of the SQLite database (':memory:' for an in memory database).
+
+        Raises
+        ------
+        TypeError
+            If database_path is not a str.
+        """
+        if not isinstance(database_path, str):
+            raise TypeError('database_path must be a str')
+        self._database_path = database_path
+        self._connection = sqlite3.connect(database_path)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+            self._create_indexes()
+
+    @property
+    def database_path(self):
+        """return database_path."""
+        return self._database_path
+
+    def import_fastas(self, fasta_sequences, batch_size=50000):
+        """
+        Imports FASTA sequences, in transactions of batch_size FASTA sequences (inserted with executemany).
+        If the database is empty, the indexes are dropped during the import and built at the end.
+
+        Parameters
+        ----------
+        fasta_sequences : iterable of FastaSequence or iterable of (header : str, sequence : str)
+            FASTA sequences (ex: generated by Reader with either parse method).
+        batch_size : int, optional
+            Number of FASTA sequences per transaction.
+
+        Returns
+        -------
+        int
+            Number of FASTA sequences imported.
+
+        Raises
+        ------
+        TypeError
+            If fasta_sequences or batch_size are of the wrong type.
+        """
+        try:
+            fasta_sequences = iter(fasta_sequences)
+        except TypeError:
+            raise TypeError('fasta_sequences must be an iterable of FastaSequence '
+                            'objects or an iterable of tuples (header : str, sequence : str)')
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool) or batch_size <= 0:
+            raise TypeError('batch_size must be a positive int')
+
+        imported = 0
+        if not len(self):
+            with self._connection:
+                for index_name in _INDEXES:
+                    self._connection.execute('DROP INDEX IF EXISTS %s' % index_name)
+        try:
+            while True:
+                rows = []
+                for fasta_sequence in fasta_sequences:
+                    id_, description, sequence, sequence_type, inferred_type, raw_header = _encode_fasta(fasta_sequence)
+                    string_sequence = str(sequence, 'utf-8').upper()  # as FastaSequence, soft-masking is dropped
+                    rows.append((*_decode_id_and_description(id_, description, raw_header), len(string_sequence),
+                                 sequence_type, inferred_type, _composition(string_sequence),
+                                 string_sequence.encode('utf-8')))
+                    if len(rows) == batch_size:
+                        break
+                if not rows:
+                    break
+                with self._connection:  # one transaction per batch
+                    self._connection.executemany(_INSERT, rows)
+                imported += len(rows)
+        finally:
+            with self._connection:
+                self._create_indexes()
+        return imported
+
+    def get(self, id_, default=None):
+        """
+        Returns the FASTA sequence with the given ID (the first one imported, if the ID is repeated),
+        or default if it is not stored.
+
+        Parameters
+        ----------
+        id_ : str
+            ID of the FASTA sequence.
+        default : object, optional
+            Returned if id_ is not stored.
+
+        Returns
+        -------
+        FastaSequence or default
+
+        Raises
+        ------
+        TypeError
+            If id_ is not a str.
+        """
+        if not isinstance(id_, str):
+            raise TypeError('id must be a str')
+        row = self._connection.execute(
+            'SELECT %s FROM fastas WHERE id = ? ORDER BY rowid LIMIT 1' % _COLUMNS, (id_,)).fetchone()
+        return self._fasta_sequence(row) if row is not None else default
+
+    def query(self, ids=None, min_length=None, max_length=None, description=None, limit=None):
+        """
+        Iterates over the FASTA sequences that match every given condition, in import order.
+        Conditions on ids and lengths use the indexes of the database.
+
+        Parameters
+        ----------
+        ids : iterable of str or None, optional
+            IDs of the FASTA sequences.
+        min_length : int or None, optional
+            Minimum length of the sequences.
+        max_length : int or None, optional
+            Maximum length of the sequences.
+        description : str or None, optional
+            SQL LIKE pattern matched by the descriptions (ex: '%Homo sapiens%'; case insensitive for ascii letters).
+        limit : int or None, optional
+            Maximum number of FASTA sequences.
+
+        Returns
+        -------
+        iterator of FastaSequence
+
+        Raises
+        ------
+        TypeError
+            If any parameter is of the wrong type.
+        """
+        conditions = []
+        parameters = []
+        if ids is not None:
+            if isinstance(ids, str):
+                raise TypeError('ids must be an iterable of str or None')
+            try:
+                ids = list(ids)
+            except TypeError:
+                raise TypeError('ids must be an iterable of str or None')
+            if not all(isinstance(id_, str) for id_ in ids):
+                raise TypeError('ids must be an iterable of str or None')
+            # a single JSON array parameter (instead of 'IN (?, ?, ...)') has no limit on the number of IDs
+            conditions.append('id IN (SELECT value FROM json_each(?))')
+            parameters.append(json.dumps(ids))
+        for name, value, condition in (('min_length', min_length, 'length >= ?'),
+                                       ('max_length', max_length, 'length <= ?'),
+                                       ('limit', limit, None)):
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+                raise TypeError('%s must be a non-negative int or None' % name)
+            if value is not None and condition is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        if description is not None:
+            if not isinstance(description, str):
+                raise TypeError('description must be a str or None')
+            conditions.append('description LIKE ?')
+            parameters.append(description)
+
+        sql = 'SELECT %s FROM fastas' % _COLUMNS
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY rowid'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        return (self._fasta_sequence(row) for row in self._connection.execute(sql, parameters))
+
+    def composition(self, id_):
+        """
+        Returns the number of occurrences of each letter code of the FASTA sequence with the given ID
+        (computed on import, so the sequence is not read).
+
+        Parameters
+        ----------
+        id_ : str
+            ID of the FASTA sequence.
+
+        Returns
+        -------
+        dict of {str: int}
+
+        Raises
+        ------
+        TypeError
+            If id_ is not a str.
+        KeyError
+            If id_ is not stored.
+        """
+        if not isinstance(id_, str):
+            raise TypeError('id must be a str')
+        row = self._connection.execute(
+            'SELECT composition FROM fastas WHERE id = ? ORDER BY rowid LIMIT 1', (id_,)).fetchone()
+        if row is None:
+            raise KeyError(id_)
+        return json.loads(row[0])
+
+    def _create_indexes(self):
+        """
+        Creates the indexes that don't exist.
+        """
+        for index_name, column in _INDEXES.items():
+            self._connection.execute('CREATE INDEX IF NOT EXISTS %s ON fastas (%s)' % (index_name, column))
+
+    def close(self):
+        """
+        Closes the database.
+        SQLiteStore objects can also be used as context managers, which call close() on exit.
+        """
+        self._connection.close()
+
+    @staticmethod
+    def _fasta_sequence(row):
+        """
+        Builds a FastaSequence from a row of the fastas table (see _COLUMNS).
+        """
+        id_, description, sequence_type, inferred_type, sequence = row
+        return _restore_fasta_sequence(str(sequence, 'utf-8'), id_, description, _SEQUENCE_TYPES[sequence_type],
+                                       bool(inferred_type))
+
+    def __getitem__(self, id_):
+        """
+        Returns the FASTA sequence with the given ID.
+
+        Raises
+        ------
+        TypeError
+            If id_ is not a str.
+        KeyError
+            If id_ is not stored.
+        """
+        fasta_sequence = self.get(id_)
+        if fasta_sequence is None:
+            raise KeyError(id_)
+        return fasta_sequence
+
+    def __contains__(self, id_):
+        return isinstance(id_, str) and self._connection.execute(
+            'SELECT 1 FROM fastas WHERE id = ? LIMIT 1', (id_,)).fetchone() is not None
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM fastas').fetchone()[0]
+
+    def __iter__(self):
+        return self.query()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        if self._database_path == ':memory:':
+            return 'fastaparser.SQLiteStore(:memory:)'
+        return 'fastaparser.SQLiteStore(%s)' % os.path.abspath(self._database_path)
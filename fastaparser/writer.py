@@ -5,43 +5,122 @@
 Writer - FASTA writer.
 """
 
+import io
 import os
-from .fastasequence import FastaSequence
+import queue
+import threading
+from .compression import _COMPRESSIONS, _CompressedOutput
+from .fastasequence import FastaSequence, _wrap_sequence
+from .index import FaiEntry, _write_fai, _write_gzi
 from .parsedefinitionline import ParseDefinitionLine
 
 
+_STOP = object()  # stops the background writer thread
+
+
+def _fasta_parts(fasta_sequence):
+    """
+    Extracts the parts of a FASTA sequence that are written to a file.
+    Tuples of (header, sequence) are handled directly, without building a FastaSequence object, but are formatted in
+    the same way.
+
+    Parameters
+    ----------
+    fasta_sequence : FastaSequence or (header : str or bytes, sequence : str or bytes)
+        FASTA sequence.
+
+    Returns
+    -------
+    (str, str, str)
+        ID, formatted definition line and sequence (upper case, without newlines).
+
+    Raises
+    ------
+    TypeError
+        If fasta_sequence is of the wrong type.
+    """
+    # either use the FastaSequence object directly
+    if isinstance(fasta_sequence, FastaSequence):
+        return fasta_sequence.id, fasta_sequence.formatted_definition_line(), fasta_sequence.sequence_as_string()
+
+    # or format the provided header and sequence (same formatting as a FastaSequence object)
+    if (isinstance(fasta_sequence, (tuple, list))
+            and len(fasta_sequence) == 2
+            and isinstance(fasta_sequence[0], (str, bytes))
+            and isinstance(fasta_sequence[1], (str, bytes))):
+        header, sequence = fasta_sequence
+        if isinstance(header, bytes):
+            header = header.decode('utf-8')
+        if isinstance(sequence, bytes):
+            sequence = sequence.decode('utf-8')
+        id_, description = ParseDefinitionLine._parse_definition_line(header)  # pylint: disable=protected-access
+        id_ = ParseDefinitionLine._normalize_id(id_)  # pylint: disable=protected-access
+        description = ParseDefinitionLine._normalize_description(description)  # pylint: disable=protected-access
+        definition_line = '>%s %s' % (id_, description) if description else '>' + id_
+        sequence = sequence.replace('\n', '').upper()  # remove '\n's from sequence
+        if not sequence:
+            raise TypeError('sequence must be a non empty str')
+        return id_, definition_line, sequence
+
+    raise TypeError('fasta_sequence must be a FastaSequence object or a tuple (header : str, sequence : str)')
+
+
 class Writer(ParseDefinitionLine):
     """
     Writer for the given FASTA file.
     Writes FastaSequence objects or tuples of (header, sequence) to the given file.
+    Tuples (including the objects generated by Reader with parse_method='quick') are formatted directly,
+    without building FastaSequence objects.
 
     Attributes
     ----------
     fasta_file : file object
         The FASTA file passed as parameter.
+    buffer_size : int
+        Number of characters accumulated by writefastas() before writing them to the file.
+    line_width : int
+        Maximum number of sequence characters per line.
+    compression : 'gzip', 'bgzf' or None
+        Compression of the output.
+    index : bool
+        If a .fai index (and a .gzi index, for BGZF output) is written by close().
+    background : bool
+        If FASTA sequences are formatted and written by a background thread.
 
     Methods
     -------
     writefasta(FastaSequence or (header, sequence))
         Writes a single FASTA sequence.
-        The FASTA sequence can either be a FastaSequence object or a tuple of (header, sequence) as strings (in this
-        order).
+        The FASTA sequence can either be a FastaSequence object or a tuple of (header, sequence) as strings or bytes
+        (in this order).
         header can be an empty string.
         sequence must have content.
     writefastas(list of: FastaSequence or (header, sequence))
-        Writes multiple FASTA sequences.
+        Writes multiple FASTA sequences, in chunks of (about) buffer_size characters.
         FASTA sequences in the list should be defined as in writefasta().
+    flush()
+        Waits until every FASTA sequence is written (if background is True) and flushes fasta_file.
+    close()
+        Finishes writing (compresses and writes the remaining data, if compression is used, and writes the indexes,
+        if index is True).
+        Does not close fasta_file.
 
     Raises
     ------
     TypeError
         When calling __init__, if fasta_file is of the wrong type.
         When calling __init__, if fasta_file is not a file object, is closed or is not writable.
+        When calling __init__, if buffer_size, line_width, compression, threads or index are of the wrong type.
+        When calling __init__, if index is True and fasta_file has no path (name) or compression is 'gzip'.
+        When calling __init__, if background or queue_size are of the wrong type.
+        When calling flush() or close(), if background is True and a FASTA sequence was of the wrong type.
+        When calling __init__, if compression is used and fasta_file is not opened in binary mode.
         When calling writefasta(), if fasta_sequence is of the wrong type.
         When calling writefastas(), if fasta_sequences is not iterable.
     """
 
-    def __init__(self, fasta_file):
+    def __init__(self, fasta_file, buffer_size=1048576, line_width=70, compression=None, threads=None,
+                 index=False, background=False, queue_size=1024):
         """
         Initializes file object (checks if fasta_file is a file object opened for writing).
 
@@ -49,12 +128,44 @@ class Writer(ParseDefinitionLine):
         ----------
         fasta_file : file object
             An opened file handle ready for writing.
+        buffer_size : int, optional
+            Number of characters accumulated by writefastas() before writing them to the file (with writelines).
+        line_width : int, optional
+            Maximum number of sequence characters per line.
+            This value should not go above 80, as per the FASTA specification.
+        compression : 'gzip', 'bgzf' or None, optional
+            Compresses the output (utf-8 encoded) in independent blocks, using a pool of threads, and writes them in
+            order (as pigz and bgzip -@ do). fasta_file must be opened in binary mode ('wb').
+            'gzip' writes a multi-member gzip file, readable by any gzip reader.
+            'bgzf' writes a BGZF (blocked gzip) file, as bgzip does.
+            None writes uncompressed text.
+        threads : int or None, optional
+            Number of compression threads. None uses the number of processors of the machine.
+        index : bool, optional
+            Writes a .fai index (as samtools faidx does) of every FASTA sequence written, at fasta_file.name + '.fai',
+            when close() is called. For BGZF output, also writes a .gzi index (as bgzip -i does), at
+            fasta_file.name + '.gzi'. Offsets are computed while writing, so the file doesn't have to be re-read.
+            Requires a fasta_file with a path (name) and uncompressed or 'bgzf' output.
+        background : bool, optional
+            writefasta() and writefastas() only put FASTA sequences in a bounded queue, and a background thread
+            formats and writes them (in order), so the caller doesn't wait for formatting or file I/O.
+            When the queue is full, writefasta() waits (backpressure).
+            Errors (ex: a FASTA sequence of the wrong type) are raised by the next call to flush() or close(), and
+            FASTA sequences queued after an error, until it is raised, are discarded.
+        queue_size : int, optional
+            Maximum number of FASTA sequences waiting in the queue of the background thread.
 
         Raises
         ------
         TypeError
             If fasta_file is of the wrong type.
             If fasta_file is not a file object, is closed or is not writable.
+            If buffer_size or line_width are not positive ints.
+            If compression or threads are of the wrong type.
+            If compression is used and fasta_file is not opened in binary mode.
+            If index is not a bool.
+            If index is True and fasta_file has no path (name) or compression is 'gzip'.
+            If background is not a bool or queue_size is not a positive int.
         """
         # assume it's a file object
         if hasattr(fasta_file, "writelines") and hasattr(fasta_file, 'closed') and hasattr(fasta_file, 'writable'):
@@ -65,11 +176,85 @@ class Writer(ParseDefinitionLine):
         else:
             raise TypeError('fasta_file must be a file object')
 
+        if not isinstance(buffer_size, int) or isinstance(buffer_size, bool) or buffer_size <= 0:
+            raise TypeError('buffer_size must be a positive int')
+        self._buffer_size = buffer_size
+        if not isinstance(line_width, int) or isinstance(line_width, bool) or line_width <= 0:
+            raise TypeError('line_width must be a positive int')
+        self._line_width = line_width
+
+        if compression is not None and compression not in _COMPRESSIONS:
+            raise TypeError('compression must be one of: %s or None' % ', '.join(_COMPRESSIONS))
+        if threads is not None and (not isinstance(threads, int) or isinstance(threads, bool) or threads <= 0):
+            raise TypeError('threads must be a positive int or None')
+        self._compression = compression
+        if compression is None:
+            self._output = fasta_file
+        elif isinstance(fasta_file, io.TextIOBase):
+            raise TypeError('fasta_file must be opened in binary mode to use compression')
+        else:
+            self._output = _CompressedOutput(fasta_file, compression, threads)
+
+        if not isinstance(index, bool):
+            raise TypeError('index must be bool')
+        if index and not isinstance(getattr(fasta_file, 'name', None), str):
+            raise TypeError('index requires a fasta_file with a path (name)')
+        if index and compression == 'gzip':
+            raise TypeError('index requires uncompressed or \'bgzf\' output')
+        self._index = index
+        self._fai_entries = []
+        if compression is None:
+            self._encoding = getattr(fasta_file, 'encoding', None) or 'utf-8'
+            try:
+                self._offset = fasta_file.tell()  # appending to an existing file
+            except (AttributeError, OSError):
+                self._offset = 0
+        else:
+            self._encoding = 'utf-8'
+            self._offset = 0
+
+        if not isinstance(background, bool):
+            raise TypeError('background must be bool')
+        if not isinstance(queue_size, int) or isinstance(queue_size, bool) or queue_size <= 0:
+            raise TypeError('queue_size must be a positive int')
+        self._background = background
+        self._closed = False
+        if background:
+            self._queue = queue.Queue(queue_size)
+            self._background_error = None
+            self._background_thread = threading.Thread(target=self._write_in_background, daemon=True)
+            self._background_thread.start()
+
     @property
     def fasta_file(self):
         """return fasta_file."""
         return self._fasta_file
 
+    @property
+    def buffer_size(self):
+        """return buffer_size."""
+        return self._buffer_size
+
+    @property
+    def line_width(self):
+        """return line_width."""
+        return self._line_width
+
+    @property
+    def compression(self):
+        """return compression."""
+        return self._compression
+
+    @property
+    def index(self):
+        """return index."""
+        return self._index
+
+    @property
+    def background(self):
+        """return background."""
+        return self._background
+
     def writefasta(self, fasta_sequence):
         """
         Writes a single FASTA sequence to the provided file.
@@ -77,62 +262,205 @@ class Writer(ParseDefinitionLine):
 
         Parameters
         ----------
-        fasta_sequence : FastaSequence or (header : str, sequence : str)
+        fasta_sequence : FastaSequence or (header : str or bytes, sequence : str or bytes)
             A FASTA sequence is built from the data contained in the provided FastaSequence object or the tuple of
             header + sequence.
             header may contain or not the starting '>'. header can be an empty string.
-            sequence must be a non empty string.
+            sequence must be a non empty string. Newlines are removed and letter codes are upper cased.
+            bytes are decoded as utf-8.
 
         Raises
         ------
         TypeError
-            If fasta_sequence is of the wrong type.
+            If fasta_sequence is of the wrong type (raised by flush() or close(), if background is True).
+        ValueError
+            If background is True and the Writer is closed.
         """
-        # either use the FastaSequence object directly
-        if isinstance(fasta_sequence, FastaSequence):
-            pass
-
-        # or create one with the provided header and sequence
-        elif (isinstance(fasta_sequence, (tuple, list))
-              and len(fasta_sequence) == 2
-              and isinstance(fasta_sequence[0], str)
-              and isinstance(fasta_sequence[1], str)):
-            id_, description = self._parse_definition_line(fasta_sequence[0])
-            sequence = ''.join(fasta_sequence[1].split('\n'))  # remove '\n's from sequence
-            fasta_sequence = FastaSequence(sequence, id_, description)
-
+        if self._background:
+            self._enqueue(fasta_sequence)
         else:
-            raise TypeError('fasta_sequence must be a FastaSequence object or a tuple (header : str, sequence : str)')
-
-        # write fasta to file
-        self._fasta_file.write(fasta_sequence.formatted_fasta() + '\n\n')
+            self._output.write(self._format_fasta(fasta_sequence))
 
     def writefastas(self, fasta_sequences):
         """
         Writes multiple FASTA sequences to the provided file.
-        Simply calls writefasta() for each object in fasta_sequences.
+        Formatted FASTA sequences are accumulated in a buffer and written to the file in chunks of (about) buffer_size
+        characters. Every FASTA sequence is written to the file by the time writefastas() returns.
         Open the file with mode 'a' if you want to append multiple sequences to an existing FASTA file.
 
         Parameters
         ----------
-        fasta_sequences : iterable of FastaSequence or iterable of (header : str, sequence : str)
+        fasta_sequences : iterable of FastaSequence or iterable of (header : str or bytes, sequence : str or bytes)
             FASTA sequences are built from the data contained in the provided FastaSequence objects or the tuples of
             header + sequence.
             headers may contain or not the starting '>'. headers can be empty strings.
-            sequences must be non empty strings.
+            sequences must be non empty strings. See writefasta().
 
         Raises
         ------
         TypeError
-            If fasta_sequences is not iterable.
+            If fasta_sequences is not iterable or any FASTA sequence is of the wrong type
+            (raised by flush() or close(), if background is True).
+        ValueError
+            If background is True and the Writer is closed.
         """
         try:
             iter(fasta_sequences)
         except TypeError:
             raise TypeError('fasta_sequences must be an iterable of FastaSequence '
                             'objects or an iterable of tuples (header : str, sequence : str)')
-        for fasta in fasta_sequences:
-            self.writefasta(fasta)
+        if self._background:
+            for fasta in fasta_sequences:
+                self._enqueue(fasta)
+            return
+        buffer = []
+        buffered_characters = 0
+        try:
+            for fasta in fasta_sequences:
+                formatted_fasta = self._format_fasta(fasta)
+                buffer.append(formatted_fasta)
+                buffered_characters += len(formatted_fasta)
+                if buffered_characters >= self._buffer_size:
+                    self._output.writelines(buffer)
+                    buffer = []
+                    buffered_characters = 0
+        finally:  # FASTA sequences formatted before an error are still written
+            if buffer:
+                self._output.writelines(buffer)
+
+    def flush(self):
+        """
+        Waits until every queued FASTA sequence is formatted and written, if background is True,
+        and flushes fasta_file (compressed output is only completed by close()).
+
+        Raises
+        ------
+        TypeError
+            If background is True and a FASTA sequence was of the wrong type.
+        """
+        if self._background:
+            self._queue.join()
+            self._raise_background_error()
+        if self._compression is None and not self._fasta_file.closed:
+            self._fasta_file.flush()
+
+    def close(self):
+        """
+        Finishes writing: waits for the background thread, if background is True, compresses and writes the remaining
+        data, if compression is used, and flushes fasta_file.
+        Does not close fasta_file. Writer objects can also be used as context managers, which call close() on exit.
+
+        Raises
+        ------
+        TypeError
+            If background is True and a FASTA sequence was of the wrong type.
+        """
+        if self._background and not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._background_thread.join()
+        self._closed = True
+        if self._compression is not None:
+            self._output.close()
+        elif not self._fasta_file.closed:
+            self._fasta_file.flush()
+        if self._index:
+            _write_fai(self._fasta_file.name + '.fai', self._fai_entries)
+            if self._compression == 'bgzf':
+                _write_gzi(self._fasta_file.name + '.gzi', self._output.blocks)
+        if self._background:
+            self._raise_background_error()
+
+    def _enqueue(self, fasta_sequence):
+        """
+        Puts a FASTA sequence in the queue of the background thread (waits while the queue is full).
+
+        Raises
+        ------
+        ValueError
+            If the Writer is closed.
+        """
+        if self._closed:
+            raise ValueError('I/O operation on closed Writer')
+        self._queue.put(fasta_sequence)
+
+    def _write_in_background(self):
+        """
+        Formats and writes the queued FASTA sequences (runs in the background thread).
+        Formatted FASTA sequences are buffered and written when buffer_size is reached, when the queue is empty or
+        when an error happens (FASTA sequences formatted before an error are still written).
+        """
+        buffer = []
+        buffered_characters = 0
+        while True:
+            fasta_sequence = self._queue.get()
+            try:
+                if fasta_sequence is _STOP:
+                    if buffer:
+                        self._output.writelines(buffer)
+                    return
+                if self._background_error is None:  # FASTA sequences queued after an error are discarded
+                    try:
+                        formatted_fasta = self._format_fasta(fasta_sequence)
+                    except Exception as exception:  # pylint: disable=broad-except
+                        self._background_error = exception
+                    else:
+                        buffer.append(formatted_fasta)
+                        buffered_characters += len(formatted_fasta)
+                    if buffer and (buffered_characters >= self._buffer_size or self._queue.empty()
+                                   or self._background_error is not None):
+                        output_buffer = buffer
+                        buffer = []
+                        buffered_characters = 0
+                        self._output.writelines(output_buffer)
+            except Exception as exception:  # pylint: disable=broad-except
+                self._background_error = exception
+            finally:
+                self._queue.task_done()
+
+    def _raise_background_error(self):
+        """
+        Raises (once) the error raised in the background thread, if any.
+        """
+        error, self._background_error = self._background_error, None
+        if error is not None:
+            raise error
+
+    def _format_fasta(self, fasta_sequence):
+        """
+        Formats a single FASTA sequence, as written to the file.
+        Tuples of (header, sequence) are formatted directly, without building a FastaSequence object.
+
+        Parameters
+        ----------
+        fasta_sequence : FastaSequence or (header : str or bytes, sequence : str or bytes)
+            FASTA sequence.
+
+        Returns
+        -------
+        str
+            Formatted FASTA sequence, followed by an empty line.
+
+        Raises
+        ------
+        TypeError
+            If fasta_sequence is of the wrong type.
+        """
+        id_, definition_line, sequence = _fasta_parts(fasta_sequence)
+        formatted_sequence = _wrap_sequence(sequence, self._line_width)
+        if self._index:
+            # letter codes are single byte characters, so only the definition line has to be encoded
+            sequence_offset = self._offset + len(definition_line.encode(self._encoding)) + 1
+            line_bases = min(self._line_width, len(sequence))
+            self._fai_entries.append(FaiEntry(id_, len(sequence), sequence_offset, line_bases, line_bases + 1))
+            self._offset = sequence_offset + len(formatted_sequence) + 2
+        return definition_line + '\n' + formatted_sequence + '\n\n'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __repr__(self):
         return 'fastaparser.Writer(%s)' % os.path.abspath(self._fasta_file.name)
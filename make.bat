@@ -9,6 +9,7 @@ echo install-dependencies           installs dependencies (includes development
 echo test                           runs tests
 echo lint                           runs linter
 echo coverage                       runs test coverage
+echo benchmark-memory               runs memory footprint regression suite
 echo docs-test                      tests docs for build errors and serves them locally
 echo build                          builds python package (sdist)
 echo build-test                     tests build for errors and uploads to test.pypi.org
@@ -45,6 +46,10 @@ python -m coverage run --source fastaparser -m pytest tests/ -q
 python -m coverage report -m
 goto:eof
 
+:benchmark-memory
+python benchmarks/memory_footprint.py
+goto:eof
+
 :docs-test
 mkdocs serve -s -f .mkdocs.yml
 goto:eof
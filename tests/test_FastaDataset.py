@@ -0,0 +1,114 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.FastaDataset class.
+"""
+
+
+import operator
+import pytest
+from fastaparser import FastaDataset
+from .conftest import fasta_contents
+
+
+##########
+# Fixtures
+##########
+
+
+def sequence_id(fasta_sequence):
+    return fasta_sequence.id
+
+
+def sequence_length(fasta_sequence):
+    return len(fasta_sequence)
+
+
+def is_long(length):
+    return length > 300
+
+
+@pytest.fixture()
+def fasta_files():
+    return ['tests/fasta_nucleotide_multiple.fasta', 'tests/fasta_aminoacid_multiple.fasta']
+
+
+@pytest.fixture()
+def fasta_files_contents(fasta_files):
+    return [contents for fasta_file in fasta_files for contents in fasta_contents(fasta_file)]
+
+
+#######
+# Tests
+#######
+
+
+class Test__init__:
+    def test_single_path(self):
+        assert FastaDataset('tests/fasta_empty.fasta').fasta_paths == ('tests/fasta_empty.fasta',)
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            FastaDataset('tests/non_existing_file.fasta')
+        with pytest.raises(TypeError):
+            FastaDataset(123)
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta', partition_records=0)
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta', parse_method='wrong_method')
+
+
+class Test_partitions:
+    def test_partitions(self, fasta_files):
+        partitions = list(FastaDataset(fasta_files, partition_records=5).partitions())
+        assert [partition[0] for partition in partitions].count(fasta_files[0]) == 4  # 17 FASTA sequences
+        assert [partition[0] for partition in partitions].count(fasta_files[1]) == 4  # 20 FASTA sequences
+
+
+class Test_map_filter:
+    def test_lazy_chaining(self, fasta_files, fasta_files_contents):
+        dataset = FastaDataset(fasta_files, partition_records=3)
+        lengths = dataset.map(sequence_length)
+        long_lengths = lengths.filter(is_long)
+        assert list(dataset.map(sequence_id)) == [contents[0] for contents in fasta_files_contents]
+        assert list(lengths) == [len(contents[2]) for contents in fasta_files_contents]
+        assert list(long_lengths) == [len(contents[2]) for contents in fasta_files_contents
+                                      if len(contents[2]) > 300]
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta').map(None)
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta').filter(None)
+
+
+class Test_execute:
+    def test_process(self, fasta_files, fasta_files_contents):
+        dataset = FastaDataset(fasta_files, partition_records=4).map(sequence_id)
+        assert list(dataset.execute(workers=2)) == [contents[0] for contents in fasta_files_contents]
+
+    def test_thread_unordered(self, fasta_files, fasta_files_contents):
+        dataset = FastaDataset(fasta_files, partition_records=2, parse_method='quick').map(lambda fasta: fasta.header)
+        assert (sorted(dataset.execute(workers=2, executor='thread', ordered=False)) ==
+                sorted('>' + ' '.join(contents[:2]).rstrip() for contents in fasta_files_contents))
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta').execute(workers=0)
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta').execute(executor='wrong_executor')
+
+
+class Test_reduce:
+    def test_reduce(self, fasta_files, fasta_files_contents):
+        dataset = FastaDataset(fasta_files, partition_records=4).map(sequence_length)
+        assert (dataset.reduce(operator.add, 0, workers=2, executor='thread') ==
+                sum(len(contents[2]) for contents in fasta_files_contents))
+
+    def test_empty_file(self):
+        assert FastaDataset('tests/fasta_empty.fasta').reduce(operator.add, 0, workers=1) == 0
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            FastaDataset('tests/fasta_empty.fasta').reduce(None, 0)
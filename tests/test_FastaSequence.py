@@ -6,11 +6,13 @@ Tests for fastaparser.FastaSequence class.
 """
 
 
+import pickle
 import pytest
 from fastaparser import FastaSequence, LetterCode, \
     NUCLEOTIDE_LETTER_CODES_GOOD, AMINOACID_LETTER_CODES_GOOD, \
     NUCLEOTIDE_LETTER_CODES_DEGENERATE, AMINOACID_LETTER_CODES_DEGENERATE, \
-    NUCLEOTIDE_LETTER_CODES_COMPLEMENT, AMINOACIDS_NOT_IN_NUCLEOTIDES
+    NUCLEOTIDE_LETTER_CODES_COMPLEMENT, AMINOACIDS_NOT_IN_NUCLEOTIDES, NCBI_SCHEMA
+from fastaparser.fastasequence import _fasta_sequence_from_definition_line
 
 
 ##########
@@ -276,6 +278,32 @@ class Test__init__:
         assert fasta_sequence.sequence_type == 'aminoacid'
         assert fasta_sequence.inferred_type is True
 
+    def test_infer_type_lower_case(self):
+        fasta_sequence = FastaSequence('mkvlaq', infer_type=True)
+        assert fasta_sequence.sequence_type == 'aminoacid'
+        assert fasta_sequence.inferred_type is True
+
+    def test_infer_sample_size(self):
+        # aminoacid letter code 'E' is only at index 8
+        fasta_sequence = FastaSequence('ACGTACGTE', infer_type=True, infer_sample_size=8)
+        assert fasta_sequence.sequence_type is None
+        assert fasta_sequence.inferred_type is False
+        fasta_sequence = FastaSequence('ACGTACGTE', infer_type=True, infer_sample_size=9)
+        assert fasta_sequence.sequence_type == 'aminoacid'
+        assert fasta_sequence.inferred_type is True
+
+    def test_infer_sample_size_wrong_type(self):
+        with pytest.raises(TypeError):
+            FastaSequence('ACTG', infer_type=True, infer_sample_size='')
+        with pytest.raises(TypeError):
+            FastaSequence('ACTG', infer_type=True, infer_sample_size=1.0)
+        with pytest.raises(TypeError):
+            FastaSequence('ACTG', infer_type=True, infer_sample_size=True)
+        with pytest.raises(TypeError):
+            FastaSequence('ACTG', infer_type=True, infer_sample_size=0)
+        with pytest.raises(TypeError):
+            FastaSequence('ACTG', infer_type=True, infer_sample_size=-1)
+
     # def test_infer_type_false (already tested)
 
     def test_infer_type_not_bool(self):
@@ -328,6 +356,34 @@ class Test_from_fastasequence:
             FastaSequence.from_fastasequence(1)
 
 
+class Test_fasta_sequence_from_definition_line:
+    def test_lazy_parsing(self):
+        fasta_sequence = _fasta_sequence_from_definition_line('ACGT', '>id|123  a  description\n', 'nucleotide')
+        assert fasta_sequence._definition_line == '>id|123  a  description\n'  # not parsed yet
+        assert fasta_sequence.id == 'id|123'
+        assert fasta_sequence._definition_line is None
+        assert fasta_sequence.description == 'a description'
+        assert fasta_sequence.sequence_type == 'nucleotide'
+
+    def test_setters_keep_the_other_field(self):
+        fasta_sequence = _fasta_sequence_from_definition_line('ACGT', '>id description')
+        fasta_sequence.id = 'new_id'
+        assert fasta_sequence.description == 'description'
+        fasta_sequence = _fasta_sequence_from_definition_line('ACGT', '>id description')
+        del fasta_sequence.description
+        assert fasta_sequence.id == 'id'
+        assert fasta_sequence.formatted_definition_line() == '>id'
+
+    def test_unparsed_copies(self):
+        fasta_sequence = _fasta_sequence_from_definition_line('ACGT', '>id description')
+        assert fasta_sequence.formatted_definition_line() == '>id description'
+        for copy in (pickle.loads(pickle.dumps(_fasta_sequence_from_definition_line('ACGT', '>id description'))),
+                     FastaSequence.from_fastasequence(_fasta_sequence_from_definition_line('ACGT', '>id description')),
+                     _fasta_sequence_from_definition_line('ACGT', '>id description')[1:]):
+            assert copy.id == 'id'
+            assert copy.description.startswith('description')
+
+
 class Test_id_property:
     def test_set_good(self, actg_letter_code_list):
         id_ = 'correct_id|some_other_id'
@@ -898,6 +954,24 @@ class Test_formatted_fasta:
                                                                    '%s\n%s\n%s' % ('A'*70, 'A'*70, 'A'*10))
 
 
+class Test_header_fields:
+    def test_good(self):
+        fasta_sequence = FastaSequence('ACGT', id_='sp|P69905|HBA_HUMAN',
+                                       description='Hemoglobin subunit alpha OS=Homo sapiens OX=9606 GN=HBA1')
+        fields = fasta_sequence.header_fields()
+        assert (fields.schema, fields.accession, fields.gene, fields.taxon) == ('uniprot', 'P69905', 'HBA1', '9606')
+        assert fasta_sequence.header_fields() is fields  # cached
+        assert fasta_sequence.header_fields(NCBI_SCHEMA).schema == 'ncbi'
+        fasta_sequence.description = 'Hemoglobin subunit alpha OS=Pan troglodytes OX=9598'
+        assert fasta_sequence.header_fields().taxon == '9598'
+        del fasta_sequence.id
+        assert fasta_sequence.header_fields() is None
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            FastaSequence('ACGT').header_fields(123)
+
+
 class Test_sequence_as_string:
     def test_good(self, nucleotide_good, aminoacid_good, letter_codes_unknown, unknown_characters):
         nucleotide_sequence = nucleotide_good[0]
@@ -1050,6 +1124,56 @@ class Test__getitem__:
         assert fasta_sequence_sliced._sequence == nucleotide_good[1][2:4] == fasta_sequence._sequence[2:4]
         assert fasta_sequence_sliced.description == '[SLICE OF ORIGINAL: 2:4:None]'
 
+    def test_get_slice_copies_letter_codes(self):
+        fasta_sequence = FastaSequence('ACGTACGTAC', id_='id', sequence_type='nucleotide')
+        fasta_sequence_sliced = fasta_sequence[2:9:2]
+        assert all(sliced is not original and sliced == original
+                   for sliced, original in zip(fasta_sequence_sliced._sequence, fasta_sequence._sequence[2:9:2]))
+        assert fasta_sequence_sliced.sequence_as_string() == 'GAGA'
+        assert fasta_sequence_sliced.count_letter_codes() == {'G': 2, 'A': 2}
+        assert fasta_sequence_sliced.id == 'id'
+        assert fasta_sequence_sliced.sequence_type == 'nucleotide'
+        assert not fasta_sequence_sliced.inferred_type
+
+    def test_get_slice_after_sequence_changed(self):
+        fasta_sequence = FastaSequence('ACGT')
+        fasta_sequence.sequence.append(LetterCode('G'))
+        assert fasta_sequence[2:].sequence_as_string() == 'GTG'
+
+    def test_get_slice_of_cached_string(self):
+        fasta_sequence = FastaSequence('ACGTACGTAC')
+        fasta_sequence.sequence_as_string()
+        assert fasta_sequence[::-3]._sequence_string == 'CGTA'
+        assert fasta_sequence[::-3].sequence_as_string() == 'CGTA'
+
+    def test_get_slice_copy_on_write(self):
+        fasta_sequence = FastaSequence('ACGTACGTAC', sequence_type='nucleotide')
+        fasta_sequence_sliced = fasta_sequence[:4]
+        fasta_sequence_sliced.sequence_type = 'aminoacid'
+        assert all(letter_code.letter_type == 'aminoacid' for letter_code in fasta_sequence_sliced)
+        assert all(letter_code.letter_type == 'nucleotide' for letter_code in fasta_sequence)
+        fasta_sequence_sliced = fasta_sequence[:4]
+        del fasta_sequence.sequence_type
+        assert all(letter_code.letter_type is None for letter_code in fasta_sequence)
+        assert all(letter_code.letter_type == 'nucleotide' for letter_code in fasta_sequence_sliced)
+        assert fasta_sequence_sliced == 'ACGT'
+
+    def test_get_slice_copy_on_letter_code_write(self):
+        fasta_sequence = FastaSequence('ACGTACGTAC', sequence_type='nucleotide')
+        fasta_sequence_sliced = fasta_sequence[:4]
+        fasta_sequence_sliced[0].letter_type = 'aminoacid'
+        assert fasta_sequence_sliced[0].letter_type == 'aminoacid'
+        assert fasta_sequence[0].letter_type == 'nucleotide'
+        fasta_sequence_sliced = fasta_sequence[:4]
+        for letter_code in fasta_sequence:
+            letter_code.letter_type = None
+        assert all(letter_code.letter_type == 'nucleotide' for letter_code in fasta_sequence_sliced)
+        # LetterCode objects already handed out are not shared by new slices
+        letter_code = fasta_sequence[1]
+        fasta_sequence_sliced = fasta_sequence[:4]
+        letter_code.letter_type = 'aminoacid'
+        assert fasta_sequence_sliced[1].letter_type is None
+
     def test_get_slice_empty(self):
         with pytest.raises(TypeError):
             FastaSequence('ACTG')[:0]
@@ -1098,6 +1222,31 @@ class Test__eq__:
         assert fasta_sequence != LetterCode('A')
 
 
+class Test__hash__:
+    def test__hash__(self, nucleotide_good):
+        fasta_sequence = nucleotide_good[0]
+        assert hash(fasta_sequence) == hash(''.join(NUCLEOTIDE_LETTER_CODES_GOOD))
+        assert hash(fasta_sequence) == hash(FastaSequence(''.join(NUCLEOTIDE_LETTER_CODES_GOOD), id_='other'))
+
+    def test_deduplication(self):
+        fasta_sequences = [FastaSequence('ACGT', id_='1'), FastaSequence('acgt', id_='2'),
+                           FastaSequence('TTTT', id_='3'), FastaSequence('ACGTTT', id_='4')[:4]]
+        assert len(set(fasta_sequences)) == 2
+        assert {fasta_sequence: fasta_sequence.id for fasta_sequence in fasta_sequences} == {'ACGT': '4', 'TTTT': '3'}
+        assert 'TTTT' in set(fasta_sequences)
+
+    def test_sequence_changed(self):
+        fasta_sequence = FastaSequence('ACGT')
+        hash(fasta_sequence)
+        fasta_sequence.sequence.append(LetterCode('G'))
+        assert len(fasta_sequence) == 5
+        assert fasta_sequence.sequence_as_string() == 'ACGTG'
+        assert fasta_sequence == 'ACGTG'
+        assert hash(fasta_sequence) == hash('ACGTG')
+        fasta_sequence.sequence[0] = LetterCode('T')
+        assert fasta_sequence == 'TCGTG'
+
+
 class Test__len__:
     def test__len__(self, nucleotide_good, aminoacid_good):
         fasta_sequence_nucleotide = nucleotide_good[0]
@@ -1106,6 +1255,22 @@ class Test__len__:
         assert len(fasta_sequence_aminoacid) == 25
 
 
+class Test__reduce__:
+    def test_pickle(self):
+        fasta_sequence = FastaSequence('ACGTE', 'id', 'description', infer_type=True)
+        unpickled = pickle.loads(pickle.dumps(fasta_sequence))
+        assert unpickled == fasta_sequence
+        assert unpickled.id == fasta_sequence.id
+        assert unpickled.description == fasta_sequence.description
+        assert unpickled.sequence_type == fasta_sequence.sequence_type == 'aminoacid'
+        assert unpickled.inferred_type is True
+        assert all(letter_code.letter_type == 'aminoacid' for letter_code in unpickled)
+
+    def test_compact(self, nucleotide_good):
+        fasta_sequence = FastaSequence('ACGT' * 1000, sequence_type='nucleotide')
+        assert len(pickle.dumps(fasta_sequence)) < len(fasta_sequence) + 200
+
+
 class Test__repr__:
     def test__repr__(self, nucleotide_good):
         fasta_sequence = nucleotide_good[0]
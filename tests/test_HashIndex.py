@@ -0,0 +1,113 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.HashIndex class and fastaparser.build_hash_index function.
+"""
+
+
+import os
+import pytest
+from fastaparser import HashIndex, build_hash_index
+from .conftest import fasta_contents
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def fasta_multiple_hash_index_path():
+    path = build_hash_index('tests/fasta_aminoacid_multiple.fasta', 'tests/FASTA_TEMPORARY_INDEX_FILE.fhi')
+    yield path
+    os.remove(path)
+
+
+@pytest.fixture()
+def fasta_duplicated_ids_path():
+    path = 'tests/FASTA_TEMPORARY_FILE_WITH_DUPLICATED_IDS.fasta'
+    with open(path, 'w') as fasta_file:
+        fasta_file.write('>seq1 first\nACGT\n>seq2\nTTTT\n>seq1 second\nGGGG\n')
+    yield path
+    os.remove(path)
+    if os.path.exists(path + '.fhi'):
+        os.remove(path + '.fhi')
+
+
+def record_ranges(fasta_path):
+    # {id: (offset, length)} of each FASTA sequence, from the definition line to the end of the last sequence line
+    # (including its newline)
+    ranges = {}
+    with open(fasta_path, 'rb') as fasta_file:
+        contents = fasta_file.read()
+    start = contents.find(b'>')
+    while start != -1:
+        next_start = contents.find(b'\n>', start)
+        end = len(contents.rstrip(b'\n')) if next_start == -1 else len(contents[:next_start].rstrip(b'\n'))
+        end = min(end + 1, len(contents))
+        ranges.setdefault(contents[start + 1:].split(None, 1)[0].decode(), (start, end - start))
+        start = -1 if next_start == -1 else next_start + 1
+    return ranges
+
+
+#######
+# Tests
+#######
+
+
+class Test_build_hash_index:
+    def test_default_path(self, fasta_duplicated_ids_path):
+        assert build_hash_index(fasta_duplicated_ids_path) == fasta_duplicated_ids_path + '.fhi'
+        assert os.path.isfile(fasta_duplicated_ids_path + '.fhi')
+
+    def test_duplicated_ids(self, fasta_duplicated_ids_path):
+        with HashIndex(build_hash_index(fasta_duplicated_ids_path)) as hash_index:
+            assert len(hash_index) == 2
+            assert hash_index['seq1'] == (0, 17)  # first FASTA sequence with the ID
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            build_hash_index('tests/non_existing_file.fasta')
+        with pytest.raises(TypeError):
+            build_hash_index('tests/fasta_aminoacid_multiple.fasta', 123)
+        with pytest.raises(TypeError):
+            build_hash_index('tests/fasta_aminoacid_multiple.fasta', fai_path='tests/non_existing_file.fai')
+
+
+class Test_HashIndex:
+    def test_lookup(self, fasta_multiple_hash_index_path):
+        ranges = record_ranges('tests/fasta_aminoacid_multiple.fasta')
+        with HashIndex(fasta_multiple_hash_index_path) as hash_index:
+            assert len(hash_index) == len(fasta_contents('tests/fasta_aminoacid_multiple.fasta'))
+            assert hash_index.index_path == fasta_multiple_hash_index_path
+            assert hash_index.fasta_size == os.path.getsize('tests/fasta_aminoacid_multiple.fasta')
+            assert hash_index.fasta_mtime_ns == os.stat('tests/fasta_aminoacid_multiple.fasta').st_mtime_ns
+            for id_, byte_range in ranges.items():
+                assert hash_index[id_] == byte_range
+                assert hash_index.get(id_) == byte_range
+                assert id_ in hash_index
+
+    def test_missing_id(self, fasta_multiple_hash_index_path):
+        with HashIndex(fasta_multiple_hash_index_path) as hash_index:
+            with pytest.raises(KeyError):
+                hash_index['missing_id']
+            assert hash_index.get('missing_id') is None
+            assert hash_index.get('missing_id', 0) == 0
+            assert 'missing_id' not in hash_index
+            assert 123 not in hash_index
+
+    def test_wrong_type(self, fasta_multiple_hash_index_path):
+        with pytest.raises(TypeError):
+            HashIndex('tests/non_existing_file.fhi')
+        with pytest.raises(TypeError):
+            HashIndex('tests/fasta_empty.fasta')
+        with pytest.raises(TypeError):
+            HashIndex('tests/fasta_aminoacid_multiple.fasta')
+        with HashIndex(fasta_multiple_hash_index_path) as hash_index:
+            with pytest.raises(TypeError):
+                hash_index[123]
+
+    def test__repr__(self, fasta_multiple_hash_index_path):
+        with HashIndex(fasta_multiple_hash_index_path) as hash_index:
+            assert repr(hash_index) == 'fastaparser.HashIndex(%s)' % os.path.abspath(fasta_multiple_hash_index_path)
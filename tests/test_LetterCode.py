@@ -6,6 +6,7 @@ Tests for fastaparser.LetterCode class.
 """
 
 
+import pickle
 import pytest
 from fastaparser import LetterCode
 
@@ -314,6 +315,18 @@ class Test__eq__:
         assert not nucleotide_good.__eq__({})
 
 
+class Test__reduce__:
+    def test_pickle(self, nucleotide_good):
+        unpickled = pickle.loads(pickle.dumps(nucleotide_good))
+        assert unpickled == nucleotide_good
+        assert unpickled.letter_type == nucleotide_good.letter_type
+        assert unpickled.degenerate == nucleotide_good.degenerate
+        assert unpickled.supported == nucleotide_good.supported
+
+    def test_compact(self, nucleotide_good):
+        assert b'_in_fasta_spec' not in pickle.dumps(nucleotide_good)
+
+
 class Test__repr__:
     def test__repr__(self, nucleotide_good):
         assert repr(nucleotide_good) == 'LetterCode(\'A\')'
@@ -56,3 +56,23 @@ class Test_parse_definition_line:
             ParseDefinitionLine._parse_definition_line(1)
         with pytest.raises(TypeError):
             ParseDefinitionLine._parse_definition_line([])
+
+
+class Test_normalize_id:
+    def test_normalize_id(self):
+        assert ParseDefinitionLine._normalize_id(' >ID123 more\nid ') == 'ID123_moreid'
+        assert ParseDefinitionLine._normalize_id('') == ''
+
+    def test_normalize_id_wrong_type(self):
+        with pytest.raises(TypeError):
+            ParseDefinitionLine._normalize_id(1)
+
+
+class Test_normalize_description:
+    def test_normalize_description(self):
+        assert ParseDefinitionLine._normalize_description('  a   description\nand more ') == 'a description and more'
+        assert ParseDefinitionLine._normalize_description('') == ''
+
+    def test_normalize_description_wrong_type(self):
+        with pytest.raises(TypeError):
+            ParseDefinitionLine._normalize_description(None)
@@ -0,0 +1,98 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.Pipeline class.
+"""
+
+
+import io
+import pytest
+from fastaparser import FastaSequence, Pipeline, Reader, Writer
+
+
+##########
+# Fixtures
+##########
+
+
+def reverse_complement(fasta_sequence):
+    return fasta_sequence.complement(reverse=True)
+
+
+def sequence_id(fasta_sequence):
+    return fasta_sequence.id
+
+
+def is_long(fasta_sequence):
+    return len(fasta_sequence) > 300
+
+
+def fail(fasta_sequence):
+    raise ValueError(fasta_sequence.id)
+
+
+#######
+# Tests
+#######
+
+
+class Test__init__:
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            Pipeline(123)
+        with pytest.raises(TypeError):
+            Pipeline([], batch_size=0)
+        with pytest.raises(TypeError):
+            Pipeline([], queue_size='8')
+
+
+class Test_stages:
+    def test_no_stages(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        ids = [fasta_sequence.id for fasta_sequence in Pipeline(Reader(fasta_nucleotide_multiple))]
+        assert ids == [contents[0] for contents in fasta_nucleotide_multiple_contents]
+
+    def test_ordered(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        pipeline = (Pipeline(Reader(fasta_nucleotide_multiple), batch_size=2, queue_size=1)
+                    .filter(is_long, workers=2, executor='thread')
+                    .map(sequence_id, workers=2))
+        assert list(pipeline) == [contents[0] for contents in fasta_nucleotide_multiple_contents
+                                  if len(contents[2]) > 300]
+
+    def test_stop_early(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        pipeline = Pipeline(Reader(fasta_nucleotide_multiple), batch_size=1, queue_size=1).map(sequence_id)
+        results = iter(pipeline)
+        assert next(results) == fasta_nucleotide_multiple_contents[0][0]
+        results.close()
+
+    def test_stage_error(self, fasta_nucleotide_multiple):
+        pipeline = Pipeline(Reader(fasta_nucleotide_multiple)).map(fail, workers=1, executor='thread').map(sequence_id)
+        with pytest.raises(ValueError):
+            list(pipeline)
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            Pipeline([]).map(None)
+        with pytest.raises(TypeError):
+            Pipeline([]).filter(None)
+        with pytest.raises(TypeError):
+            Pipeline([]).map(sequence_id, workers=0)
+        with pytest.raises(TypeError):
+            Pipeline([]).map(sequence_id, executor='wrong_executor')
+
+
+class Test_run:
+    def test_run(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        output_file = io.StringIO()
+        pipeline = Pipeline(Reader(fasta_nucleotide_multiple, sequences_type='nucleotide')).map(reverse_complement,
+                                                                                                 workers=2)
+        assert pipeline.run(Writer(output_file)) == len(fasta_nucleotide_multiple_contents)
+        output_file.seek(0)
+        for fasta_sequence, contents in zip(Reader(output_file), fasta_nucleotide_multiple_contents):
+            assert fasta_sequence.id == contents[0]
+            expected = reverse_complement(FastaSequence(contents[2], sequence_type='nucleotide'))
+            assert fasta_sequence.sequence_as_string() == expected.sequence_as_string()
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            Pipeline([]).run(io.StringIO())
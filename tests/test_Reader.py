@@ -6,9 +6,13 @@ Tests for fastaparser.Reader class.
 """
 
 
+import io
 import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from fastaparser import Reader
+from fastaparser import Reader, HashIndex, build_hash_index
 from .conftest import fasta_contents
 
 
@@ -60,6 +64,20 @@ def fasta_empty_lines_in_sequence_contents():
     return fasta_contents('tests/fasta_empty_lines_in_sequence.fasta')
 
 
+@pytest.fixture()
+def fasta_invalid_letter_codes():
+    f = open('tests/fasta_invalid_letter_codes.fasta')
+    yield f
+    f.close()
+
+
+@pytest.fixture()
+def fasta_aminoacid_letter_code_in_second_sequence():
+    f = open('tests/fasta_aminoacid_letter_code_in_second_sequence.fasta')
+    yield f
+    f.close()
+
+
 @pytest.fixture()
 def fasta_aminoacid_single():
     f = open('tests/fasta_aminoacid_single.fasta')
@@ -96,6 +114,7 @@ class Test__init__:
         assert fasta_reader.sequences_type is None
         assert fasta_reader.infer_type is False
         assert fasta_reader.parse_method == 'rich'
+        assert fasta_reader.validate == 'off'
 
     def test_fasta_file_object_closed(self, fasta_nucleotide_multiple):
         fasta_nucleotide_multiple.close()
@@ -149,6 +168,18 @@ class Test__init__:
 
     # test_infer_type_false (already tested)
 
+    def test_infer_sample_size(self, fasta_empty):
+        fasta_reader = Reader(fasta_empty, infer_type=True, infer_sample_size=100)
+        assert fasta_reader.infer_sample_size == 100
+
+    def test_infer_sample_size_wrong_type(self, fasta_empty):
+        with pytest.raises(TypeError):
+            Reader(fasta_empty, infer_sample_size=0)
+        with pytest.raises(TypeError):
+            Reader(fasta_empty, infer_sample_size='100')
+        with pytest.raises(TypeError):
+            Reader(fasta_empty, infer_sample_size=True)
+
     def test_infer_type_not_bool(self, fasta_empty):
         with pytest.raises(TypeError):
             Reader(fasta_empty, infer_type='')
@@ -180,6 +211,16 @@ class Test__init__:
         with pytest.raises(TypeError):
             Reader(fasta_empty, parse_method='wrong_type')
 
+    def test_validate_modes(self, fasta_empty):
+        for validate in ('off', 'warn', 'strict'):
+            assert Reader(fasta_empty, validate=validate).validate == validate
+
+    def test_validate_wrong_type(self, fasta_empty):
+        with pytest.raises(TypeError):
+            Reader(fasta_empty, validate=True)
+        with pytest.raises(TypeError):
+            Reader(fasta_empty, validate='wrong_mode')
+
     def test_current_iterator(self, fasta_empty):
         fasta_reader = Reader(fasta_empty)
         assert fasta_reader._current_iterator is None
@@ -339,6 +380,186 @@ class Test__iter__:
         assert len(fastas) == 2
 
 
+class Test_infer_type:
+    def test_per_sequence(self, fasta_aminoacid_multiple):
+        for fasta in Reader(fasta_aminoacid_multiple, infer_type=True):
+            assert fasta.sequence_type == 'aminoacid'
+            assert fasta.inferred_type is True
+
+    def test_per_file_aminoacid(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents):
+        fastas = list(Reader(fasta_aminoacid_multiple, infer_type=True, infer_sample_size=50))
+        assert len(fastas) == len(fasta_aminoacid_multiple_contents)
+        for fasta, contents in zip(fastas, fasta_aminoacid_multiple_contents):
+            assert fasta.sequence_as_string() == contents[2]
+            assert fasta.sequence_type == 'aminoacid'
+            assert fasta.inferred_type is True
+
+    def test_per_file_nucleotide(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        fastas = list(Reader(fasta_nucleotide_multiple, infer_type=True, infer_sample_size=10000))
+        assert len(fastas) == len(fasta_nucleotide_multiple_contents)
+        for fasta in fastas:
+            assert fasta.sequence_type is None
+            assert fasta.inferred_type is False
+
+    def test_per_file_sample_spans_sequences(self, fasta_aminoacid_letter_code_in_second_sequence):
+        # first sequence has 15 letter codes, 'E' is the 18th letter code of the second sequence
+        fastas = list(Reader(fasta_aminoacid_letter_code_in_second_sequence, infer_type=True, infer_sample_size=32))
+        assert all(fasta.sequence_type is None for fasta in fastas)
+        fastas = list(Reader(fasta_aminoacid_letter_code_in_second_sequence, infer_type=True, infer_sample_size=33))
+        assert all(fasta.sequence_type == 'aminoacid' and fasta.inferred_type for fasta in fastas)
+
+    def test_per_file_lookup_by_id(self, fasta_aminoacid_letter_code_in_second_sequence):
+        path = build_hash_index(fasta_aminoacid_letter_code_in_second_sequence.name,
+                                'tests/FASTA_TEMPORARY_INDEX_FILE.fhi')
+        try:
+            for infer_sample_size in (16, 33):
+                fasta_reader = Reader(fasta_aminoacid_letter_code_in_second_sequence, infer_type=True,
+                                      infer_sample_size=infer_sample_size, index=path)
+                for fasta in fasta_reader:
+                    lookup = fasta_reader[fasta.id]
+                    assert (lookup.sequence_type, lookup.inferred_type) == (fasta.sequence_type, fasta.inferred_type)
+        finally:
+            os.remove(path)
+
+
+class Test_validate:
+    def test_off(self, fasta_invalid_letter_codes):
+        fasta_reader = Reader(fasta_invalid_letter_codes, sequences_type='nucleotide', parse_method='quick')
+        assert len(list(fasta_reader)) == 2
+
+    def test_valid_sequences(self, fasta_nucleotide_multiple, fasta_aminoacid_multiple):
+        for fasta_file, sequences_type in ((fasta_nucleotide_multiple, 'nucleotide'),
+                                           (fasta_aminoacid_multiple, 'aminoacid'),
+                                           (fasta_aminoacid_multiple, None)):
+            fasta_reader = Reader(fasta_file, sequences_type=sequences_type, validate='strict')
+            assert len(list(fasta_reader)) > 0
+
+    def test_warn(self, fasta_invalid_letter_codes):
+        fasta_reader = Reader(fasta_invalid_letter_codes, sequences_type='nucleotide', validate='warn')
+        with pytest.warns(UserWarning, match=r"'invalid_sequence'.*'O'.*index 13"):
+            fastas = list(fasta_reader)
+        assert len(fastas) == 2
+
+    def test_strict(self, fasta_invalid_letter_codes):
+        for parse_method in ('rich', 'quick'):
+            fasta_reader = Reader(fasta_invalid_letter_codes, sequences_type='nucleotide', parse_method=parse_method,
+                                  validate='strict')
+            iterator = iter(fasta_reader)
+            assert next(iterator).sequence is not None  # first sequence is valid
+            with pytest.raises(TypeError, match=r"'invalid_sequence'.*'O'.*index 13"):
+                next(iterator)
+
+    def test_sequences_type_alphabet(self, fasta_aminoacid_multiple):
+        fasta_reader = Reader(fasta_aminoacid_multiple, sequences_type='nucleotide', validate='strict')
+        with pytest.raises(TypeError):
+            list(fasta_reader)
+
+
+class Test_independent_iterators:
+    def test_two_iterators(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        fasta_reader = Reader(fasta_nucleotide_multiple, parse_method='quick')
+        iterator_1 = iter(fasta_reader)
+        iterator_2 = iter(fasta_reader)
+        assert next(iterator_1).sequence == fasta_nucleotide_multiple_contents[0][2]
+        assert next(iterator_1).sequence == fasta_nucleotide_multiple_contents[1][2]
+        assert next(iterator_2).sequence == fasta_nucleotide_multiple_contents[0][2]
+        assert next(iterator_1).sequence == fasta_nucleotide_multiple_contents[2][2]
+        assert next(iterator_2).sequence == fasta_nucleotide_multiple_contents[1][2]
+
+    def test_does_not_move_fasta_file(self, fasta_nucleotide_multiple):
+        fasta_reader = Reader(fasta_nucleotide_multiple, parse_method='quick')
+        list(fasta_reader)
+        assert fasta_nucleotide_multiple.tell() == 0
+
+    def test_threads(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents):
+        fasta_reader = Reader(fasta_aminoacid_multiple, parse_method='quick')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: [fasta.sequence for fasta in fasta_reader], range(8)))
+        for result in results:
+            assert result == [contents[2] for contents in fasta_aminoacid_multiple_contents]
+
+    def test_threads_next(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents):
+        fasta_reader = Reader(fasta_aminoacid_multiple, parse_method='quick')
+
+        def next_sequences(_):
+            sequences = []
+            while True:
+                try:
+                    sequences.append(next(fasta_reader).sequence)
+                except StopIteration:
+                    return sequences
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(next_sequences, range(4)))
+        assert sorted(sum(results, [])) == sorted(contents[2] for contents in fasta_aminoacid_multiple_contents)
+
+    def test_not_a_file_on_disk(self, fasta_nucleotide_multiple_contents):
+        with open('tests/fasta_nucleotide_multiple.fasta') as fasta_file:
+            fasta_reader = Reader(io.StringIO(fasta_file.read()), parse_method='quick')
+        assert [fasta.sequence for fasta in fasta_reader] == [contents[2] for contents in
+                                                              fasta_nucleotide_multiple_contents]
+
+
+class Test_stream:
+    def test_closed_file(self, fasta_empty):
+        fasta_reader = Reader(fasta_empty)
+        fasta_empty.close()
+        with pytest.raises(TypeError):
+            fasta_reader.stream()
+
+    def test_wrong_type(self, fasta_empty):
+        fasta_reader = Reader(fasta_empty)
+        for chunk_size, overlap in ((0, 0), ('10', 0), (10.0, 0), (10, -1), (10, 10), (10, '1')):
+            with pytest.raises(TypeError):
+                fasta_reader.stream(chunk_size, overlap)
+
+    def test_empty_fasta_file(self, fasta_empty):
+        assert len(list(Reader(fasta_empty).stream())) == 0
+
+    def test_multiple_fasta_file(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents):
+        fastas = []
+        for fasta in Reader(fasta_aminoacid_multiple).stream(chunk_size=50):
+            chunks = list(fasta.chunks)
+            assert all(len(chunk) == 50 for chunk in chunks[:-1])
+            assert 0 < len(chunks[-1]) <= 50
+            fastas.append((fasta.header, ''.join(chunks)))
+        assert len(fastas) == len(fasta_aminoacid_multiple_contents)
+        for (header, sequence), contents in zip(fastas, fasta_aminoacid_multiple_contents):
+            assert header == '>' + ' '.join((contents[0], contents[1]))
+            assert sequence == contents[2]
+
+    def test_empty_lines(self, fasta_empty_lines_in_sequence, fasta_empty_lines_in_sequence_contents):
+        fastas = [(fasta.header, ''.join(fasta.chunks)) for fasta in Reader(fasta_empty_lines_in_sequence).stream(7)]
+        assert [sequence for _, sequence in fastas] == [contents[2] for contents in
+                                                        fasta_empty_lines_in_sequence_contents]
+
+    def test_overlap(self, fasta_invalid_letter_codes):
+        chunks = [list(fasta.chunks) for fasta in Reader(fasta_invalid_letter_codes).stream(4, 1)]
+        assert chunks == [['ACGT', 'TNAC', 'CGTN', 'Nacg', 'gtn'],
+                          ['ACGT', 'TACG', 'GTAC', 'CGTA', 'AOCG', 'GT']]
+
+    def test_overlap_no_repeated_tail(self, fasta_invalid_letter_codes):
+        # 'ACGTNACGTNacgtn' has 15 letter codes: the last chunk would only contain already yielded letter codes
+        chunks = list(next(iter(Reader(fasta_invalid_letter_codes).stream(8, 1))).chunks)
+        assert chunks == ['ACGTNACG', 'GTNacgtn']
+
+    def test_unconsumed_chunks_are_skipped(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        headers = [fasta.header for fasta in Reader(fasta_nucleotide_multiple).stream(10)]
+        assert headers == ['>' + ' '.join((contents[0], contents[1])) for contents in
+                           fasta_nucleotide_multiple_contents]
+
+    def test_lines_longer_than_read_size(self, tmpdir):
+        sequence = 'ACGT' * 50000
+        fasta_path = tmpdir.join('long_line.fasta')
+        fasta_path.write('>long_line\n%s\n>short\nACGT\n' % sequence)
+        with open(str(fasta_path)) as fasta_file:
+            fastas = [(fasta.header, list(fasta.chunks)) for fasta in Reader(fasta_file).stream(1000)]
+        assert fastas[0][0] == '>long_line'
+        assert ''.join(fastas[0][1]) == sequence
+        assert all(len(chunk) == 1000 for chunk in fastas[0][1])
+        assert fastas[1] == ('>short', ['ACGT'])
+
+
 class Test__next__:
     def test_existing_current_iterator(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
         fasta_reader = Reader(fasta_nucleotide_multiple, sequences_type='nucleotide')
@@ -372,6 +593,219 @@ class Test__next__:
         assert fasta.inferred_type is False
 
 
+class Test__getitem__:
+    @pytest.fixture()
+    def hash_index_path(self):
+        path = build_hash_index('tests/fasta_aminoacid_multiple.fasta', 'tests/FASTA_TEMPORARY_INDEX_FILE.fhi')
+        yield path
+        os.remove(path)
+
+    def test_rich(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents, hash_index_path):
+        fasta_reader = Reader(fasta_aminoacid_multiple, sequences_type='aminoacid', index=hash_index_path)
+        assert isinstance(fasta_reader.index, HashIndex)
+        for id_, description, sequence in reversed(fasta_aminoacid_multiple_contents):
+            fasta = fasta_reader[id_]
+            assert fasta.id == id_
+            assert fasta.description == description
+            assert fasta.sequence_as_string() == sequence
+            assert fasta.sequence_type == 'aminoacid'
+
+    def test_quick(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents, hash_index_path):
+        with HashIndex(hash_index_path) as hash_index:
+            fasta_reader = Reader(fasta_aminoacid_multiple, parse_method='quick', index=hash_index)
+            assert fasta_reader.index is hash_index
+            id_, description, sequence = fasta_aminoacid_multiple_contents[3]
+            assert fasta_reader[id_] == ('>%s %s' % (id_, description), sequence)
+
+    def test_file_position_unchanged(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents,
+                                     hash_index_path):
+        fasta_reader = Reader(fasta_aminoacid_multiple, index=hash_index_path)
+        iterator = iter(fasta_reader)
+        assert next(iterator).id == fasta_aminoacid_multiple_contents[0][0]
+        assert fasta_reader[fasta_aminoacid_multiple_contents[-1][0]].id == fasta_aminoacid_multiple_contents[-1][0]
+        assert next(iterator).id == fasta_aminoacid_multiple_contents[1][0]
+
+    def test_cache(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents, hash_index_path):
+        fasta_reader = Reader(fasta_aminoacid_multiple, index=hash_index_path, cache_size=400000)
+        assert fasta_reader.cache_size == 400000
+        first_id, second_id = fasta_aminoacid_multiple_contents[0][0], fasta_aminoacid_multiple_contents[1][0]
+        fasta = fasta_reader[first_id]
+        assert fasta_reader[first_id] is fasta
+        cache_info = fasta_reader.cache_info()
+        assert (cache_info.hits, cache_info.misses, cache_info.entries) == (1, 1, 1)
+        # rich FastaSequence objects are charged their estimated memory (one LetterCode object per letter code)
+        assert len(fasta) * 100 < cache_info.currsize <= 400000
+        for id_, _, _ in fasta_aminoacid_multiple_contents:
+            fasta_reader[id_]
+        cache_info = fasta_reader.cache_info()
+        assert cache_info.evictions > 0
+        assert cache_info.currsize <= 400000
+        assert fasta_reader[second_id].id == second_id
+        fasta_reader.cache_clear()
+        assert fasta_reader.cache_info().entries == 0
+
+    def test_cache_quick(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents, hash_index_path):
+        fasta_reader = Reader(fasta_aminoacid_multiple, parse_method='quick', index=hash_index_path, cache_size=4000)
+        fasta = fasta_reader[fasta_aminoacid_multiple_contents[0][0]]
+        assert len(fasta.sequence) < fasta_reader.cache_info().currsize < 2 * len(fasta.sequence) + 1000
+
+    def test_no_cache(self, fasta_aminoacid_multiple, fasta_aminoacid_multiple_contents, hash_index_path):
+        fasta_reader = Reader(fasta_aminoacid_multiple, index=hash_index_path)
+        assert fasta_reader.cache_size is None
+        assert fasta_reader.cache_info() is None
+        id_ = fasta_aminoacid_multiple_contents[0][0]
+        assert fasta_reader[id_] is not fasta_reader[id_]
+        with pytest.raises(TypeError):
+            Reader(fasta_aminoacid_multiple, index=hash_index_path, cache_size=0)
+
+    def test_missing_id(self, fasta_aminoacid_multiple, hash_index_path):
+        fasta_reader = Reader(fasta_aminoacid_multiple, index=hash_index_path)
+        with pytest.raises(KeyError):
+            fasta_reader['missing_id']
+
+    def test_wrong_type(self, fasta_aminoacid_multiple, fasta_nucleotide_multiple, hash_index_path):
+        with pytest.raises(TypeError):
+            Reader(fasta_aminoacid_multiple)['NP_056019.1']
+        with pytest.raises(TypeError):
+            Reader(fasta_aminoacid_multiple, index=123)
+        with pytest.raises(TypeError):
+            Reader(io.StringIO('>id\nACGT\n'), index=hash_index_path)
+        with pytest.raises(TypeError):  # index of another FASTA file
+            Reader(fasta_nucleotide_multiple, index=hash_index_path)
+        fasta_reader = Reader(fasta_aminoacid_multiple, index=hash_index_path)
+        fasta_aminoacid_multiple.close()
+        with pytest.raises(TypeError):
+            fasta_reader['NP_056019.1']
+
+    def test_stale_index(self):
+        fasta_path = 'tests/FASTA_TEMPORARY_FILE_FOR_INDEX.fasta'
+        shutil.copyfile('tests/fasta_aminoacid_multiple.fasta', fasta_path)
+        index_path = build_hash_index(fasta_path)
+        try:
+            # same size, edited in place
+            stat = os.stat(fasta_path)
+            with open(fasta_path, 'r+') as fasta_file_modify:
+                fasta_file_modify.write('>')
+            os.utime(fasta_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+            assert os.path.getsize(fasta_path) == stat.st_size
+            with open(fasta_path) as fasta_file:
+                with pytest.raises(TypeError):
+                    Reader(fasta_file, index=index_path)
+        finally:
+            os.remove(index_path)
+            os.remove(fasta_path)
+
+
+class Test_parse_cache:
+    @pytest.fixture()
+    def parse_cache_directory(self):
+        path = 'tests/PARSE_CACHE_TEMPORARY_DIRECTORY'
+        yield path
+        shutil.rmtree(path, ignore_errors=True)
+
+    @pytest.fixture()
+    def fasta_temporary_path(self):
+        path = 'tests/FASTA_TEMPORARY_FILE_FOR_PARSE_CACHE.fasta'
+        shutil.copyfile('tests/fasta_nucleotide_multiple.fasta', path)
+        yield path
+        os.remove(path)
+
+    def test_rich(self, fasta_nucleotide_multiple, parse_cache_directory):
+        fasta_reader = Reader(fasta_nucleotide_multiple, sequences_type='nucleotide', parse_cache=parse_cache_directory)
+        assert fasta_reader.parse_cache == parse_cache_directory
+        parsed = list(fasta_reader)
+        assert len(os.listdir(parse_cache_directory)) == 1
+        cached = list(fasta_reader)
+        assert len(cached) == len(parsed)
+        for parsed_fasta, cached_fasta in zip(parsed, cached):
+            assert cached_fasta.id == parsed_fasta.id
+            assert cached_fasta.description == parsed_fasta.description
+            assert cached_fasta.sequence_as_string() == parsed_fasta.sequence_as_string()
+            assert cached_fasta.sequence_type == parsed_fasta.sequence_type
+            assert cached_fasta.inferred_type == parsed_fasta.inferred_type
+
+    def test_quick(self, fasta_multiple_empty_lines, parse_cache_directory):
+        fasta_reader = Reader(fasta_multiple_empty_lines, parse_method='quick', parse_cache=parse_cache_directory)
+        parsed = list(fasta_reader)
+        assert list(fasta_reader) == parsed
+        # another Reader, with the same options, uses the same cache file
+        assert list(Reader(fasta_multiple_empty_lines, parse_method='quick', parse_cache=parse_cache_directory)) == \
+            parsed
+        assert len(os.listdir(parse_cache_directory)) == 1
+
+    def test_options(self, fasta_nucleotide_multiple, parse_cache_directory):
+        list(Reader(fasta_nucleotide_multiple, parse_method='quick', parse_cache=parse_cache_directory))
+        list(Reader(fasta_nucleotide_multiple, parse_cache=parse_cache_directory))
+        assert len(os.listdir(parse_cache_directory)) == 2
+
+    def test_partial_iteration(self, fasta_nucleotide_multiple, parse_cache_directory):
+        fasta_reader = Reader(fasta_nucleotide_multiple, parse_cache=parse_cache_directory)
+        iterator = iter(fasta_reader)
+        next(iterator)
+        iterator.close()
+        assert not os.listdir(parse_cache_directory)
+
+    def test_modified_file(self, fasta_temporary_path, parse_cache_directory):
+        with open(fasta_temporary_path) as fasta_file:
+            fasta_reader = Reader(fasta_file, parse_method='quick', parse_cache=parse_cache_directory)
+            list(fasta_reader)
+            time.sleep(0.01)
+            with open(fasta_temporary_path, 'a') as fasta_file_append:
+                fasta_file_append.write('>new_id new description\nACGT\n')
+            fastas = list(fasta_reader)
+            assert fastas[-1] == ('>new_id new description', 'ACGT')
+            assert list(fasta_reader) == fastas
+
+    def test_validate_warn(self, parse_cache_directory):
+        for parse_method in ('rich', 'quick'):
+            with open('tests/fasta_invalid_letter_codes.fasta') as fasta_file:
+                fasta_reader = Reader(fasta_file, sequences_type='nucleotide', parse_method=parse_method,
+                                      validate='warn', parse_cache=parse_cache_directory)
+                for _ in range(2):  # the second iteration reads the cache file
+                    with pytest.warns(UserWarning, match=r"'invalid_sequence'.*'O'.*index 13"):
+                        fastas = list(fasta_reader)
+                    assert len(fastas) == 2
+            assert len(os.listdir(parse_cache_directory)) == (1 if parse_method == 'rich' else 2)
+
+    def test_content_hash(self, fasta_temporary_path, parse_cache_directory):
+        with open(fasta_temporary_path) as fasta_file:
+            fasta_reader = Reader(fasta_file, parse_method='quick', parse_cache=parse_cache_directory,
+                                  parse_cache_hash=True)
+            sequence = list(fasta_reader)[0].sequence
+            # same size and modification time, different contents
+            stat = os.stat(fasta_temporary_path)
+            with open(fasta_temporary_path, 'r+') as fasta_file_modify:
+                contents = fasta_file_modify.read()
+                fasta_file_modify.seek(0)
+                fasta_file_modify.write(contents.replace(sequence[:4], sequence[:4][::-1], 1))
+            os.utime(fasta_temporary_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            assert list(fasta_reader)[0].sequence != sequence
+
+    def test_composition(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents,
+                         parse_cache_directory):
+        expected = {}
+        for _, _, sequence in fasta_nucleotide_multiple_contents:
+            for letter_code in sequence:
+                expected[letter_code] = expected.get(letter_code, 0) + 1
+        assert Reader(fasta_nucleotide_multiple).composition() == expected
+        fasta_reader = Reader(fasta_nucleotide_multiple, parse_method='quick', parse_cache=parse_cache_directory)
+        assert fasta_reader.composition() == expected  # parses the file and writes the cache file
+        assert len(os.listdir(parse_cache_directory)) == 1
+        assert fasta_reader.composition() == expected  # read from the cache file
+
+    def test_wrong_type(self, fasta_nucleotide_multiple, parse_cache_directory):
+        with pytest.raises(TypeError):
+            Reader(fasta_nucleotide_multiple, parse_cache=123)
+        with pytest.raises(TypeError):
+            Reader(fasta_nucleotide_multiple, parse_cache=parse_cache_directory, parse_cache_hash='yes')
+        with pytest.raises(TypeError):
+            Reader(io.StringIO('>id\nACGT\n'), parse_cache=parse_cache_directory)
+        fasta_reader = Reader(fasta_nucleotide_multiple)
+        fasta_nucleotide_multiple.close()
+        with pytest.raises(TypeError):
+            fasta_reader.composition()
+
+
 class Test__repr__:
     def test__repr__(self, fasta_empty):
         fasta_reader = Reader(fasta_empty)
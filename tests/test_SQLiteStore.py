@@ -0,0 +1,168 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.SQLiteStore class.
+"""
+
+
+import os
+import pytest
+from fastaparser import Reader, SQLiteStore, FastaSequence
+from .conftest import fasta_contents
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def fasta_aminoacid_multiple_contents():
+    return fasta_contents('tests/fasta_aminoacid_multiple.fasta')
+
+
+@pytest.fixture()
+def fasta_store():
+    with open('tests/fasta_aminoacid_multiple.fasta') as fasta_file:
+        store = SQLiteStore(':memory:')
+        store.import_fastas(Reader(fasta_file, sequences_type='aminoacid'), batch_size=7)
+    yield store
+    store.close()
+
+
+@pytest.fixture()
+def database_path():
+    path = 'tests/FASTA_TEMPORARY_DATABASE.sqlite'
+    yield path
+    os.remove(path)
+
+
+#######
+# Tests
+#######
+
+
+class Test_import_fastas:
+    def test_count(self, fasta_aminoacid_multiple_contents):
+        with open('tests/fasta_aminoacid_multiple.fasta') as fasta_file, SQLiteStore(':memory:') as store:
+            assert store.import_fastas(Reader(fasta_file, parse_method='quick'), batch_size=3) == \
+                len(fasta_aminoacid_multiple_contents)
+            assert len(store) == len(fasta_aminoacid_multiple_contents)
+
+    def test_persistence(self, database_path):
+        with SQLiteStore(database_path) as store:
+            store.import_fastas([('>seq1 first sequence', 'ACGT')])
+            store.import_fastas([('>seq2', 'TTTTT')])  # imported into a non empty database, keeping the indexes
+        with SQLiteStore(database_path) as store:
+            assert len(store) == 2
+            assert store['seq1'].description == 'first sequence'
+            assert store['seq2'].sequence_as_string() == 'TTTTT'
+
+    def test_id_starting_with_greater_than(self):
+        with SQLiteStore(':memory:') as store:
+            store.import_fastas([FastaSequence('ACGT', '>>x', 'desc')])
+            assert (store['>x'].id, store['>x'].description) == ('>x', 'desc')
+
+    def test_wrong_type(self):
+        with SQLiteStore(':memory:') as store:
+            with pytest.raises(TypeError):
+                store.import_fastas(123)
+            with pytest.raises(TypeError):
+                store.import_fastas([123])
+            with pytest.raises(TypeError):
+                store.import_fastas([], batch_size=0)
+
+
+class Test_get:
+    def test_get(self, fasta_store, fasta_aminoacid_multiple_contents):
+        for id_, description, sequence in fasta_aminoacid_multiple_contents:
+            fasta = fasta_store[id_]
+            assert isinstance(fasta, FastaSequence)
+            assert fasta.id == id_
+            assert fasta.description == description
+            assert fasta.sequence_as_string() == sequence
+            assert fasta.sequence_type == 'aminoacid'
+            assert fasta_store.get(id_).id == id_
+            assert id_ in fasta_store
+
+    def test_missing_id(self, fasta_store):
+        with pytest.raises(KeyError):
+            fasta_store['missing_id']
+        assert fasta_store.get('missing_id') is None
+        assert fasta_store.get('missing_id', 0) == 0
+        assert 'missing_id' not in fasta_store
+        assert 123 not in fasta_store
+
+    def test_wrong_type(self, fasta_store):
+        with pytest.raises(TypeError):
+            fasta_store[123]
+
+
+class Test_query:
+    def test_all(self, fasta_store, fasta_aminoacid_multiple_contents):
+        assert [fasta.id for fasta in fasta_store.query()] == [id_ for id_, _, _ in fasta_aminoacid_multiple_contents]
+        assert [fasta.id for fasta in fasta_store] == [id_ for id_, _, _ in fasta_aminoacid_multiple_contents]
+
+    def test_ids(self, fasta_store, fasta_aminoacid_multiple_contents):
+        ids = [fasta_aminoacid_multiple_contents[5][0], fasta_aminoacid_multiple_contents[2][0], 'missing_id']
+        # in import order
+        assert [fasta.id for fasta in fasta_store.query(ids=ids)] == ids[1::-1]
+
+    def test_length(self, fasta_store, fasta_aminoacid_multiple_contents):
+        lengths = sorted(len(sequence) for _, _, sequence in fasta_aminoacid_multiple_contents)
+        min_length, max_length = lengths[5], lengths[14]
+        fastas = list(fasta_store.query(min_length=min_length, max_length=max_length))
+        assert len(fastas) == sum(1 for length in lengths if min_length <= length <= max_length)
+        assert all(min_length <= len(fasta) <= max_length for fasta in fastas)
+
+    def test_description_and_limit(self, fasta_store, fasta_aminoacid_multiple_contents):
+        expected = [id_ for id_, description, _ in fasta_aminoacid_multiple_contents if 'isoform' in description]
+        assert [fasta.id for fasta in fasta_store.query(description='%ISOFORM%')] == expected
+        assert [fasta.id for fasta in fasta_store.query(description='%isoform%', limit=2)] == expected[:2]
+
+    def test_wrong_type(self, fasta_store):
+        with pytest.raises(TypeError):
+            fasta_store.query(ids='id')
+        with pytest.raises(TypeError):
+            fasta_store.query(ids=[1])
+        with pytest.raises(TypeError):
+            fasta_store.query(min_length='1')
+        with pytest.raises(TypeError):
+            fasta_store.query(max_length=-1)
+        with pytest.raises(TypeError):
+            fasta_store.query(description=1)
+        with pytest.raises(TypeError):
+            fasta_store.query(limit=1.5)
+
+
+class Test_composition:
+    def test_composition(self, fasta_store, fasta_aminoacid_multiple_contents):
+        id_, _, sequence = fasta_aminoacid_multiple_contents[0]
+        composition = fasta_store.composition(id_)
+        assert composition == {letter_code: sequence.count(letter_code) for letter_code in set(sequence)}
+
+    def test_lowercase(self):
+        with SQLiteStore(':memory:') as store:
+            store.import_fastas([('>seq1', 'ACgtac'), FastaSequence('acGTAC', id_='seq2')])
+            for id_ in ('seq1', 'seq2'):
+                assert store.composition(id_) == {'A': 2, 'C': 2, 'G': 1, 'T': 1}
+                assert store.composition(id_) == store[id_].count_letter_codes()
+                assert store[id_].sequence_as_string() == 'ACGTAC'
+
+    def test_missing_id(self, fasta_store):
+        with pytest.raises(KeyError):
+            fasta_store.composition('missing_id')
+        with pytest.raises(TypeError):
+            fasta_store.composition(123)
+
+
+class Test__init__:
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            SQLiteStore(123)
+
+    def test__repr__(self, database_path):
+        assert repr(SQLiteStore(':memory:')) == 'fastaparser.SQLiteStore(:memory:)'
+        with SQLiteStore(database_path) as store:
+            assert repr(store) == 'fastaparser.SQLiteStore(%s)' % os.path.abspath(database_path)
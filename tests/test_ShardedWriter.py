@@ -0,0 +1,96 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.ShardedWriter class.
+"""
+
+
+import os
+import shutil
+import pytest
+from fastaparser import Reader, ShardedWriter
+
+
+##########
+# Fixtures
+##########
+
+
+def length_bucket(fasta):
+    return len(fasta.sequence) // 100
+
+
+@pytest.fixture()
+def shards_directory():
+    path = 'tests/SHARDS_TEMPORARY_DIRECTORY'
+    os.mkdir(path)
+    yield path
+    shutil.rmtree(path)
+
+
+def read_shards(paths):
+    shards = {}
+    for key, path in paths.items():
+        with open(path) as shard_file:
+            shards[key] = [(fasta.header, fasta.sequence) for fasta in Reader(shard_file, parse_method='quick')]
+    return shards
+
+
+#######
+# Tests
+#######
+
+
+class Test__init__:
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            ShardedWriter('shard.fasta', length_bucket)
+        with pytest.raises(TypeError):
+            ShardedWriter('shard_{key}.fasta', None)
+        with pytest.raises(TypeError):
+            ShardedWriter('shard_{key}.fasta', length_bucket, max_open_files=0)
+        with pytest.raises(TypeError):
+            ShardedWriter('shard_{key}.fasta', length_bucket, buffer_size='1')
+        with pytest.raises(TypeError):
+            ShardedWriter('shard_{key}.fasta', length_bucket, mode='r')
+
+
+class Test_writefastas:
+    @pytest.mark.parametrize('max_open_files, buffer_size, max_buffered_size', [
+        (64, 65536, 67108864),  # everything buffered until close
+        (2, 1, 67108864),  # every FASTA sequence written on its own, handles evicted
+        (1, 65536, 2000),  # buffers written when max_buffered_size is reached
+    ])
+    def test_shards(self, fasta_nucleotide_multiple, shards_directory, max_open_files, buffer_size,
+                    max_buffered_size):
+        fastas = list(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+        with ShardedWriter(os.path.join(shards_directory, 'bucket_{key}.fasta'), length_bucket,
+                           max_open_files=max_open_files, buffer_size=buffer_size,
+                           max_buffered_size=max_buffered_size) as sharded_writer:
+            sharded_writer.writefastas(fastas)
+        expected_shards = {}
+        for fasta in fastas:
+            expected_shards.setdefault(length_bucket(fasta), []).append((fasta.header, fasta.sequence))
+        assert sorted(sharded_writer.paths) == sorted(expected_shards)
+        assert read_shards(sharded_writer.paths) == expected_shards
+
+    def test_mode(self, shards_directory):
+        path_template = os.path.join(shards_directory, 'shard_{key}.fasta')
+        for mode in ('w', 'w', 'a'):
+            with ShardedWriter(path_template, lambda fasta: 0, mode=mode) as sharded_writer:
+                sharded_writer.writefasta(('>id', 'ACGT'))
+        assert read_shards(sharded_writer.paths) == {0: [('>id', 'ACGT'), ('>id', 'ACGT')]}
+
+    def test_write_after_close(self, shards_directory):
+        sharded_writer = ShardedWriter(os.path.join(shards_directory, 'shard_{key}.fasta'), lambda fasta: 0)
+        sharded_writer.close()
+        with pytest.raises(ValueError):
+            sharded_writer.writefasta(('>id', 'ACGT'))
+
+    def test_wrong_type(self, shards_directory):
+        with ShardedWriter(os.path.join(shards_directory, 'shard_{key}.fasta'), lambda fasta: 0) as sharded_writer:
+            with pytest.raises(TypeError):
+                sharded_writer.writefastas(123)
+            with pytest.raises(TypeError):
+                sharded_writer.writefasta(123)
@@ -0,0 +1,152 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.SharedFastas class.
+"""
+
+
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from fastaparser import FastaSequence, Reader, SharedFastas
+from fastaparser.sharedmemory import shared_memory
+
+
+pytestmark = pytest.mark.skipif(shared_memory is None, reason='multiprocessing.shared_memory requires python 3.8+')
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def shared_fastas():
+    fastas = SharedFastas.publish([FastaSequence('ACGTN', 'id_1', 'description 1', 'nucleotide'),
+                                   ('>id_2 description 2', 'MKVLAQE'),
+                                   FastaSequence('ACGT')])
+    yield fastas
+    fastas.close()
+    fastas.unlink()
+
+
+def sequence_length(shared_fastas, index):
+    fasta = shared_fastas[index]
+    length = len(fasta.sequence)
+    fasta.sequence.release()
+    shared_fastas.close()
+    return length
+
+
+#######
+# Tests
+#######
+
+
+class Test__init__:
+    def test_attach(self, shared_fastas):
+        with SharedFastas(shared_fastas.name) as attached:
+            assert attached.name == shared_fastas.name
+            assert len(attached) == 3
+            assert attached[1].id == 'id_2'
+
+    def test_name_wrong_type(self):
+        with pytest.raises(TypeError):
+            SharedFastas(123)
+
+    def test_not_fastas(self):
+        block = shared_memory.SharedMemory(create=True, size=64)
+        try:
+            with pytest.raises(TypeError):
+                SharedFastas(block.name)
+        finally:
+            block.close()
+            block.unlink()
+
+
+class Test_publish:
+    def test_reader(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents):
+        fastas = SharedFastas.publish(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+        try:
+            assert len(fastas) == len(fasta_nucleotide_multiple_contents)
+            for fasta, contents in zip(fastas, fasta_nucleotide_multiple_contents):
+                assert (fasta.id, fasta.description) == (contents[0], contents[1])
+                assert bytes(fasta.sequence) == contents[2].encode()
+            del fasta
+        finally:
+            fastas.close()
+            fastas.unlink()
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            SharedFastas.publish(123)
+        with pytest.raises(TypeError):
+            SharedFastas.publish([123])
+
+
+class Test__getitem__:
+    def test_views(self, shared_fastas):
+        fasta = shared_fastas[0]
+        assert fasta.id == 'id_1'
+        assert fasta.description == 'description 1'
+        assert fasta.sequence_type == 'nucleotide'
+        assert isinstance(fasta.sequence, memoryview)
+        assert fasta.sequence.readonly
+        assert bytes(fasta.sequence) == b'ACGTN'
+        assert bytes(shared_fastas[-1].sequence) == b'ACGT'
+        fasta.sequence.release()
+
+    def test_wrong_index(self, shared_fastas):
+        with pytest.raises(IndexError):
+            shared_fastas[3]
+        with pytest.raises(TypeError):
+            shared_fastas['0']
+
+
+class Test_fastasequence:
+    def test_fastasequence(self, shared_fastas):
+        fasta_sequence = shared_fastas.fastasequence(0)
+        assert fasta_sequence == FastaSequence('ACGTN')
+        assert fasta_sequence.id == 'id_1'
+        assert fasta_sequence.sequence_type == 'nucleotide'
+        fasta_sequence = shared_fastas.fastasequence(1)
+        assert (fasta_sequence.id, fasta_sequence.description) == ('id_2', 'description 2')
+
+    def test_id_starting_with_greater_than(self):
+        with SharedFastas.publish([FastaSequence('ACGT', '>>x', 'desc')]) as fastas:
+            try:
+                assert (fastas[0].id, fastas[0].description) == ('>x', 'desc')
+                fasta_sequence = fastas.fastasequence(0)
+                assert (fasta_sequence.id, fasta_sequence.description) == ('>x', 'desc')
+            finally:
+                fastas.unlink()
+
+
+class Test__reduce__:
+    def test_pickle_only_name(self, shared_fastas):
+        assert len(pickle.dumps(shared_fastas)) < 200
+
+    def test_worker_process(self, shared_fastas):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(sequence_length, shared_fastas, 1).result() == 7
+
+    def test_not_closed_copies_detach_cleanly(self):
+        # copies unpickled in worker processes (and the published object itself) are garbage collected without
+        # being closed, which must not print errors (ex: BufferError from SharedMemory.__del__)
+        script = (
+            'from concurrent.futures import ProcessPoolExecutor\n'
+            'from fastaparser import SharedFastas\n'
+            'fastas = SharedFastas.publish([(">id_1", "ACGT"), (">id_2", "MKV")])\n'
+            'name = fastas.name\n'
+            'with ProcessPoolExecutor(max_workers=2) as executor:\n'
+            '    assert [executor.submit(SharedFastas.__len__, fastas).result() for _ in range(4)] == [2] * 4\n'
+            'bytes(fastas[0].sequence)\n'
+            'del fastas\n'
+            'SharedFastas(name).unlink()\n')
+        result = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True, timeout=120)
+        assert result.returncode == 0
+        assert result.stderr == ''
@@ -6,10 +6,14 @@ Tests for fastaparser.Writer class.
 """
 
 
+import gzip
 import hashlib
+import io
 import os
+import struct
 import pytest
-from fastaparser import Reader, Writer
+from fastaparser import FastaSequence, Reader, Writer
+from fastaparser.index import _read_fai, _read_gzi
 
 
 ##########
@@ -32,6 +36,14 @@ def compare_2_files(file_read, file_written):
     assert hash_read.hexdigest() == hash_written.hexdigest()
 
 
+@pytest.fixture()
+def fasta_uncompressed_contents(fasta_nucleotide_multiple):
+    output = io.StringIO()
+    Writer(output).writefastas(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+    fasta_nucleotide_multiple.seek(0)
+    return output.getvalue()
+
+
 @pytest.fixture()
 def fasta_temporary_file():
     f = open('tests/FASTA_TEMPORARY_FILE_FOR_WRITING.fasta', 'w')
@@ -63,6 +75,26 @@ class Test__init__:
         with pytest.raises(TypeError):
             Writer(123)
 
+    def test_buffer_size(self, fasta_temporary_file):
+        assert Writer(fasta_temporary_file).buffer_size == 1048576
+        assert Writer(fasta_temporary_file, buffer_size=10).buffer_size == 10
+
+    def test_line_width(self, fasta_temporary_file):
+        assert Writer(fasta_temporary_file).line_width == 70
+        assert Writer(fasta_temporary_file, line_width=60).line_width == 60
+
+    def test_line_width_wrong_type(self, fasta_temporary_file):
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, line_width=0)
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, line_width=True)
+
+    def test_buffer_size_wrong_type(self, fasta_temporary_file):
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, buffer_size=0)
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, buffer_size='10')
+
 
 class Test_writefasta:
     def test_fasta_sequence_fastasequence_object(self, fasta_nucleotide_single, fasta_temporary_file):
@@ -80,7 +112,31 @@ class Test_writefasta:
         # at this point the 2 files should be equal
         compare_2_files(fasta_nucleotide_single, fasta_temporary_file)
 
+    def test_fasta_sequence_tuple_same_as_fastasequence(self):
+        fasta_sequence = FastaSequence('acgtACGTN', ' >id ', '  some\n description ')
+        tuple_output = io.StringIO()
+        Writer(tuple_output).writefasta(('>id   some\n description ', 'acgt\nACGTN'))
+        fastasequence_output = io.StringIO()
+        Writer(fastasequence_output).writefasta(fasta_sequence)
+        assert tuple_output.getvalue() == fastasequence_output.getvalue() == '>id some description\nACGTACGTN\n\n'
+
+    def test_fasta_sequence_bytes(self):
+        output = io.StringIO()
+        Writer(output).writefasta((b'>id description', b'ACGT'))
+        assert output.getvalue() == '>id description\nACGT\n\n'
+
+    def test_line_width(self):
+        output = io.StringIO()
+        Writer(output, line_width=3).writefasta(('>id', 'ACGTACGT'))
+        assert output.getvalue() == '>id\nACG\nTAC\nGT\n\n'
+        output = io.StringIO()
+        Writer(output, line_width=3).writefasta(FastaSequence('ACGTACGT', 'id'))
+        assert output.getvalue() == '>id\nACG\nTAC\nGT\n\n'
+
     def test_fasta_sequence_wrong_type(self, fasta_temporary_file):
+        with pytest.raises(TypeError):
+            fasta_writer = Writer(fasta_temporary_file)
+            fasta_writer.writefasta(('>id', '\n'))
         with pytest.raises(TypeError):
             fasta_writer = Writer(fasta_temporary_file)
             fasta_writer.writefasta('')
@@ -103,6 +159,29 @@ class Test_writefastas:
         # at this point the 2 files should be equal
         compare_2_files(fasta_nucleotide_multiple, fasta_temporary_file)
 
+    def test_small_buffer_size(self, fasta_nucleotide_multiple, fasta_temporary_file):
+        fasta_reader = Reader(fasta_nucleotide_multiple)
+        fasta_writer = Writer(fasta_temporary_file, buffer_size=1000)
+        fasta_writer.writefastas(fasta_reader)
+        # at this point the 2 files should be equal
+        compare_2_files(fasta_nucleotide_multiple, fasta_temporary_file)
+
+    def test_written_before_error(self, fasta_nucleotide_multiple, fasta_temporary_file):
+        fasta_reader = Reader(fasta_nucleotide_multiple)
+        fasta_writer = Writer(fasta_temporary_file)
+        with pytest.raises(TypeError):
+            fasta_writer.writefastas([next(fasta_reader), 123])
+        fasta_temporary_file.flush()
+        with open(fasta_temporary_file.name) as fasta_file_written:
+            assert len(list(Reader(fasta_file_written))) == 1
+
+    def test_quick_records(self, fasta_nucleotide_multiple, fasta_temporary_file):
+        fasta_reader = Reader(fasta_nucleotide_multiple, parse_method='quick')
+        fasta_writer = Writer(fasta_temporary_file)
+        fasta_writer.writefastas(fasta_reader)
+        # at this point the 2 files should be equal
+        compare_2_files(fasta_nucleotide_multiple, fasta_temporary_file)
+
     def test_fasta_sequence_tuples(self, fasta_nucleotide_multiple, fasta_temporary_file):
         fasta_reader = Reader(fasta_nucleotide_multiple)
         fasta_writer = Writer(fasta_temporary_file)
@@ -123,6 +202,168 @@ class Test_writefastas:
             fasta_writer.writefastas([1, 2])
 
 
+class Test_compression:
+    def test_gzip(self, fasta_nucleotide_multiple, fasta_uncompressed_contents):
+        output = io.BytesIO()
+        with Writer(output, compression='gzip', threads=2) as fasta_writer:
+            fasta_writer.writefastas(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+        assert fasta_writer.compression == 'gzip'
+        assert gzip.decompress(output.getvalue()).decode() == fasta_uncompressed_contents
+
+    def test_bgzf(self, fasta_nucleotide_multiple, fasta_uncompressed_contents):
+        output = io.BytesIO()
+        with Writer(output, compression='bgzf', threads=3) as fasta_writer:
+            for fasta in Reader(fasta_nucleotide_multiple, parse_method='quick'):
+                fasta_writer.writefasta(fasta)
+        compressed = output.getvalue()
+        assert gzip.decompress(compressed).decode() == fasta_uncompressed_contents
+        # every block is a gzip member with the BGZF extra field, the last one is the empty end of file block
+        offset = 0
+        blocks = 0
+        while offset < len(compressed):
+            assert compressed[offset:offset + 4] == b'\x1f\x8b\x08\x04'
+            assert compressed[offset + 12:offset + 14] == b'BC'
+            offset += struct.unpack_from('<H', compressed, offset + 16)[0] + 1
+            blocks += 1
+        assert offset == len(compressed)
+        assert blocks == len(fasta_uncompressed_contents.encode()) // 65280 + 2
+        assert compressed[-28:] == bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+    def test_multiple_blocks(self):
+        fastas = [('>id%d' % i, 'ACGTTGCAAC' * 10000) for i in range(3)]
+        uncompressed = io.StringIO()
+        Writer(uncompressed).writefastas(fastas)
+        for compression in ('gzip', 'bgzf'):
+            output = io.BytesIO()
+            with Writer(output, buffer_size=1000, compression=compression, threads=2) as fasta_writer:
+                fasta_writer.writefastas(fastas)
+            assert gzip.decompress(output.getvalue()).decode() == uncompressed.getvalue()
+
+    def test_write_after_close(self):
+        fasta_writer = Writer(io.BytesIO(), compression='gzip')
+        fasta_writer.close()
+        fasta_writer.close()
+        with pytest.raises(ValueError):
+            fasta_writer.writefasta(('>id', 'ACGT'))
+
+    def test_wrong_type(self, fasta_temporary_file):
+        with pytest.raises(TypeError):
+            Writer(io.BytesIO(), compression='zip')
+        with pytest.raises(TypeError):
+            Writer(io.BytesIO(), compression='gzip', threads=0)
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, compression='gzip')
+
+
+def fai_sequence(fasta_bytes, fai_entry):
+    # reads a sequence using only its .fai entry
+    lines, last_line_bases = divmod(fai_entry.length, fai_entry.line_bases)
+    size = lines * fai_entry.line_width + last_line_bases
+    return fasta_bytes[fai_entry.offset:fai_entry.offset + size].replace(b'\n', b'').decode()
+
+
+class Test_index:
+    def test_fai(self, fasta_nucleotide_multiple, fasta_nucleotide_multiple_contents, fasta_temporary_file):
+        fasta_temporary_file.write('>existing\nACGT\n\n')  # appending to an existing file
+        with Writer(fasta_temporary_file, line_width=60, index=True) as fasta_writer:
+            fasta_writer.writefastas(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+            fasta_writer.writefasta(FastaSequence('ACGT', 'short'))
+        assert fasta_writer.index
+        fasta_temporary_file.close()
+        with open(fasta_temporary_file.name, 'rb') as fasta_file_written:
+            fasta_bytes = fasta_file_written.read()
+        fai_entries = _read_fai(fasta_temporary_file.name + '.fai')
+        os.remove(fasta_temporary_file.name + '.fai')
+        assert [fai_entry.name for fai_entry in fai_entries] == [
+            contents[0] for contents in fasta_nucleotide_multiple_contents] + ['short']
+        for fai_entry, contents in zip(fai_entries, fasta_nucleotide_multiple_contents):
+            assert (fai_entry.length, fai_entry.line_bases, fai_entry.line_width) == (len(contents[2]), 60, 61)
+            assert fai_sequence(fasta_bytes, fai_entry) == contents[2].upper()
+        assert fai_entries[-1][1:] == (4, len(fasta_bytes) - 6, 4, 5)
+
+    def test_bgzf_gzi(self, fasta_temporary_file):
+        fastas = [('>id%d' % i, 'ACGTTGCAAC' * 10000) for i in range(3)]
+        fasta_temporary_file.close()
+        with open(fasta_temporary_file.name, 'wb') as binary_file:
+            with Writer(binary_file, compression='bgzf', threads=2, index=True) as fasta_writer:
+                fasta_writer.writefastas(fastas)
+        with open(fasta_temporary_file.name, 'rb') as binary_file:
+            compressed = binary_file.read()
+        fasta_bytes = gzip.decompress(compressed)
+        fai_entries = _read_fai(fasta_temporary_file.name + '.fai')
+        gzi_entries = _read_gzi(fasta_temporary_file.name + '.gzi')
+        os.remove(fasta_temporary_file.name + '.fai')
+        os.remove(fasta_temporary_file.name + '.gzi')
+        for fai_entry, fasta in zip(fai_entries, fastas):
+            assert fai_entry.name == fasta[0][1:]
+            assert fai_sequence(fasta_bytes, fai_entry) == fasta[1]
+        assert len(gzi_entries) == len(fasta_bytes) // 65280
+        for compressed_offset, uncompressed_offset in gzi_entries:
+            # each block decompresses on its own, to the data at its uncompressed offset
+            block_size = struct.unpack_from('<H', compressed, compressed_offset + 16)[0] + 1
+            block = gzip.decompress(compressed[compressed_offset:compressed_offset + block_size])
+            assert block == fasta_bytes[uncompressed_offset:uncompressed_offset + len(block)]
+
+    def test_wrong_type(self, fasta_temporary_file):
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, index=1)
+        with pytest.raises(TypeError):
+            Writer(io.StringIO(), index=True)
+        with pytest.raises(TypeError):
+            Writer(io.BytesIO(), compression='gzip', index=True)
+
+
+class Test_background:
+    def test_background(self, fasta_nucleotide_multiple, fasta_temporary_file):
+        fasta_writer = Writer(fasta_temporary_file, background=True, queue_size=2)
+        assert fasta_writer.background
+        fasta_writer.writefastas(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+        fasta_writer.close()
+        # at this point the 2 files should be equal
+        compare_2_files(fasta_nucleotide_multiple, fasta_temporary_file)
+
+    def test_flush(self):
+        output = io.StringIO()
+        fasta_writer = Writer(output, background=True)
+        fasta_writer.writefasta(('>id', 'ACGT'))
+        fasta_writer.flush()
+        assert output.getvalue() == '>id\nACGT\n\n'
+        fasta_writer.close()
+
+    def test_error_on_flush_and_close(self):
+        output = io.StringIO()
+        fasta_writer = Writer(output, background=True)
+        fasta_writer.writefastas([('>id_1', 'ACGT'), 123, ('>id_2', 'ACGT')])  # doesn't raise
+        with pytest.raises(TypeError):
+            fasta_writer.flush()
+        assert output.getvalue() == '>id_1\nACGT\n\n'  # FASTA sequences queued after the error are discarded
+        fasta_writer.writefasta(('>id_3', 'ACGT'))
+        fasta_writer.writefasta(('>id_4', ''))
+        with pytest.raises(TypeError):
+            fasta_writer.close()
+        assert output.getvalue() == '>id_1\nACGT\n\n>id_3\nACGT\n\n'
+        with pytest.raises(ValueError):
+            fasta_writer.writefasta(('>id_5', 'ACGT'))
+        fasta_writer.close()
+
+    def test_compression_and_index(self, fasta_nucleotide_multiple, fasta_uncompressed_contents, fasta_temporary_file):
+        fasta_temporary_file.close()
+        with open(fasta_temporary_file.name, 'wb') as binary_file:
+            with Writer(binary_file, compression='bgzf', index=True, background=True) as fasta_writer:
+                fasta_writer.writefastas(Reader(fasta_nucleotide_multiple, parse_method='quick'))
+        with open(fasta_temporary_file.name, 'rb') as binary_file:
+            assert gzip.decompress(binary_file.read()).decode() == fasta_uncompressed_contents
+        assert len(_read_fai(fasta_temporary_file.name + '.fai')) == 17
+        os.remove(fasta_temporary_file.name + '.fai')
+        os.remove(fasta_temporary_file.name + '.gzi')
+
+    def test_wrong_type(self, fasta_temporary_file):
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, background='yes')
+        with pytest.raises(TypeError):
+            Writer(fasta_temporary_file, background=True, queue_size=0)
+
+
 class Test__repr__:
     def test__repr__(self, fasta_temporary_file):
         fasta_writer = Writer(fasta_temporary_file)
@@ -0,0 +1,63 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for the LRU cache of fastaparser.Reader lookups.
+"""
+
+
+from fastaparser import FastaSequence
+from fastaparser.cache import _LRUCache, _memory_size, CacheInfo
+
+
+class Test_LRUCache:
+    def test_hits_and_misses(self):
+        cache = _LRUCache(100)
+        assert cache.get('a') is None
+        cache.put('a', 'value a', 10)
+        assert cache.get('a') == 'value a'
+        assert cache.get('b', 0) == 0
+        assert cache.info() == CacheInfo(hits=1, misses=2, evictions=0, maxsize=100, currsize=10, entries=1)
+
+    def test_eviction(self):
+        cache = _LRUCache(100)
+        cache.put('a', 'value a', 40)
+        cache.put('b', 'value b', 40)
+        cache.get('a')  # 'b' becomes the least recently used
+        cache.put('c', 'value c', 40)
+        assert cache.get('b') is None
+        assert cache.get('a') == 'value a'
+        assert cache.get('c') == 'value c'
+        assert cache.info().evictions == 1
+        assert cache.info().currsize == 80
+
+    def test_replace(self):
+        cache = _LRUCache(100)
+        cache.put('a', 'value a', 40)
+        cache.put('a', 'new value a', 60)
+        assert cache.get('a') == 'new value a'
+        assert cache.info().currsize == 60
+        assert cache.info().entries == 1
+
+    def test_too_large(self):
+        cache = _LRUCache(100)
+        cache.put('a', 'value a', 40)
+        cache.put('b', 'value b', 101)
+        assert cache.get('b') is None
+        assert cache.get('a') == 'value a'
+        assert cache.info().evictions == 0
+
+    def test_clear(self):
+        cache = _LRUCache(100)
+        cache.put('a', 'value a', 40)
+        cache.get('a')
+        cache.clear()
+        assert cache.get('a') is None
+        assert cache.info() == CacheInfo(hits=0, misses=1, evictions=0, maxsize=100, currsize=0, entries=0)
+
+
+class Test_memory_size:
+    def test_rich(self):
+        fasta_sequence = FastaSequence('ACGT' * 100)
+        assert _memory_size(fasta_sequence) > 100 * len(fasta_sequence)
+        assert fasta_sequence._sequence_string is not None  # the estimate doesn't change fasta_sequence
@@ -0,0 +1,111 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.extract_fastas function.
+"""
+
+
+import errno
+import io
+import os
+import pytest
+from fastaparser import Reader, Writer, extract_fastas
+from fastaparser.extract import _iter_scanned_record_ranges
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def fasta_indexed_path():
+    # FASTA file with a .fai index, and a last line without a newline
+    path = 'tests/FASTA_TEMPORARY_INDEXED_FILE.fasta'
+    with open('tests/fasta_nucleotide_multiple.fasta') as fasta_file, open(path, 'w') as fasta_indexed_file:
+        with Writer(fasta_indexed_file, line_width=60, index=True) as fasta_writer:
+            fasta_writer.writefastas(Reader(fasta_file, parse_method='quick'))
+    with open(path, 'rb+') as fasta_indexed_file:
+        fasta_indexed_file.truncate(os.path.getsize(path) - 2)
+    yield path
+    os.remove(path)
+    os.remove(path + '.fai')
+
+
+@pytest.fixture()
+def output_path():
+    path = 'tests/FASTA_TEMPORARY_OUTPUT_FILE.fasta'
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def record_bytes(fasta_path):
+    # {id: FASTA sequence bytes, from the definition line to the end of the last sequence line}
+    with open(fasta_path, 'rb') as fasta_file:
+        records = fasta_file.read().split(b'\n>')
+    return {record.lstrip(b'>').split()[0].decode(): b'>' + record.lstrip(b'>').rstrip(b'\n') + b'\n'
+            for record in records}
+
+
+#######
+# Tests
+#######
+
+
+class Test_iter_scanned_record_ranges:
+    def test_ranges(self):
+        with open('tests/fasta_nucleotide_multiple.fasta', 'rb') as fasta_file:
+            ranges = list(_iter_scanned_record_ranges(fasta_file))
+            assert len(ranges) == 17
+            for id_, start, end in ranges:
+                fasta_file.seek(start)
+                assert fasta_file.read(end - start) == record_bytes('tests/fasta_nucleotide_multiple.fasta')[id_]
+
+
+class Test_extract_fastas:
+    def test_scan(self, output_path):
+        records = record_bytes('tests/fasta_nucleotide_multiple.fasta')
+        ids = list(records)[::-3]  # not in the order of the file
+        assert extract_fastas('tests/fasta_nucleotide_multiple.fasta', ids, output_path) == len(ids)
+        with open(output_path, 'rb') as output_file:
+            assert output_file.read() == b''.join(records[id_] for id_ in ids)
+
+    def test_fai(self, fasta_indexed_path, output_path):
+        records = record_bytes(fasta_indexed_path)
+        ids = list(records)[-3:] + list(records)[:2]  # the last FASTA sequence has no newline at the end
+        assert extract_fastas(fasta_indexed_path, ids, output_path) == len(ids)
+        with open(output_path, 'rb') as output_file:
+            assert output_file.read() == b''.join(records[id_] for id_ in ids)
+
+    def test_fallback_copy(self, fasta_indexed_path, output_path, monkeypatch):
+        def copy_file_range(*args):
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+        monkeypatch.setattr(os, 'copy_file_range', copy_file_range, raising=False)
+        monkeypatch.delattr(os, 'sendfile', raising=False)
+        records = record_bytes(fasta_indexed_path)
+        with open(output_path, 'wb') as output_file:
+            output_file.write(b'>existing\nACGT\n')
+            extract_fastas(fasta_indexed_path, list(records), output_file)
+        with open(output_path, 'rb') as output_file:
+            assert output_file.read() == b'>existing\nACGT\n' + b''.join(records.values())
+
+    def test_missing_ids(self, output_path):
+        with pytest.raises(KeyError):
+            extract_fastas('tests/fasta_nucleotide_multiple.fasta', ['missing_id'], output_path)
+        assert not os.path.exists(output_path)
+        assert extract_fastas('tests/fasta_nucleotide_multiple.fasta', ['missing_id'], output_path,
+                              ignore_missing=True) == 0
+
+    def test_wrong_type(self, output_path):
+        with pytest.raises(TypeError):
+            extract_fastas('tests/non_existing_file.fasta', [], output_path)
+        with pytest.raises(TypeError):
+            extract_fastas('tests/fasta_nucleotide_multiple.fasta', 'id', output_path)
+        with pytest.raises(TypeError):
+            extract_fastas('tests/fasta_nucleotide_multiple.fasta', [1], output_path)
+        with pytest.raises(TypeError):
+            extract_fastas('tests/fasta_nucleotide_multiple.fasta', [], io.BytesIO())
+        with pytest.raises(TypeError):
+            extract_fastas('tests/fasta_nucleotide_multiple.fasta', [], output_path, fai_path='missing.fai')
@@ -0,0 +1,147 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.HeaderSchema class and fastaparser.parse_header and fastaparser.parse_headers functions.
+"""
+
+
+import io
+import os
+import pytest
+from fastaparser import HeaderSchema, parse_header, parse_headers, ENSEMBL_SCHEMA, NCBI_SCHEMA, UNIPROT_SCHEMA
+from .conftest import fasta_contents
+
+
+UNIPROT_HEADER = '>sp|P69905|HBA_HUMAN Hemoglobin subunit alpha OS=Homo sapiens OX=9606 GN=HBA1 PE=1 SV=2'
+ENSEMBL_HEADER = ('>ENST00000380152.8 cdna chromosome:GRCh38:13:32315508:32400268:1 gene:ENSG00000139618.16 '
+                  'gene_biotype:protein_coding transcript_biotype:protein_coding gene_symbol:BRCA2 '
+                  'description:BRCA2 DNA repair associated [Source:HGNC Symbol;Acc:HGNC:1101]')
+NCBI_HEADERS = ('>NM_000518.5 Homo sapiens hemoglobin subunit beta (HBB), mRNA',
+                '>gi|4504349|ref|NP_000509.1| hemoglobin subunit beta [Homo sapiens]',
+                '>lcl|NC_000011.10_cds_NP_000509.1_1 [gene=HBB] [db_xref=GeneID:3043] [protein=hemoglobin]')
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def fasta_temporary_path():
+    path = 'tests/FASTA_TEMPORARY_FILE_WITH_HEADERS.fasta'
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+#######
+# Tests
+#######
+
+
+class Test_parse_header:
+    def test_uniprot(self):
+        fields = parse_header(UNIPROT_HEADER)
+        assert fields.schema == 'uniprot'
+        assert (fields.accession, fields.database, fields.gene, fields.organism, fields.taxon) == \
+            ('P69905', 'sp', 'HBA1', 'Homo sapiens', '9606')
+        assert fields.fields == {'entry_name': 'HBA_HUMAN', 'protein_name': 'Hemoglobin subunit alpha',
+                                 'OS': 'Homo sapiens', 'OX': '9606', 'GN': 'HBA1', 'PE': '1', 'SV': '2'}
+        assert parse_header(UNIPROT_HEADER[1:]) == fields  # without '>'
+
+    def test_ensembl(self):
+        fields = parse_header(ENSEMBL_HEADER)
+        assert fields.schema == 'ensembl'
+        assert (fields.accession, fields.database, fields.gene) == ('ENST00000380152.8', 'ensembl', 'BRCA2')
+        assert fields.fields['molecule'] == 'cdna'
+        assert fields.fields['location'] == 'chromosome:GRCh38:13:32315508:32400268:1'
+        assert fields.fields['gene'] == 'ENSG00000139618.16'
+        assert fields.fields['description'] == 'BRCA2 DNA repair associated [Source:HGNC Symbol;Acc:HGNC:1101]'
+
+    def test_ncbi(self):
+        refseq, legacy, cds = [parse_header(header) for header in NCBI_HEADERS]
+        assert (refseq.schema, refseq.accession, refseq.database) == ('ncbi', 'NM_000518.5', 'ncbi')
+        assert (legacy.accession, legacy.database, legacy.organism) == ('NP_000509.1', 'ref', 'Homo sapiens')
+        assert legacy.fields['gi'] == '4504349'
+        assert (cds.accession, cds.database, cds.gene) == ('NC_000011.10_cds_NP_000509.1_1', 'lcl', 'HBB')
+        assert cds.fields == {'gene': 'HBB', 'db_xref': 'GeneID:3043', 'protein': 'hemoglobin'}
+
+    def test_no_match(self):
+        assert parse_header('>HSBGPG Human gene for bone gla protein (BGP)') is None
+        assert parse_header('>') is None
+        assert parse_header('') is None
+
+    def test_schemas(self):
+        assert parse_header(ENSEMBL_HEADER, UNIPROT_SCHEMA) is None
+        assert parse_header(UNIPROT_HEADER, [ENSEMBL_SCHEMA, UNIPROT_SCHEMA]).schema == 'uniprot'
+        assert parse_header(UNIPROT_HEADER, [NCBI_SCHEMA, UNIPROT_SCHEMA]).schema == 'ncbi'  # first match
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            parse_header(123)
+        with pytest.raises(TypeError):
+            parse_header(UNIPROT_HEADER, 123)
+        with pytest.raises(TypeError):
+            parse_header(UNIPROT_HEADER, ['uniprot'])
+
+
+class Test_HeaderSchema:
+    def test_custom_schema(self):
+        schema = HeaderSchema('flybase', r'(?P<accession>FBgn\d+)', r'(\w+)=([^;]*);',
+                              field_keys={'organism': 'species'}, defaults={'database': 'FlyBase'})
+        fields = schema.parse('>FBgn0000008 type=gene; species=Dmel; type=other;')
+        assert fields == ('flybase', 'FBgn0000008', 'FlyBase', None, 'Dmel', None, {'type': 'gene', 'species': 'Dmel'})
+        assert schema.parse('>CG1234') is None
+        assert schema.name == 'flybase'
+        assert repr(schema) == 'fastaparser.HeaderSchema(flybase)'
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            HeaderSchema(123, r'\S+')
+        with pytest.raises(TypeError):
+            HeaderSchema('schema', 123)
+        with pytest.raises(TypeError):
+            HeaderSchema('schema', r'(')
+        with pytest.raises(TypeError):
+            HeaderSchema('schema', r'\S+', r'(\w+)=')  # one group
+        with pytest.raises(TypeError):
+            HeaderSchema('schema', r'\S+', field_keys={'species': 'OS'})
+        with pytest.raises(TypeError):
+            HeaderSchema('schema', r'\S+', defaults={'database': 1})
+        with pytest.raises(TypeError):
+            UNIPROT_SCHEMA.parse(None)
+
+
+class Test_parse_headers:
+    def test_path(self):
+        headers = list(parse_headers('tests/fasta_aminoacid_multiple.fasta'))
+        expected = fasta_contents('tests/fasta_aminoacid_multiple.fasta')
+        assert [header for header, _ in headers] == ['%s %s' % (id_, description) for id_, description, _ in expected]
+        # NCBI headers (ex: 'NP_056019.1 ... [Homo sapiens]') and UniProt style IDs (ex: 'sp|Q9H257.2|CARD9_HUMAN')
+        assert [fields.accession for _, fields in headers] == \
+            [id_.split('|')[1] if '|' in id_ else id_ for id_, _, _ in expected]
+        assert all(fields.organism == 'Homo sapiens' for _, fields in headers if fields.schema == 'ncbi')
+
+    def test_file_objects(self):
+        contents = 'ACGT\n' + UNIPROT_HEADER + '\r\nACGT\n>unknown\nACGT'
+        for fasta_file in (io.StringIO(contents), io.BytesIO(contents.encode())):
+            headers = list(parse_headers(fasta_file))
+            assert [header for header, _ in headers] == [UNIPROT_HEADER[1:], 'unknown']
+            assert headers[0][1] == parse_header(UNIPROT_HEADER)
+            assert headers[1][1] is None
+
+    def test_path_edge_cases(self, fasta_temporary_path):
+        for contents, headers in ((b'', []), (b'ACGT\n', []), (b'>', ['']), (b'>a\r\nAC\n>b', ['a', 'b']),
+                                  (b'\n>a\nAC\n', ['a'])):
+            with open(fasta_temporary_path, 'wb') as fasta_file:
+                fasta_file.write(contents)
+            assert [header for header, _ in parse_headers(fasta_temporary_path)] == headers
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            parse_headers('tests/non_existing_file.fasta')
+        with pytest.raises(TypeError):
+            parse_headers(123)
+        with pytest.raises(TypeError):
+            parse_headers('tests/fasta_aminoacid_multiple.fasta', 123)
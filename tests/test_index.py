@@ -0,0 +1,58 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.index module (.fai and .gzi index files).
+"""
+
+
+import os
+import pytest
+from fastaparser.index import FaiEntry, _read_fai, _read_gzi, _write_fai, _write_gzi
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def index_temporary_path():
+    path = 'tests/INDEX_TEMPORARY_FILE'
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+#######
+# Tests
+#######
+
+
+class Test_fai:
+    def test_write_read(self, index_temporary_path):
+        fai_entries = [FaiEntry('id_1', 100, 6, 70, 71), FaiEntry('id_2', 3, 115, 3, 4)]
+        _write_fai(index_temporary_path, fai_entries)
+        with open(index_temporary_path) as fai_file:
+            assert fai_file.read() == 'id_1\t100\t6\t70\t71\nid_2\t3\t115\t3\t4\n'
+        assert _read_fai(index_temporary_path) == fai_entries
+
+    def test_not_fai(self, index_temporary_path):
+        with open(index_temporary_path, 'w') as fai_file:
+            fai_file.write('>id_1 not an index\n')
+        with pytest.raises(TypeError):
+            _read_fai(index_temporary_path)
+
+
+class Test_gzi:
+    def test_write_read(self, index_temporary_path):
+        blocks = [(12000, 65280), (24500, 130560)]
+        _write_gzi(index_temporary_path, blocks)
+        assert os.path.getsize(index_temporary_path) == 8 + 2 * 16
+        assert _read_gzi(index_temporary_path) == blocks
+
+    def test_not_gzi(self, index_temporary_path):
+        with open(index_temporary_path, 'wb') as gzi_file:
+            gzi_file.write(b'\x05\x00\x00\x00\x00\x00\x00\x00')
+        with pytest.raises(TypeError):
+            _read_gzi(index_temporary_path)
@@ -0,0 +1,88 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.parallel_map function.
+"""
+
+
+import pytest
+from fastaparser import parallel_map
+from fastaparser.parallel import _iter_record_offsets, _iter_record_ranges
+from .conftest import fasta_contents
+
+
+##########
+# Fixtures
+##########
+
+
+def sequence_id(fasta_sequence):
+    return fasta_sequence.id
+
+
+def quick_sequence(fasta):
+    return fasta.sequence
+
+
+#######
+# Tests
+#######
+
+
+class Test_iter_record_offsets:
+    def test_offsets(self):
+        with open('tests/fasta_nucleotide_multiple.fasta', 'rb') as fasta_file:
+            contents = fasta_file.read()
+        offsets = list(_iter_record_offsets('tests/fasta_nucleotide_multiple.fasta'))
+        assert len(offsets) == 17
+        assert all(contents[offset:offset + 1] == b'>' for offset in offsets)
+
+    def test_small_blocks(self):
+        # definition lines at the start of blocks and '\n>' split between blocks
+        for block_size in (1, 2, 3, 7, 64):
+            assert (list(_iter_record_offsets('tests/fasta_nucleotide_multiple.fasta', block_size)) ==
+                    list(_iter_record_offsets('tests/fasta_nucleotide_multiple.fasta')))
+
+    def test_empty_file(self):
+        assert list(_iter_record_offsets('tests/fasta_empty.fasta')) == []
+
+
+class Test_iter_record_ranges:
+    def test_ranges(self):
+        ranges = list(_iter_record_ranges('tests/fasta_nucleotide_multiple.fasta', 5))
+        assert len(ranges) == 4  # 17 FASTA sequences
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+
+
+class Test_parallel_map:
+    def test_ordered(self, fasta_nucleotide_multiple_contents):
+        results = parallel_map(sequence_id, 'tests/fasta_nucleotide_multiple.fasta', workers=2, chunk_records=3)
+        assert list(results) == [contents[0] for contents in fasta_nucleotide_multiple_contents]
+
+    def test_unordered(self, fasta_nucleotide_multiple_contents):
+        results = parallel_map(sequence_id, 'tests/fasta_nucleotide_multiple.fasta', workers=2, chunk_records=2,
+                               ordered=False)
+        assert sorted(results) == sorted(contents[0] for contents in fasta_nucleotide_multiple_contents)
+
+    def test_reader_options(self):
+        fasta_aminoacid_multiple_contents = fasta_contents('tests/fasta_aminoacid_multiple.fasta')
+        results = parallel_map(quick_sequence, 'tests/fasta_aminoacid_multiple.fasta', workers=1,
+                               parse_method='quick')
+        assert list(results) == [contents[2] for contents in fasta_aminoacid_multiple_contents]
+
+    def test_empty_file(self):
+        assert list(parallel_map(sequence_id, 'tests/fasta_empty.fasta', workers=1)) == []
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            parallel_map(None, 'tests/fasta_empty.fasta')
+        with pytest.raises(TypeError):
+            parallel_map(sequence_id, 'tests/non_existing_file.fasta')
+        with pytest.raises(TypeError):
+            parallel_map(sequence_id, 'tests/fasta_empty.fasta', workers=0)
+        with pytest.raises(TypeError):
+            parallel_map(sequence_id, 'tests/fasta_empty.fasta', chunk_records='10')
+        with pytest.raises(TypeError):
+            parallel_map(sequence_id, 'tests/fasta_empty.fasta', parse_method='wrong_method')
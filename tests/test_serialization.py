@@ -0,0 +1,97 @@
+#!python
+# coding: utf-8
+
+"""
+Tests for fastaparser.serialize_fastas and fastaparser.deserialize_fastas functions.
+"""
+
+
+import pytest
+from fastaparser import FastaSequence, Reader, serialize_fastas, deserialize_fastas
+
+
+##########
+# Fixtures
+##########
+
+
+@pytest.fixture()
+def fasta_sequences():
+    return [FastaSequence('ACGTN', 'id_1', 'description 1', 'nucleotide'),
+            FastaSequence('MKVLAQE', 'id_2', '', infer_type=True),
+            FastaSequence('acg»', '', 'only a description')]
+
+
+#######
+# Tests
+#######
+
+
+class Test_serialize_fastas:
+    def test_rich(self, fasta_sequences):
+        deserialized = deserialize_fastas(serialize_fastas(fasta_sequences))
+        assert deserialized == fasta_sequences
+        for original, new in zip(fasta_sequences, deserialized):
+            assert new.id == original.id
+            assert new.description == original.description
+            assert new.sequence_type == original.sequence_type
+            assert new.inferred_type == original.inferred_type
+
+    def test_quick(self, fasta_sequences):
+        deserialized = deserialize_fastas(serialize_fastas(fasta_sequences), parse_method='quick')
+        assert [fasta.header for fasta in deserialized] == [fasta_sequence.formatted_definition_line()
+                                                            for fasta_sequence in fasta_sequences]
+        assert [fasta.sequence for fasta in deserialized] == [fasta_sequence.sequence_as_string()
+                                                              for fasta_sequence in fasta_sequences]
+
+    def test_tuples(self):
+        with open('tests/fasta_aminoacid_multiple.fasta') as fasta_file:
+            fastas = list(Reader(fasta_file, parse_method='quick'))
+        assert deserialize_fastas(serialize_fastas(fastas), parse_method='quick') == fastas
+
+    def test_id_starting_with_greater_than(self):
+        fasta_sequence = FastaSequence('ACGT', '>>x', 'desc')
+        assert fasta_sequence.id == '>x'
+        deserialized = deserialize_fastas(serialize_fastas([fasta_sequence]))[0]
+        assert (deserialized.id, deserialized.description) == ('>x', 'desc')
+        assert deserialize_fastas(serialize_fastas([fasta_sequence]), parse_method='quick')[0].header == '>>x desc'
+
+    def test_tuples_headers_verbatim(self):
+        fastas = [('>seq1\tfirst  sequence ', 'ACGT'), ('>seq 2', 'TTTT'), ('seq3 without greater than', 'GG')]
+        deserialized = deserialize_fastas(serialize_fastas(fastas), parse_method='quick')
+        assert [fasta.header for fasta in deserialized] == ['>seq1\tfirst  sequence ', '>seq 2',
+                                                            '>seq3 without greater than']
+        deserialized = deserialize_fastas(serialize_fastas(fastas))
+        assert [(fasta.id, fasta.description) for fasta in deserialized] == [
+            ('seq1', 'first sequence'), ('seq', '2'), ('seq3', 'without greater than')]
+
+    def test_empty(self):
+        assert deserialize_fastas(serialize_fastas([])) == []
+
+    def test_compact(self, fasta_nucleotide_multiple):
+        fastas = list(Reader(fasta_nucleotide_multiple))
+        headers_size = sum(len(fasta.formatted_definition_line()) for fasta in fastas)
+        sequences_size = sum(len(fasta) for fasta in fastas)
+        assert len(serialize_fastas(fastas)) < headers_size + sequences_size + 50 * len(fastas)
+
+    def test_wrong_type(self):
+        with pytest.raises(TypeError):
+            serialize_fastas(123)
+        with pytest.raises(TypeError):
+            serialize_fastas(['ACGT'])
+        with pytest.raises(TypeError):
+            serialize_fastas([(1, 2)])
+
+
+class Test_deserialize_fastas:
+    def test_wrong_data(self):
+        with pytest.raises(TypeError):
+            deserialize_fastas(b'')
+        with pytest.raises(TypeError):
+            deserialize_fastas(b'not serialized fastas')
+        with pytest.raises(TypeError):
+            deserialize_fastas(serialize_fastas([FastaSequence('ACGT')])[:-10])
+
+    def test_wrong_parse_method(self):
+        with pytest.raises(TypeError):
+            deserialize_fastas(serialize_fastas([]), parse_method='wrong_method')